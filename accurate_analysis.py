@@ -108,7 +108,7 @@ class AccurateAnalyzer:
                                 f"Module '{module_name}' may not be installed or does not exist",
                                 'high'
                             )
-        except:
+        except Exception:
             pass  # Already caught in syntax check
 
     def _is_local_module(self, module_name, file_path):
@@ -152,7 +152,7 @@ class AccurateAnalyzer:
                             line.rstrip()
                         )
                         return
-        except:
+        except Exception:
             pass
 
     def check_common_issues(self, file_path):
@@ -182,7 +182,7 @@ class AccurateAnalyzer:
                                 f"Function '{node.name}' has mutable default argument",
                                 'medium'
                             )
-        except:
+        except Exception:
             pass
 
     def analyze_file(self, file_path):
@@ -9,7 +9,7 @@ import traceback
 import threading
 from pathlib import Path
 from datetime import datetime, timedelta
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from zoneinfo import ZoneInfo
 import pandas as pd
 import numpy as np
@@ -52,8 +52,9 @@ from trading.risk_manager import RiskManager
 from trading.strategy.pair_trading_strategy import PairTradingStrategy, PairTradingConfig, PairPosition
 
 # Phase 4: Reporting & Notification
-from notification.telegram_notifier import TelegramNotifier
+from notification.telegram_notifier import TelegramNotifier, PRIORITY_LOW
 from notification.telegram_bot_handler import TelegramBotHandler
+from notification.async_loop import AsyncLoopThread
 from reporting.daily_report import ReportGenerator
 
 # Utils
@@ -251,10 +252,13 @@ class CryptoTrader:
         # Phase 4: レポート・通知初期化
         logger.info("\n[Phase 4] レポート・通知初期化")
         telegram_config = self.config.get('telegram', {})
+        # Telegram通知とBotハンドラーの非同期処理は1つのイベントループで実行
+        self.telegram_loop = AsyncLoopThread()
         self.notifier = TelegramNotifier(
             bot_token=telegram_config.get('bot_token'),
             chat_id=telegram_config.get('chat_id'),
-            enabled=telegram_config.get('enabled', False)
+            enabled=telegram_config.get('enabled', False),
+            loop_thread=self.telegram_loop
         )
 
         # Telegram Botハンドラー初期化（コマンド受信用）
@@ -262,7 +266,11 @@ class CryptoTrader:
         self.telegram_bot = TelegramBotHandler(
             bot_token=telegram_config.get('bot_token'),
             allowed_chat_ids=[chat_id] if chat_id else [],
-            trader_instance=self
+            trader_instance=self,
+            webhook_url=telegram_config.get('webhook_url'),
+            webhook_port=telegram_config.get('webhook_port', 8443),
+            webhook_listen=telegram_config.get('webhook_listen', '127.0.0.1'),
+            loop_thread=self.telegram_loop
         )
 
         self.report_generator = ReportGenerator(self.db_manager, self.data_collector)
@@ -689,64 +697,100 @@ class CryptoTrader:
             logger.error(f"{symbol} データ収集エラー: {e}")
             return None
 
-    def generate_trading_signal(self, symbol: str) -> Optional[Dict]:
-        """取引シグナル生成（トレンド戦略用）
+    def _prepare_signal_features(self, symbol: str) -> Optional[pd.DataFrame]:
+        """シグナル生成用の最新データを取得して特徴量を作成
 
         Args:
             symbol: 取引ペア
 
         Returns:
-            シグナル情報 or None
+            特徴量付きデータ or None
         """
-        if not self.models_loaded:
-            logger.debug(f"{symbol} モデル未読み込み - シグナル生成スキップ")
+        # 最新データ取得
+        df = self.collect_and_store_data(symbol, limit=500)
+
+        if df is None or len(df) < 100:
+            logger.warning(f"{symbol} データ不足（最低100件必要）")
             return None
 
+        # 特徴量生成
         try:
-            # 最新データ取得
-            df = self.collect_and_store_data(symbol, limit=500)
+            df = self.feature_engineer.create_all_features(df)
+            original_len = len(df)
+            df = df.dropna()
 
-            if df is None or len(df) < 100:
-                logger.warning(f"{symbol} データ不足（最低100件必要）")
+            if len(df) == 0:
+                logger.warning(f"{symbol} 特徴量生成後データなし（NaN除去前: {original_len}件）")
                 return None
 
-            # 特徴量生成
-            try:
-                df = self.feature_engineer.create_all_features(df)
-                original_len = len(df)
-                df = df.dropna()
+            if len(df) < 50:
+                logger.warning(f"{symbol} 特徴量生成後データ不足（{len(df)}件 < 50件）")
+                return None
 
-                if len(df) == 0:
-                    logger.warning(f"{symbol} 特徴量生成後データなし（NaN除去前: {original_len}件）")
-                    return None
+        except Exception as fe_error:
+            logger.error(f"{symbol} 特徴量エンジニアリングエラー: {fe_error}")
+            return None
 
-                if len(df) < 50:
-                    logger.warning(f"{symbol} 特徴量生成後データ不足（{len(df)}件 < 50件）")
-                    return None
+        return df
 
-            except Exception as fe_error:
-                logger.error(f"{symbol} 特徴量エンジニアリングエラー: {fe_error}")
-                return None
+    def generate_trading_signal(self, symbol: str) -> Optional[Dict]:
+        """取引シグナル生成（トレンド戦略用）
+
+        Args:
+            symbol: 取引ペア
+
+        Returns:
+            シグナル情報 or None
+        """
+        return self.generate_trading_signals([symbol]).get(symbol)
+
+    def generate_trading_signals(self, symbols: List[str]) -> Dict[str, Dict]:
+        """複数銘柄の取引シグナルをまとめて生成（トレンド戦略用）
+
+        特徴量は銘柄ごとに作成し、モデル推論は全銘柄で1回にまとめる。
 
-            # アンサンブルモデルで予測
+        Args:
+            symbols: 取引ペアのリスト
+
+        Returns:
+            {取引ペア: シグナル情報}（データ不足などの銘柄は含まない）
+        """
+        if not self.models_loaded:
+            logger.debug(f"{', '.join(symbols)} モデル未読み込み - シグナル生成スキップ")
+            return {}
+
+        dfs = {}
+        for symbol in symbols:
             try:
-                signal = self.ensemble_model.generate_trading_signal(
-                    df,
-                    confidence_threshold=self.min_confidence
-                )
-            except Exception as model_error:
-                logger.error(f"{symbol} モデル予測エラー: {model_error}")
-                # フォールバック: HOLDシグナル
-                return {'signal': 'HOLD', 'confidence': 0.0, 'error': str(model_error)}
+                df = self._prepare_signal_features(symbol)
+            except Exception as e:
+                logger.error(f"{symbol} シグナル生成エラー: {e}")
+                logger.error(traceback.format_exc())
+                continue
+            if df is not None:
+                dfs[symbol] = df
 
-            logger.info(f"  ✓ {symbol} シグナル: {signal['signal']} (信頼度: {signal['confidence']:.2%})")
+        if not dfs:
+            return {}
 
-            return signal
+        # アンサンブルモデルで予測
+        try:
+            signals = self.ensemble_model.generate_trading_signals_multi(
+                dfs,
+                confidence_threshold=self.min_confidence
+            )
+        except Exception as model_error:
+            logger.error(f"{', '.join(dfs)} モデル予測エラー: {model_error}")
+            # フォールバック: HOLDシグナル
+            return {
+                symbol: {'signal': 'HOLD', 'confidence': 0.0, 'error': str(model_error)}
+                for symbol in dfs
+            }
 
-        except Exception as e:
-            logger.error(f"{symbol} シグナル生成エラー: {e}")
-            logger.error(traceback.format_exc())
-            return None
+        for symbol, signal in signals.items():
+            logger.info(f"  ✓ {symbol} シグナル: {signal['signal']} (信頼度: {signal['confidence']:.2%})")
+
+        return signals
 
     def execute_trading_decision(self, symbol: str, signal: Dict):
         """取引判断と実行
@@ -1915,13 +1959,15 @@ class CryptoTrader:
             # ========== トレンド戦略 ==========
             if trend_ratio > 0:
                 logger.info("\n[トレンド戦略] 処理開始")
-                for pair_config in self.trading_pairs:
-                    symbol = pair_config['symbol']
 
+                # シグナル生成（全銘柄まとめて推論）
+                symbols = [pair_config['symbol'] for pair_config in self.trading_pairs]
+                signals = self.generate_trading_signals(symbols)
+
+                for symbol in symbols:
                     logger.info(f"\n  [{symbol}] 処理中")
 
-                    # シグナル生成
-                    signal = self.generate_trading_signal(symbol)
+                    signal = signals.get(symbol)
 
                     if signal:
                         # 取引判断・実行
@@ -2007,7 +2053,7 @@ class CryptoTrader:
 
             # Telegramに送信（テキストとして）
             if self.notifier.enabled:
-                self.notifier.send_message(report)
+                self.notifier.send_message(report, priority=PRIORITY_LOW)
 
             logger.info("  ✓ 週次レポート送信完了\n")
 
@@ -2024,7 +2070,7 @@ class CryptoTrader:
 
             # Telegramに送信（テキストとして）
             if self.notifier.enabled:
-                self.notifier.send_message(report)
+                self.notifier.send_message(report, priority=PRIORITY_LOW)
 
             logger.info("  ✓ 月次レポート送信完了\n")
 
@@ -2296,6 +2342,10 @@ class CryptoTrader:
         # 最終レポート生成
         self.send_daily_report()
 
+        # 通知の送信待ちを送り切ってからクローズし、共有イベントループを停止
+        self.notifier.close()
+        self.telegram_loop.stop()
+
         # データベース接続クローズ
         logger.info("データベース接続をクローズ中...")
         self.db_manager.close()
@@ -4,17 +4,29 @@
 """
 
 import logging
-from typing import Dict, List, Optional, Tuple
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional, Tuple
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 import numpy as np
 import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
 from statsmodels.tsa.stattools import coint, adfuller
-from statsmodels.regression.linear_model import OLS
-from statsmodels.tools import add_constant
 
 logger = logging.getLogger(__name__)
 
+# 同一データに対する検定結果メモの最大保持数
+MEMO_MAX_SIZE = 4096
+
+# スプレッドシグナルコード（generate_signals の戻り値）
+SIGNAL_HOLD = 0
+SIGNAL_LONG_SPREAD = 1
+SIGNAL_SHORT_SPREAD = 2
+SIGNAL_CLOSE = 3
+
+# シグナルコード → SpreadSignal.signal 文字列
+SIGNAL_LABELS = ('hold', 'long_spread', 'short_spread', 'close')
+
 
 @dataclass
 class CointegrationResult:
@@ -76,6 +88,10 @@ class CointegrationAnalyzer:
         # キャッシュ: {pair_key: CachedCointegrationResult}
         self._cache: Dict[str, CachedCointegrationResult] = {}
 
+        # 検定結果メモ（LRU）: {(sym1, sym2, 系列キー1, 系列キー2, 有意水準): CointegrationResult}
+        # 同じ価格ウィンドウの再検定（coint()呼び出し）を省略する
+        self._memo: "OrderedDict[Tuple, CointegrationResult]" = OrderedDict()
+
         logger.info(
             f"CointegrationAnalyzer初期化: "
             f"significance={significance_level}, lookback={lookback_period}, "
@@ -102,10 +118,46 @@ class CointegrationAnalyzer:
             CointegrationResult: 検定結果
         """
         # 長さを揃える
-        min_len = min(len(price1), len(price2))
-        p1 = price1.iloc[-min_len:].values
-        p2 = price2.iloc[-min_len:].values
+        p1, p2 = self._align(price1, price2)
+
+        return self._test_cointegration_arrays(p1, p2, symbol1, symbol2)
 
+    @staticmethod
+    def _align(price1: pd.Series, price2: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        2つの価格系列を末尾で長さを揃えた配列ビューに変換（コピーなし）
+
+        Args:
+            price1: 資産1の価格系列
+            price2: 資産2の価格系列
+
+        Returns:
+            (資産1の価格配列, 資産2の価格配列)
+        """
+        a = price1.to_numpy()
+        b = price2.to_numpy()
+        n = min(a.size, b.size)
+        return a[a.size - n:], b[b.size - n:]
+
+    def _test_cointegration_arrays(
+        self,
+        p1: np.ndarray,
+        p2: np.ndarray,
+        symbol1: str,
+        symbol2: str
+    ) -> CointegrationResult:
+        """
+        長さを揃えた価格配列でEngle-Granger共和分検定を実行
+
+        Args:
+            p1: 資産1の価格配列
+            p2: 資産2の価格配列
+            symbol1: 資産1のシンボル
+            symbol2: 資産2のシンボル
+
+        Returns:
+            CointegrationResult: 検定結果
+        """
         # Engle-Granger検定
         score, p_value, critical_values = coint(p1, p2)
 
@@ -152,9 +204,31 @@ class CointegrationAnalyzer:
         Returns:
             ヘッジ比率（β係数）
         """
-        X = add_constant(price2)
-        model = OLS(price1, X).fit()
-        return model.params[1]
+        return self._ols_slope(price2, price1)
+
+    @staticmethod
+    def _ols_slope(x: np.ndarray, y: np.ndarray) -> float:
+        """
+        定数項付き単回帰 y = α + βx の傾きβを閉形式で計算
+
+        2変数OLSは正規方程式が2x2なので、LAPACKを呼ばず
+        中心化した積和の比で直接解く（数値的にも安定）
+
+        Args:
+            x: 説明変数
+            y: 目的変数
+
+        Returns:
+            傾きβ（xが定数の場合は0.0）
+        """
+        x_centered = x - x.mean()
+        y_centered = y - y.mean()
+
+        sxx = np.dot(x_centered, x_centered)
+        if sxx == 0:
+            return 0.0
+
+        return float(np.dot(x_centered, y_centered) / sxx)
 
     def _calculate_half_life(self, spread: np.ndarray) -> float:
         """
@@ -169,11 +243,8 @@ class CointegrationAnalyzer:
         spread_lag = np.roll(spread, 1)[1:]
         spread_diff = np.diff(spread)
 
-        X = add_constant(spread_lag)
-        model = OLS(spread_diff, X).fit()
-
         # 平均回帰速度
-        theta = -model.params[1]
+        theta = -self._ols_slope(spread_lag, spread_diff)
 
         if theta <= 0:
             return float('inf')
@@ -198,12 +269,10 @@ class CointegrationAnalyzer:
         Returns:
             スプレッド系列
         """
-        min_len = min(len(price1), len(price2))
-        p1 = price1.iloc[-min_len:]
-        p2 = price2.iloc[-min_len:]
+        p1, p2 = self._align(price1, price2)
 
-        spread = p1.values - hedge_ratio * p2.values
-        return pd.Series(spread, index=p1.index)
+        spread = p1 - hedge_ratio * p2
+        return pd.Series(spread, index=price1.index[len(price1) - len(spread):])
 
     def calculate_z_score(
         self,
@@ -252,11 +321,10 @@ class CointegrationAnalyzer:
         Returns:
             SpreadSignal: シグナル
         """
-        spread = self.calculate_spread(price1, price2, hedge_ratio)
-        z_score = self.calculate_z_score(spread, window)
+        p1, p2 = self._align(price1, price2)
 
         # データが空の場合はhold
-        if len(spread) == 0 or len(z_score) == 0:
+        if len(p1) == 0:
             return SpreadSignal(
                 spread=0.0,
                 z_score=0.0,
@@ -264,18 +332,13 @@ class CointegrationAnalyzer:
                 hedge_ratio=hedge_ratio
             )
 
-        current_spread = spread.iloc[-1]
-        current_z = z_score.iloc[-1]
+        # 最新値の判定には直近ウィンドウ分のスプレッドだけを計算
+        spread, z_score = self._spread_z_score(p1, p2, hedge_ratio, window, last_only=True)
+        current_spread = float(spread[-1])
+        current_z = float(z_score[-1])
 
         # シグナル判定
-        if current_z > self.z_score_entry:
-            signal = 'short_spread'  # スプレッドが高すぎる -> 資産1売り、資産2買い
-        elif current_z < -self.z_score_entry:
-            signal = 'long_spread'  # スプレッドが低すぎる -> 資産1買い、資産2売り
-        elif abs(current_z) < self.z_score_exit:
-            signal = 'close'  # 平均回帰 -> ポジションクローズ
-        else:
-            signal = 'hold'  # 維持
+        signal = SIGNAL_LABELS[int(self._classify_z_score(current_z))]
 
         return SpreadSignal(
             spread=current_spread,
@@ -284,6 +347,103 @@ class CointegrationAnalyzer:
             hedge_ratio=hedge_ratio
         )
 
+    def generate_signals(
+        self,
+        price1: pd.Series,
+        price2: pd.Series,
+        hedge_ratio: float,
+        window: int = None
+    ) -> np.ndarray:
+        """
+        全期間のシグナルコードを一括生成（バックテスト用）
+
+        Args:
+            price1: 資産1の価格系列
+            price2: 資産2の価格系列
+            hedge_ratio: ヘッジ比率
+            window: Zスコア計算ウィンドウ
+
+        Returns:
+            シグナルコード配列（int8, SIGNAL_LABELSで文字列に変換可能）
+        """
+        p1, p2 = self._align(price1, price2)
+        _, z_score = self._spread_z_score(p1, p2, hedge_ratio, window)
+
+        return self._classify_z_score(z_score).astype(np.int8)
+
+    def _spread_z_score(
+        self,
+        p1: np.ndarray,
+        p2: np.ndarray,
+        hedge_ratio: float,
+        window: Optional[int] = None,
+        last_only: bool = False
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        スプレッドとローリングZスコアを配列のまま一括計算
+
+        calculate_spread() + calculate_z_score() と同じ結果（ウィンドウ未満・
+        標準偏差0の時点はZスコア0）を、pandas Seriesを経由せずに求める。
+
+        Args:
+            p1: 資産1の価格配列（p2と同じ長さ）
+            p2: 資産2の価格配列
+            hedge_ratio: ヘッジ比率
+            window: Zスコア計算ウィンドウ（Noneの場合はlookback_period）
+            last_only: Trueの場合は最新時点のZスコアに必要な直近ウィンドウのみ計算
+
+        Returns:
+            (スプレッド配列, Zスコア配列)
+        """
+        if window is None:
+            window = self.lookback_period
+
+        if last_only:
+            tail = min(len(p1), window)
+            p1, p2 = p1[len(p1) - tail:], p2[len(p2) - tail:]
+
+        spread = p1 - hedge_ratio * p2
+        z_score = np.zeros_like(spread, dtype=np.float64)
+
+        # 標準偏差（不偏）にはウィンドウ2以上が必要
+        if window < 2 or len(spread) < window:
+            return spread, z_score
+
+        windows = sliding_window_view(spread, window)
+        mean = windows.mean(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            std = windows.std(axis=1, ddof=1)
+            z = (spread[window - 1:] - mean) / std
+
+        # 標準偏差がゼロ（定数スプレッド）・計算不能の場合は0
+        z_score[window - 1:] = np.where(std > 0, z, 0.0)
+
+        return spread, z_score
+
+    def _classify_z_score(self, z_score):
+        """
+        Zスコアをシグナルコードに分類（分岐なし、スカラー/配列両対応）
+
+        - z > entry: SIGNAL_SHORT_SPREAD（スプレッドが高すぎる -> 資産1売り、資産2買い）
+        - z < -entry: SIGNAL_LONG_SPREAD（スプレッドが低すぎる -> 資産1買い、資産2売り）
+        - |z| < exit: SIGNAL_CLOSE（平均回帰 -> ポジションクローズ）
+        - それ以外: SIGNAL_HOLD（維持）
+
+        Args:
+            z_score: Zスコア（スカラーまたは配列）
+
+        Returns:
+            シグナルコード
+        """
+        abs_z = np.abs(z_score)
+        is_entry = abs_z > self.z_score_entry
+        is_exit = (abs_z < self.z_score_exit) & ~is_entry
+
+        return (
+            is_entry * (SIGNAL_LONG_SPREAD + (z_score > 0))
+            + is_exit * SIGNAL_CLOSE
+        )
+
     def _get_pair_key(self, sym1: str, sym2: str) -> str:
         """ペアのキャッシュキーを生成（順序を正規化）"""
         return f"{min(sym1, sym2)}_{max(sym1, sym2)}"
@@ -312,9 +472,51 @@ class CointegrationAnalyzer:
         )
         logger.debug(f"キャッシュ保存: {pair_key} (有効期限: {self.cache_days}日)")
 
+    @staticmethod
+    def _series_key(series: pd.Series) -> Tuple[int, Hashable, Hashable, int]:
+        """
+        価格系列の同一性キー（長さ, 先頭・最終インデックス, 値のハッシュ）
+
+        RangeIndexのウィンドウは長さが同じならインデックスも一致するため、
+        値そのもののハッシュで区別する（検定1回に比べれば十分軽い）
+        """
+        if len(series) == 0:
+            return (0, None, None, 0)
+        values = series.to_numpy(dtype=np.float64)
+        return (len(series), series.index[0], series.index[-1], hash(values.tobytes()))
+
+    def _test_cointegration_memoized(
+        self,
+        price1: pd.Series,
+        price2: pd.Series,
+        symbol1: str,
+        symbol2: str
+    ) -> CointegrationResult:
+        """同じ価格ウィンドウの検定結果を再利用してtest_cointegrationを実行"""
+        memo_key = (
+            symbol1, symbol2,
+            self._series_key(price1), self._series_key(price2),
+            self.significance_level
+        )
+
+        result = self._memo.get(memo_key)
+        if result is not None:
+            self._memo.move_to_end(memo_key)
+            logger.debug(f"検定メモヒット: {symbol1}/{symbol2}")
+            return result
+
+        result = self.test_cointegration(price1, price2, symbol1, symbol2)
+
+        self._memo[memo_key] = result
+        if len(self._memo) > MEMO_MAX_SIZE:
+            self._memo.popitem(last=False)
+
+        return result
+
     def clear_cache(self):
         """キャッシュをクリア"""
         self._cache.clear()
+        self._memo.clear()
         logger.info("共和分キャッシュをクリアしました")
 
     def find_cointegrated_pairs(
@@ -355,7 +557,7 @@ class CointegrationAnalyzer:
                 price1, price2 = price_data[sym1], price_data[sym2]
 
                 try:
-                    result = self.test_cointegration(price1, price2, sym1, sym2)
+                    result = self._test_cointegration_memoized(price1, price2, sym1, sym2)
 
                     # キャッシュに保存
                     self._cache_result(pair_key, result)
@@ -374,6 +576,81 @@ class CointegrationAnalyzer:
         )
         return cointegrated_pairs
 
+    def find_cointegrated_pairs_fast(
+        self,
+        prices: np.ndarray,
+        symbols: List[str],
+        min_correlation: float = 0.8,
+        force_refresh: bool = False
+    ) -> List[CointegrationResult]:
+        """
+        価格行列から共和分ペアを探索（相関による事前フィルタ付き）
+
+        対数リターンの相関行列を一度に計算し、相関の高いペアだけを
+        共和分検定にかける。価格は (T, N) の配列で受け取り、列ビューで処理する。
+
+        Args:
+            prices: 価格行列 (n_samples, n_symbols)、時系列が揃っていること
+            symbols: 各列のシンボル
+            min_correlation: 共和分検定にかける最小リターン相関
+            force_refresh: キャッシュを無視して再計算
+
+        Returns:
+            共和分関係にあるペアのリスト
+        """
+        if prices.ndim != 2 or prices.shape[1] != len(symbols):
+            raise ValueError(f"価格行列の形状がシンボル数と一致しません: {prices.shape}, {len(symbols)}")
+
+        # 列アクセスが連続になるようFortran順に（既にそうならコピーなし）
+        prices = np.asfortranarray(prices)
+
+        # 対数リターンの相関行列
+        log_prices = np.log(prices, dtype=np.float32)
+        returns = np.diff(log_prices, axis=0)
+        corr = np.corrcoef(returns, rowvar=False)
+
+        candidates = np.argwhere(np.triu(corr, 1) > min_correlation)
+
+        cointegrated_pairs = []
+        cache_hits = 0
+        cache_misses = 0
+
+        for i, j in candidates:
+            sym1, sym2 = symbols[i], symbols[j]
+            pair_key = self._get_pair_key(sym1, sym2)
+
+            # キャッシュチェック
+            if not force_refresh:
+                cached_result = self._get_cached_result(pair_key)
+                if cached_result:
+                    cache_hits += 1
+                    if cached_result.is_cointegrated:
+                        cointegrated_pairs.append(cached_result)
+                    continue
+
+            cache_misses += 1
+
+            try:
+                result = self._test_cointegration_arrays(prices[:, i], prices[:, j], sym1, sym2)
+
+                # キャッシュに保存
+                self._cache_result(pair_key, result)
+
+                if result.is_cointegrated:
+                    cointegrated_pairs.append(result)
+                    logger.info(f"共和分ペア発見: {sym1}/{sym2}")
+
+            except Exception as e:
+                logger.warning(f"共和分検定エラー: {sym1}/{sym2} - {e}")
+
+        total_pairs = len(symbols) * (len(symbols) - 1) // 2
+        logger.info(
+            f"共和分ペア数: {len(cointegrated_pairs)}/{total_pairs} "
+            f"(相関>{min_correlation}: {len(candidates)}件, "
+            f"キャッシュ: {cache_hits}件, 計算: {cache_misses}件)"
+        )
+        return cointegrated_pairs
+
     def test_stationarity(self, series: pd.Series) -> Tuple[bool, float]:
         """
         ADF検定で定常性を検定
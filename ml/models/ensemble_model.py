@@ -7,20 +7,175 @@ HMMで市場状態を分類し、LightGBMで価格方向を予測する統合モ
 import numpy as np
 import pandas as pd
 import logging
-from typing import Dict, Tuple, Optional, List
-from datetime import datetime, timedelta
+import operator
+from typing import Dict, Tuple, Optional, List, Union
+import threading
+import time
 import joblib
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from ml.models.hmm_model import MarketRegimeHMM
 from ml.models.lightgbm_model import PriceDirectionLGBM
+from utils.constants import MODEL_COMPRESS
 
 logger = logging.getLogger(__name__)
 
+# LightGBMの特徴量から除外するカラム（学習時のカラム情報がない場合のフォールバック）
+_EXCLUDE_COLS = frozenset([
+    'timestamp', 'datetime', 'future_return',
+    'target_direction', 'target_binary', 'target_return',
+    'open', 'high', 'low', 'close', 'volume'
+])
+
+# 押し目判定ルール: (カラム, 比較演算子, dip_configのキー, 理由の書式)
+_DIP_RULES = (
+    ('rsi', operator.lt, 'rsi_threshold', 'RSI={:.1f}<{}'),
+    ('sma20_distance', operator.lt, 'sma_distance_threshold', 'MA乖離={:.2%}'),
+    ('return_5', operator.lt, 'return_5d_threshold', '5日変化={:.2%}'),
+)
+
+# 高値圏判定ルール: (カラム, 比較演算子, 閾値, 理由の書式)
+_HIGH_RULES = (
+    ('rsi', operator.gt, 60, 'RSI={:.1f}>60'),
+    ('sma20_distance', operator.gt, 0.02, 'MA+{:.2%}'),  # 2%以上上
+    ('return_5', operator.gt, 0.03, '5日+{:.2%}'),        # 5日で3%以上上昇
+)
+
+# シグナル判定で参照する最新行のカラム（押し目・高値圏ルール + 待機時の価格）
+_LATEST_COLUMNS = ('close',) + tuple(dict.fromkeys(col for col, *_ in _DIP_RULES + _HIGH_RULES))
+
+
+def _match_rules(latest: Dict, rules) -> List[str]:
+    """
+    判定ルールを順に評価し、成立したルールの理由文字列を返す
+
+    Args:
+        latest: 最新行の値（カラム名 → 値）
+        rules: (カラム, 比較演算子, 閾値, 書式) のシーケンス
+
+    Returns:
+        成立したルールの理由リスト（書式化は成立時のみ）
+    """
+    return [
+        fmt.format(latest[col], threshold)
+        for col, op, threshold, fmt in rules
+        if col in latest and op(latest[col], threshold)
+    ]
+
+
+class _PendingSignalStore:
+    """
+    押し目待ちの待機シグナル（列指向で保持）
+
+    シンボルごとの発生時刻・確率・状態・価格水準を事前確保した並列配列の先頭_size行に持ち、
+    期限切れ判定を配列演算1回で行う。削除は末尾要素との入れ替えで行うため、
+    追加・削除ごとの配列再確保は発生しない。辞書と同じ in / len / [] / del で操作できる。
+    """
+
+    # 配列の初期容量（不足したら倍に拡張）
+    INITIAL_CAPACITY = 16
+
+    def __init__(self):
+        self.symbols: List[str] = []
+        self._size = 0
+        self.timestamps = np.empty(self.INITIAL_CAPACITY, dtype=np.float64)
+        self.probabilities = np.empty(self.INITIAL_CAPACITY, dtype=np.float64)
+        self.states = np.empty(self.INITIAL_CAPACITY, dtype=np.int64)
+        self.price_levels = np.empty(self.INITIAL_CAPACITY, dtype=np.float64)
+        self._index: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._index
+
+    def __getitem__(self, symbol: str) -> Dict:
+        i = self._index[symbol]
+        return {
+            'timestamp': float(self.timestamps[i]),
+            'probability': float(self.probabilities[i]),
+            'state': int(self.states[i]),
+            'price_level': float(self.price_levels[i])
+        }
+
+    def __setitem__(self, symbol: str, sig: Dict):
+        i = self._index.get(symbol)
+        if i is None:
+            if self._size == len(self.timestamps):
+                self._grow()
+            i = self._size
+            self._size += 1
+            self._index[symbol] = i
+            self.symbols.append(symbol)
+
+        # 既存シンボルは同じ位置を上書き
+        self.timestamps[i] = sig['timestamp']
+        self.probabilities[i] = sig['probability']
+        self.states[i] = sig['state']
+        self.price_levels[i] = sig['price_level']
+
+    def __delitem__(self, symbol: str):
+        i = self._index.pop(symbol)
+        last = self._size - 1
+
+        # 末尾の要素を空いた位置へ移動
+        if i != last:
+            moved = self.symbols[last]
+            self.symbols[i] = moved
+            self._index[moved] = i
+            self.timestamps[i] = self.timestamps[last]
+            self.probabilities[i] = self.probabilities[last]
+            self.states[i] = self.states[last]
+            self.price_levels[i] = self.price_levels[last]
+
+        self.symbols.pop()
+        self._size = last
+
+    def clear(self):
+        """全シグナルを削除（確保済みの配列はそのまま再利用）"""
+        self.symbols.clear()
+        self._index.clear()
+        self._size = 0
+
+    def expire(self, now: float, max_age_seconds: float) -> List[str]:
+        """
+        期限切れのシグナルを削除
+
+        Args:
+            now: 現在時刻（秒）
+            max_age_seconds: 有効期限（秒）
+
+        Returns:
+            削除したシンボルのリスト
+        """
+        alive = (now - self.timestamps[:self._size]) <= max_age_seconds
+        if alive.all():
+            return []
+
+        expired = [self.symbols[i] for i in np.flatnonzero(~alive)]
+        for symbol in expired:
+            del self[symbol]
+        return expired
+
+    def _grow(self):
+        """配列の容量を倍に拡張"""
+        capacity = 2 * len(self.timestamps)
+        for name in ('timestamps', 'probabilities', 'states', 'price_levels'):
+            old = getattr(self, name)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[:self._size] = old[:self._size]
+            setattr(self, name, new)
+
 
 class EnsembleModel:
     """HMMとLightGBMを統合したアンサンブルモデル"""
 
+    # 価格方向ラベル（LightGBMのクラス番号順）
+    _DIR3 = ('Down', 'Range', 'Up')
+    _DIR2 = ('Down', 'Up')
+
     def __init__(
         self,
         hmm_model: Optional[MarketRegimeHMM] = None,
@@ -44,8 +199,20 @@ class EnsembleModel:
 
         self.is_fitted = False
 
+        # 学習時の特徴量カラム（hmm_state除く）
+        self._feature_cols: Optional[List[str]] = None
+        # _feature_colsを全て含むと確認済みのカラムIndex（同一オブジェクトなら再チェック不要）
+        self._checked_columns: Optional[pd.Index] = None
+
+        # HMM状態ラベル（状態番号順、学習・読み込み時に確定）
+        self._state_label_tuple: Tuple[str, ...] = ()
+
+        # 特徴量+HMM状態の結合用バッファ（predict毎の再確保を回避）
+        # 並列predictで共有しないようスレッドごとに保持
+        self._feat_buffers = threading.local()
+
         # 押し目待ちモード用の待機シグナル管理
-        self.pending_signals: Dict[str, Dict] = {}
+        self.pending_signals = _PendingSignalStore()
 
         # 押し目判定パラメータ
         self.dip_config = {
@@ -94,18 +261,24 @@ class EnsembleModel:
             feature_cols=feature_cols,
             test_size=0.2
         )
+        self._feature_cols = list(feature_names)
+        self._checked_columns = None
 
         # HMMの状態を特徴量として追加（オプション）
         if self.use_state_adjustment:
             states_train = self.hmm_model.predict_states(df_train)
             # データサイズを合わせる
             states_train = states_train[:len(y_train)]
-            X_train = np.column_stack([X_train, states_train])
+            X_train = self._stack_hmm_state(X_train, states_train, reuse_buffer=False)
             feature_names = feature_names + ['hmm_state']
+        else:
+            X_train = np.ascontiguousarray(X_train, dtype=np.float32)
 
         self.lgbm_model.fit(X_train, y_train, feature_names=feature_names)
         logger.info("  ✓ LightGBMモデル学習完了")
 
+        self._state_label_tuple = self._build_state_label_tuple()
+
         self.is_fitted = True
         logger.info("アンサンブルモデル学習完了")
 
@@ -132,12 +305,29 @@ class EnsembleModel:
         # HMMで市場状態を予測
         hmm_states = self.hmm_model.predict_states(df)
 
-        # LightGBM用の特徴量を準備
-        exclude_cols = ['timestamp', 'datetime', 'future_return',
-                       'target_direction', 'target_binary', 'target_return',
-                       'open', 'high', 'low', 'close', 'volume']
-        feature_cols = [col for col in df.columns if col not in exclude_cols]
-        X = df[feature_cols].values
+        return self._predict_with_states(df, hmm_states, return_probabilities)
+
+    def _predict_with_states(
+        self,
+        df: pd.DataFrame,
+        hmm_states: np.ndarray,
+        return_probabilities: bool = False
+    ) -> np.ndarray:
+        """
+        HMM状態を受け取ってLightGBMで予測
+
+        Args:
+            df: 予測データ
+            hmm_states: HMM状態配列
+            return_probabilities: 確率を返すか（Falseの場合はクラスラベル）
+
+        Returns:
+            予測結果（クラスラベルまたは確率）
+        """
+        # LightGBM用の特徴量を準備（学習時のカラムをそのまま使用）
+        feature_cols = self._resolve_feature_cols(df)
+        # float32で取り出す（LightGBMはfloat32をそのまま受け付ける）
+        X = df.loc[:, feature_cols].to_numpy(dtype=np.float32, copy=False)
 
         # データサイズ調整
         min_len = min(len(X), len(hmm_states))
@@ -146,22 +336,81 @@ class EnsembleModel:
 
         # HMM状態を特徴量に追加（学習時と同様）
         if self.use_state_adjustment:
-            X = np.column_stack([X, hmm_states])
+            X = self._stack_hmm_state(X, hmm_states)
+        else:
+            X = np.ascontiguousarray(X)
 
-        # LightGBMで予測
+        # LightGBMで予測（行方向の並列化はLightGBM内部のnum_threadsに任せる）
         if return_probabilities:
-            lgbm_proba = self.lgbm_model.predict_proba(X)
-            return lgbm_proba
+            return self.lgbm_model.predict_proba(X)
+        return self.lgbm_model.predict(X)
+
+    def _resolve_feature_cols(self, df: pd.DataFrame) -> List[str]:
+        """
+        LightGBMに渡す特徴量カラムを決定
+
+        Args:
+            df: 予測データ
+
+        Returns:
+            特徴量カラム名リスト
+        """
+        columns = df.columns
+        if self._feature_cols is not None:
+            if columns is self._checked_columns:
+                return self._feature_cols
+            if set(columns).issuperset(self._feature_cols):
+                self._checked_columns = columns
+                return self._feature_cols
+            logger.warning("学習時の特徴量カラムが不足しているため、カラムを再選択します")
+        return [col for col in columns if col not in _EXCLUDE_COLS]
+
+    def _stack_hmm_state(
+        self,
+        X: np.ndarray,
+        hmm_states: np.ndarray,
+        reuse_buffer: bool = True
+    ) -> np.ndarray:
+        """
+        特徴量の末尾にHMM状態列を追加（float32）
+
+        Args:
+            X: 特徴量 (n_samples, n_features)
+            hmm_states: HMM状態 (n_samples,)
+            reuse_buffer: 呼び出しスレッドの内部バッファを再利用するか（Falseの場合は新規確保）
+
+        Returns:
+            結合済み特徴量 (n_samples, n_features + 1)
+        """
+        n_rows, n_features = X.shape
+        shape = (n_rows, n_features + 1)
+
+        if not reuse_buffer:
+            out = np.empty(shape, dtype=np.float32)
         else:
-            lgbm_pred = self.lgbm_model.predict(X)
-            return lgbm_pred
+            buf = getattr(self._feat_buffers, 'buf', None)
+            if buf is None or buf.shape[0] < n_rows or buf.shape[1] != shape[1]:
+                buf = np.empty(shape, dtype=np.float32)
+                self._feat_buffers.buf = buf
+            out = buf[:n_rows]
+
+        out[:, :n_features] = X
+        out[:, n_features] = hmm_states
+        return out
 
-    def predict_with_state_info(self, df: pd.DataFrame) -> Dict:
+    def predict_with_state_info(
+        self,
+        df: pd.DataFrame,
+        hmm_lookback: int = 200,
+        compact: bool = False
+    ) -> Dict:
         """
-        市場状態情報付きで予測
+        市場状態情報付きで予測（最新時点）
 
         Args:
             df: 予測データ
+            hmm_lookback: HMMの状態推定に使う直近の行数
+            compact: Trueの場合は全クラス確率のリスト（all_*）を省略
 
         Returns:
             予測情報の辞書
@@ -169,104 +418,97 @@ class EnsembleModel:
         if not self.is_fitted:
             raise ValueError("モデルが学習されていません。")
 
-        # HMMで市場状態を予測
-        hmm_states = self.hmm_model.predict_states(df)
-        hmm_proba = self.hmm_model.predict_proba(df)
+        # HMMで最新の市場状態を予測（直近のみforwardパス）
+        current_state_proba = self.hmm_model.predict_proba_last(df, lookback=hmm_lookback)
+        current_state = int(current_state_proba.argmax())
+
+        # LightGBMで最新行の価格方向を予測
+        # 確率から直接クラスを決める（LightGBMの推論は1回のみ）
+        lgbm_proba = self._predict_with_states(
+            df.iloc[-1:], np.array([current_state]), return_probabilities=True
+        )
 
-        # LightGBMで価格方向を予測
-        lgbm_pred = self.predict(df, return_probabilities=False)
-        lgbm_proba = self.predict(df, return_probabilities=True)
+        return self._build_prediction_info(current_state_proba, lgbm_proba[-1], compact)
+
+    def _build_prediction_info(
+        self,
+        state_proba: np.ndarray,
+        direction_proba: Union[np.ndarray, float],
+        compact: bool = False
+    ) -> Dict:
+        """
+        HMM事後確率とLightGBM確率（1行分）から予測情報の辞書を作成
 
-        # 最新の予測
-        current_state = int(hmm_states[-1])
-        current_state_label = self.hmm_model.state_labels.get(current_state, f'State_{current_state}')
-        current_direction = int(lgbm_pred[-1])
+        Args:
+            state_proba: HMM状態確率 (n_states,)
+            direction_proba: LightGBM確率（マルチクラス: (n_classes,), バイナリ: スカラー）
+            compact: Trueの場合は全クラス確率のリスト（all_*）を省略
 
-        # 3クラス分類の場合
-        if self.lgbm_model.n_classes == 3:
-            direction_map = {0: 'Down', 1: 'Range', 2: 'Up'}
+        Returns:
+            予測情報の辞書
+        """
+        current_state = int(state_proba.argmax())
+        if self.lgbm_model.n_classes > 2:
+            current_direction = int(direction_proba.argmax())
         else:
-            direction_map = {0: 'Down', 1: 'Up'}
+            current_direction = int(direction_proba > 0.5)
 
-        current_direction_label = direction_map.get(current_direction, f'Class_{current_direction}')
+        if not self._state_label_tuple:
+            self._state_label_tuple = self._build_state_label_tuple()
+        current_state_label = self._state_label_tuple[current_state]
+        current_direction_label = (
+            self._DIR3 if self.lgbm_model.n_classes == 3 else self._DIR2
+        )[current_direction]
 
         result = {
             'state': current_state,
             'state_label': current_state_label,
-            'state_probability': float(hmm_proba[-1][current_state]),
+            'state_probability': float(state_proba[current_state]),
             'direction': current_direction,
             'direction_label': current_direction_label,
-            'direction_probability': float(lgbm_proba[-1][current_direction]) if self.lgbm_model.n_classes > 2 else float(lgbm_proba[-1]),
-            'all_state_probabilities': hmm_proba[-1].tolist(),
-            'all_direction_probabilities': lgbm_proba[-1].tolist() if self.lgbm_model.n_classes > 2 else [1-lgbm_proba[-1], lgbm_proba[-1]]
+            'direction_probability': float(direction_proba[current_direction]) if self.lgbm_model.n_classes > 2 else float(direction_proba)
         }
 
+        if not compact:
+            result['all_state_probabilities'] = state_proba.tolist()
+            result['all_direction_probabilities'] = direction_proba.tolist() if self.lgbm_model.n_classes > 2 else [1-direction_proba, direction_proba]
+
         return result
 
-    def _check_dip_condition(self, df: pd.DataFrame) -> Tuple[bool, str]:
+    def _build_state_label_tuple(self) -> Tuple[str, ...]:
+        """HMMの状態ラベル辞書を状態番号順のタプルに変換"""
+        labels = self.hmm_model.state_labels
+        return tuple(labels.get(i, f'State_{i}') for i in range(self.hmm_model.n_states))
+
+    def _check_dip_condition(self, latest: Dict) -> Tuple[bool, str]:
         """
         押し目（買い場）条件をチェック
 
         Args:
-            df: 最新データ
+            latest: 最新行の値（カラム名 → 値）
 
         Returns:
             (押し目かどうか, 理由)
         """
-        reasons = []
-
-        # RSIチェック
-        if 'rsi' in df.columns:
-            current_rsi = df['rsi'].iloc[-1]
-            if current_rsi < self.dip_config['rsi_threshold']:
-                reasons.append(f"RSI={current_rsi:.1f}<{self.dip_config['rsi_threshold']}")
-
-        # 20日MA乖離チェック
-        if 'sma20_distance' in df.columns:
-            sma_dist = df['sma20_distance'].iloc[-1]
-            if sma_dist < self.dip_config['sma_distance_threshold']:
-                reasons.append(f"MA乖離={sma_dist:.2%}")
-
-        # 5日リターンチェック
-        if 'return_5' in df.columns:
-            ret_5d = df['return_5'].iloc[-1]
-            if ret_5d < self.dip_config['return_5d_threshold']:
-                reasons.append(f"5日変化={ret_5d:.2%}")
+        rules = [(col, op, self.dip_config[key], fmt) for col, op, key, fmt in _DIP_RULES]
+        reasons = _match_rules(latest, rules)
 
         is_dip = len(reasons) >= 1  # 1つ以上の条件を満たせば押し目
         reason_str = ", ".join(reasons) if reasons else "条件なし"
 
         return is_dip, reason_str
 
-    def _check_high_zone(self, df: pd.DataFrame) -> Tuple[bool, str]:
+    def _check_high_zone(self, latest: Dict) -> Tuple[bool, str]:
         """
         高値圏かどうかをチェック（押し目待ちすべきか判定）
 
         Args:
-            df: 最新データ
+            latest: 最新行の値（カラム名 → 値）
 
         Returns:
             (高値圏かどうか, 理由)
         """
-        reasons = []
-
-        # RSIが高い
-        if 'rsi' in df.columns:
-            current_rsi = df['rsi'].iloc[-1]
-            if current_rsi > 60:
-                reasons.append(f"RSI={current_rsi:.1f}>60")
-
-        # MAを大きく上回っている
-        if 'sma20_distance' in df.columns:
-            sma_dist = df['sma20_distance'].iloc[-1]
-            if sma_dist > 0.02:  # 2%以上上
-                reasons.append(f"MA+{sma_dist:.2%}")
-
-        # 直近で上がりすぎ
-        if 'return_5' in df.columns:
-            ret_5d = df['return_5'].iloc[-1]
-            if ret_5d > 0.03:  # 5日で3%以上上昇
-                reasons.append(f"5日+{ret_5d:.2%}")
+        reasons = _match_rules(latest, _HIGH_RULES)
 
         is_high = len(reasons) >= 2  # 2つ以上で高値圏判定
         reason_str = ", ".join(reasons) if reasons else ""
@@ -275,17 +517,15 @@ class EnsembleModel:
 
     def _cleanup_expired_signals(self):
         """期限切れの待機シグナルを削除"""
-        now = datetime.now()
-        expired = []
-
-        for symbol, sig in self.pending_signals.items():
-            age_hours = (now - sig['timestamp']).total_seconds() / 3600
-            if age_hours > self.dip_config['signal_expiry_hours']:
-                expired.append(symbol)
+        # 実行中にdip_configを変更しても反映されるよう毎回参照する
+        expiry_hours = self.dip_config['signal_expiry_hours']
+        expired = self.pending_signals.expire(
+            time.monotonic(),
+            expiry_hours * 3600
+        )
 
         for symbol in expired:
-            logger.info(f"待機シグナル期限切れ: {symbol} (発生から{self.dip_config['signal_expiry_hours']}時間経過)")
-            del self.pending_signals[symbol]
+            logger.info(f"待機シグナル期限切れ: {symbol} (発生から{expiry_hours}時間経過)")
 
     def generate_trading_signal(
         self,
@@ -311,8 +551,78 @@ class EnsembleModel:
         self._cleanup_expired_signals()
 
         # 予測情報取得
-        pred_info = self.predict_with_state_info(df)
+        # シグナル判定に全クラス確率は不要
+        pred_info = self.predict_with_state_info(df, compact=True)
+
+        return self._decide_signal(df, pred_info, confidence_threshold, symbol)
+
+    def generate_trading_signals_multi(
+        self,
+        dfs: Dict[str, pd.DataFrame],
+        confidence_threshold: float = 0.6
+    ) -> Dict[str, Dict]:
+        """
+        複数銘柄の売買シグナルをまとめて生成
 
+        各銘柄の最新行を1つの特徴量行列にまとめ、LightGBMの推論を1回で済ませる。
+        判定ロジック・待機シグナルの扱いはgenerate_trading_signal()と同じ。
+
+        Args:
+            dfs: {取引ペア: 最新データ}
+            confidence_threshold: 売買判断の確率閾値
+
+        Returns:
+            {取引ペア: シグナル情報の辞書}
+        """
+        if not self.is_fitted:
+            raise ValueError("モデルが学習されていません。")
+        if not dfs:
+            return {}
+
+        # 期限切れシグナルを削除（全銘柄で1回）
+        self._cleanup_expired_signals()
+
+        symbols = list(dfs.keys())
+
+        # HMMは銘柄ごとに直近のみforwardパス
+        state_probas = [self.hmm_model.predict_proba_last(dfs[sym]) for sym in symbols]
+        states = np.fromiter((p.argmax() for p in state_probas), dtype=np.int64, count=len(symbols))
+
+        # 最新行を (銘柄数, 特徴量数) に積んでLightGBMを1回だけ実行
+        X = np.vstack([
+            dfs[sym].iloc[-1:].loc[:, self._resolve_feature_cols(dfs[sym])].to_numpy(dtype=np.float32)
+            for sym in symbols
+        ])
+        if self.use_state_adjustment:
+            X = self._stack_hmm_state(X, states)
+        lgbm_proba = self.lgbm_model.predict_proba(X)
+
+        results = {}
+        for i, sym in enumerate(symbols):
+            pred_info = self._build_prediction_info(state_probas[i], lgbm_proba[i], compact=True)
+            results[sym] = self._decide_signal(dfs[sym], pred_info, confidence_threshold, sym)
+
+        return results
+
+    def _decide_signal(
+        self,
+        df: pd.DataFrame,
+        pred_info: Dict,
+        confidence_threshold: float,
+        symbol: str
+    ) -> Dict:
+        """
+        予測情報から売買シグナルを判定（押し目待ちモード対応）
+
+        Args:
+            df: 最新データ
+            pred_info: predict_with_state_info()形式の予測情報
+            confidence_threshold: 売買判断の確率閾値
+            symbol: 取引ペア
+
+        Returns:
+            シグナル情報の辞書
+        """
         # 基本変数
         signal = 'HOLD'
         confidence = 0.0
@@ -322,9 +632,12 @@ class EnsembleModel:
         direction = pred_info['direction']
         direction_prob = pred_info['direction_probability']
 
+        # 判定に使う列だけ最新値を取り出す（行全体は展開しない）
+        latest = {col: df[col].iat[-1] for col in _LATEST_COLUMNS if col in df.columns}
+
         # 押し目条件チェック
-        is_dip, dip_reason = self._check_dip_condition(df)
-        is_high, high_reason = self._check_high_zone(df)
+        is_dip, dip_reason = self._check_dip_condition(latest)
+        is_high, high_reason = self._check_high_zone(latest)
 
         # ========== 買いシグナル判定 ==========
         if direction == 2 and direction_prob > confidence_threshold:  # Up予測
@@ -355,10 +668,10 @@ class EnsembleModel:
                     elif is_high:
                         if symbol not in self.pending_signals:
                             self.pending_signals[symbol] = {
-                                'timestamp': datetime.now(),
+                                'timestamp': time.monotonic(),
                                 'probability': direction_prob,
                                 'state': state,
-                                'price_level': df['close'].iloc[-1] if 'close' in df.columns else 0
+                                'price_level': latest.get('close', 0)
                             }
                             logger.info(f"待機シグナル追加: {symbol} prob={direction_prob:.2%} ({high_reason})")
                         signal = 'HOLD'
@@ -392,7 +705,7 @@ class EnsembleModel:
         # ========== 待機シグナル消化チェック ==========
         elif symbol in self.pending_signals and is_dip:
             pending = self.pending_signals[symbol]
-            age_hours = (datetime.now() - pending['timestamp']).total_seconds() / 3600
+            age_hours = (time.monotonic() - pending['timestamp']) / 3600
 
             # 現在も上昇方向か確認（トレンド反転していないか）
             if direction == 2:  # まだUp予測なら買い
@@ -430,6 +743,80 @@ class EnsembleModel:
 
         return result
 
+    def generate_trading_signals_batch(
+        self,
+        df: pd.DataFrame,
+        confidence_threshold: float = 0.6
+    ) -> np.ndarray:
+        """
+        全期間の売買シグナルを一括生成（バックテスト用）
+
+        HMM・LightGBMを全期間に対して1回ずつ実行し、判定ロジックを
+        ベクトル化して適用する。HMM状態はforwardフィルタリングで求めるため
+        各行はその行までのデータだけを使う（先読みなし）。
+
+        generate_trading_signal()の近似であり、結果は一致しない:
+        - HMM状態は直近hmm_lookback行ではなく先頭からの全履歴でフィルタリングする
+        - 待機シグナル（pending_signals）は時刻依存のため扱わない
+          （高値圏で見送った買いの後の押し目買いは発生しない）
+
+        Args:
+            df: 特徴量データ
+            confidence_threshold: 売買判断の確率閾値
+
+        Returns:
+            シグナル配列（1: BUY, -1: SELL, 0: HOLD、int8）
+        """
+        if not self.is_fitted:
+            raise ValueError("モデルが学習されていません。")
+
+        # HMMで市場状態を予測（先読みなし）
+        hmm_proba = self.hmm_model.predict_filtered_proba(df)
+        hmm_states = hmm_proba.argmax(axis=1)
+
+        # LightGBMで価格方向確率を予測
+        lgbm_proba = self._predict_with_states(df, hmm_states, return_probabilities=True)
+        n_rows = len(lgbm_proba)
+        states = hmm_states[:n_rows]
+
+        if self.lgbm_model.n_classes > 2:
+            direction = lgbm_proba.argmax(axis=1)
+            direction_prob = lgbm_proba[np.arange(n_rows), direction]
+        else:
+            direction = (lgbm_proba > 0.5).astype(int)
+            direction_prob = lgbm_proba
+
+        # 押し目・高値圏判定（行ごと）
+        df_rows = df.iloc[:n_rows]
+        is_dip = np.zeros(n_rows, dtype=bool)
+        high_count = np.zeros(n_rows, dtype=np.int8)
+
+        if 'rsi' in df_rows.columns:
+            rsi = df_rows['rsi'].to_numpy()
+            is_dip |= rsi < self.dip_config['rsi_threshold']
+            high_count += rsi > 60
+        if 'sma20_distance' in df_rows.columns:
+            sma_dist = df_rows['sma20_distance'].to_numpy()
+            is_dip |= sma_dist < self.dip_config['sma_distance_threshold']
+            high_count += sma_dist > 0.02
+        if 'return_5' in df_rows.columns:
+            ret_5d = df_rows['return_5'].to_numpy()
+            is_dip |= ret_5d < self.dip_config['return_5d_threshold']
+            high_count += ret_5d > 0.03
+        is_high = high_count >= 2
+
+        # 買い: Up予測 + 状態/確率条件（押し目待ちで高値圏の場合は見送り）
+        confident = direction_prob > confidence_threshold
+        buy = (direction == 2) & confident & ((states >= 1) | (direction_prob > 0.7))
+        if self.wait_for_dip:
+            is_strong = direction_prob >= self.dip_config['strong_signal_threshold']
+            buy &= is_strong | is_dip | ~is_high
+
+        # 売り: Down予測 + 状態/確率条件
+        sell = (direction == 0) & confident & ((states == 0) | (direction_prob > 0.7))
+
+        return buy.astype(np.int8) - sell.astype(np.int8)
+
     def _generate_recommendation(
         self,
         signal: str,
@@ -475,18 +862,33 @@ class EnsembleModel:
         # 予測
         predictions = self.predict(df_test)
 
-        # 実際の値（LightGBMと同じラベル形式に変換）
-        if target_col == 'target_direction':
-            y_true_raw = df_test[target_col].values
-            y_true = np.where(y_true_raw == -1, 0, np.where(y_true_raw == 0, 1, 2))
-        else:
-            y_true = df_test[target_col].values
+        # 実際の値
+        y_true = df_test[target_col].values
 
         # データサイズ調整
         min_len = min(len(predictions), len(y_true))
         predictions = predictions[:min_len]
         y_true = y_true[:min_len]
 
+        # LightGBMと同じラベル形式に変換
+        if target_col == 'target_direction':
+            y_true_raw = y_true.astype(np.float64, copy=False)
+
+            # ターゲットが未確定の行（末尾の先読み期間など）は評価対象外
+            valid = ~np.isnan(y_true_raw)
+            if not valid.all():
+                logger.warning(f"ターゲットに欠損値あり - 評価から除外します（{int((~valid).sum())}件）")
+                y_true_raw = y_true_raw[valid]
+                predictions = predictions[valid]
+
+            if len(y_true_raw) == 0:
+                raise ValueError("評価できるターゲットがありません")
+            if y_true_raw.min() < -1 or y_true_raw.max() > 1:
+                raise ValueError("target_directionは-1/0/1のみ指定できます")
+
+            # {-1, 0, 1} → {0, 1, 2} は +1 で一致（int8へ直接書き出し）
+            y_true = np.add(y_true_raw, 1, dtype=np.int8, casting='unsafe')
+
         # 精度計算
         from sklearn.metrics import accuracy_score, classification_report
 
@@ -520,24 +922,31 @@ class EnsembleModel:
         Args:
             filepath: 保存先パス
         """
-        Path(filepath).parent.mkdir(parents=True, exist_ok=True)
+        path = Path(filepath)
+        path.parent.mkdir(parents=True, exist_ok=True)
 
-        # 個別モデルを保存
-        hmm_path = str(Path(filepath).parent / f"{Path(filepath).stem}_hmm.pkl")
-        lgbm_path = str(Path(filepath).parent / f"{Path(filepath).stem}_lgbm.pkl")
+        # 個別モデルを保存（HMM/LightGBMの書き込みを並行実行）
+        hmm_path = str(path.with_name(f"{path.stem}_hmm.pkl"))
+        lgbm_path = str(path.with_name(f"{path.stem}_lgbm.pkl"))
 
-        self.hmm_model.save(hmm_path)
-        self.lgbm_model.save(lgbm_path)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            futures = [
+                executor.submit(self.hmm_model.save, hmm_path),
+                executor.submit(self.lgbm_model.save, lgbm_path)
+            ]
+            for future in futures:
+                future.result()
 
         # アンサンブル設定を保存
         ensemble_data = {
             'use_state_adjustment': self.use_state_adjustment,
             'is_fitted': self.is_fitted,
+            'feature_cols': self._feature_cols,
             'hmm_path': hmm_path,
             'lgbm_path': lgbm_path
         }
 
-        joblib.dump(ensemble_data, filepath, compress=3)
+        joblib.dump(ensemble_data, filepath, compress=MODEL_COMPRESS)
 
         logger.info(f"アンサンブルモデル保存: {filepath}")
 
@@ -550,15 +959,26 @@ class EnsembleModel:
         """
         ensemble_data = joblib.load(filepath)
 
-        # 個別モデルを読み込み
-        self.hmm_model = MarketRegimeHMM()
-        self.hmm_model.load(ensemble_data['hmm_path'])
+        # 個別モデルを読み込み（並行実行）
+        hmm_model = MarketRegimeHMM()
+        lgbm_model = PriceDirectionLGBM()
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            futures = [
+                executor.submit(hmm_model.load, ensemble_data['hmm_path']),
+                executor.submit(lgbm_model.load, ensemble_data['lgbm_path'])
+            ]
+            for future in futures:
+                future.result()
 
-        self.lgbm_model = PriceDirectionLGBM()
-        self.lgbm_model.load(ensemble_data['lgbm_path'])
+        self.hmm_model = hmm_model
+        self.lgbm_model = lgbm_model
 
         self.use_state_adjustment = ensemble_data['use_state_adjustment']
         self.is_fitted = ensemble_data['is_fitted']
+        self._feature_cols = ensemble_data.get('feature_cols')
+        self._checked_columns = None
+        self._state_label_tuple = self._build_state_label_tuple()
 
         logger.info(f"アンサンブルモデル読み込み: {filepath}")
 
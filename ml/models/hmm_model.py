@@ -8,12 +8,25 @@ import pandas as pd
 import logging
 from typing import Tuple, List, Optional, Dict
 import joblib
+import weakref
 from pathlib import Path
 from hmmlearn import hmm
 from sklearn.preprocessing import StandardScaler
 
+# hmmlearnのC++カーネル（Viterbi/forward/backward）を直接使う
+try:
+    from hmmlearn import _hmmc
+    HAS_HMMC = True
+except ImportError:
+    HAS_HMMC = False
+
+from utils.constants import MODEL_COMPRESS
+
 logger = logging.getLogger(__name__)
 
+# 特徴量エンコード結果のキャッシュ保持数
+ENCODE_CACHE_SIZE = 4
+
 
 class MarketRegimeHMM:
     """市場レジーム（状態）を分類するHMMモデル"""
@@ -49,6 +62,15 @@ class MarketRegimeHMM:
         # 状態の意味（学習後に推定）
         self.state_labels = {}
 
+        # 特徴量エンコード結果のキャッシュ（新しい順）
+        # [{'ref': DataFrameへの弱参照, 'key': (形状, 末尾インデックス), 'X_scaled': 標準化済み,
+        #   'states': 状態, 'posteriors': 状態確率}, ...]
+        self._encode_cache: List[Dict] = []
+
+        # 学習済みパラメータから導出した定数（fit/load時に計算）
+        # {'log_startprob', 'log_transmat', 'means', 'prec_chol', 'log_norm'}
+        self._param_cache: Dict[str, np.ndarray] = {}
+
         logger.info(f"HMMモデル初期化: {n_states}状態")
 
     def prepare_features(self, df: pd.DataFrame) -> np.ndarray:
@@ -61,46 +83,222 @@ class MarketRegimeHMM:
         Returns:
             特徴量配列 (n_samples, n_features)
         """
-        features = []
+        columns = df.columns
+        cols = []
 
         # 1. リターン
-        if 'return_1' in df.columns:
-            features.append(df['return_1'].values)
+        if 'return_1' in columns:
+            cols.append('return_1')
 
         # 2. ボラティリティ
-        if 'volatility_20' in df.columns:
-            features.append(df['volatility_20'].values)
-        elif 'atr' in df.columns:
-            features.append(df['atr'].values / df['close'].values)
+        use_atr = False
+        if 'volatility_20' in columns:
+            cols.append('volatility_20')
+        elif 'atr' in columns:
+            cols.append('atr')
+            use_atr = True
 
         # 3. トレンド強度（ADX）
-        if 'adx' in df.columns:
-            features.append(df['adx'].values / 100.0)  # 0-1に正規化
+        if 'adx' in columns:
+            cols.append('adx')
 
         # 4. モメンタム（RSI）
-        if 'rsi' in df.columns:
-            features.append((df['rsi'].values - 50) / 50.0)  # -1～1に正規化
+        if 'rsi' in columns:
+            cols.append('rsi')
 
         # 5. 出来高変化
-        if 'volume_change' in df.columns:
-            features.append(df['volume_change'].values)
-
-        # フォールバック: 最低限の特徴量（リターンとボラティリティ）
-        if len(features) == 0:
+        if 'volume_change' in columns:
+            cols.append('volume_change')
+
+        if cols:
+            # 全カラムを一度に取り出し (n_samples, n_features)、正規化は列ごとにin-place
+            X = df.loc[:, cols].to_numpy(dtype=np.float64)
+
+            if use_atr:
+                X[:, cols.index('atr')] /= df['close'].to_numpy()
+            if 'adx' in cols:
+                X[:, cols.index('adx')] /= 100.0  # 0-1に正規化
+            if 'rsi' in cols:
+                i = cols.index('rsi')
+                X[:, i] -= 50
+                X[:, i] /= 50.0  # -1～1に正規化
+        else:
+            # フォールバック: 最低限の特徴量（リターンとボラティリティ）
             returns = df['close'].pct_change()
             volatility = returns.rolling(window=20).std()
-            features = [returns.values, volatility.values]
-
-        # (n_features, n_samples) → (n_samples, n_features)
-        X = np.column_stack(features)
+            X = np.column_stack([returns.to_numpy(), volatility.to_numpy()])
 
         # NaN除去
-        X = pd.DataFrame(X).dropna().values
+        X = X[~np.isnan(X).any(axis=1)]
 
         logger.info(f"HMM特徴量準備完了: {X.shape}")
 
         return X
 
+    @staticmethod
+    def _cache_key(df: pd.DataFrame) -> tuple:
+        """キャッシュ照合用の軽量キー（形状・末尾インデックス・最終行の値のハッシュ）"""
+        if len(df) == 0:
+            return df.shape, None, 0
+        last_hash = int(pd.util.hash_pandas_object(df.iloc[-1:], index=True).iloc[0])
+        return df.shape, df.index[-1], last_hash
+
+    def _encode(self, df: pd.DataFrame, use_cache: bool = True) -> Dict:
+        """
+        特徴量を準備・標準化（同じDataFrameの結果はキャッシュから再利用）
+
+        同じデータに対するpredict_states/predict_probaの連続呼び出しで
+        特徴量準備・標準化・Viterbi・forward-backwardを再計算しないためのキャッシュ。
+        同一のDataFrameオブジェクトで形状・末尾インデックス・最終行の値も一致した場合のみヒットする。
+        最終行の書き換えは検知するが、それより前の行だけを書き換えた場合は検知しないため、
+        途中の行を変更したDataFrameはコピーしてから渡すこと。
+
+        Args:
+            df: 予測データ
+            use_cache: Falseの場合はキャッシュを参照・登録しない（毎回異なるスライス等）
+
+        Returns:
+            エントリ（'X_scaled'、計算済みなら'states', 'posteriors'）
+        """
+        if not use_cache:
+            return {'X_scaled': self._scale(self.prepare_features(df))}
+
+        key = self._cache_key(df)
+        for i, entry in enumerate(self._encode_cache):
+            if entry['ref']() is df and entry['key'] == key:
+                if i:
+                    self._encode_cache.insert(0, self._encode_cache.pop(i))
+                return entry
+
+        entry = {
+            'ref': weakref.ref(df),
+            'key': key,
+            'X_scaled': self._scale(self.prepare_features(df))
+        }
+        self._encode_cache.insert(0, entry)
+        del self._encode_cache[ENCODE_CACHE_SIZE:]
+
+        return entry
+
+    def _precompute_params(self):
+        """
+        推論で毎回使う定数を学習済みパラメータから事前計算
+
+        共分散行列のCholesky分解から精度行列の下三角因子と正規化項を求めておき、
+        観測尤度の計算で毎回の分解・行列式計算を省く。
+        """
+        covars = self.model.covars_
+        n_features = covars.shape[1]
+
+        # Σ = L L^T → 精度行列の因子 P = (L^-1)^T、 log|Σ|^(-1/2) = Σ log diag(P)
+        chol = np.linalg.cholesky(covars)
+        prec_chol = np.linalg.inv(chol).transpose(0, 2, 1)
+        log_det_prec = np.log(np.diagonal(prec_chol, axis1=1, axis2=2)).sum(axis=1)
+
+        self._param_cache = {
+            'means': self.model.means_,
+            'prec_chol': prec_chol,
+            'log_norm': log_det_prec - 0.5 * n_features * np.log(2 * np.pi)
+        }
+
+    def _log_emission(self, X_scaled: np.ndarray) -> np.ndarray:
+        """
+        各状態の観測対数尤度を計算（事前計算した定数を使用）
+
+        Args:
+            X_scaled: 標準化済み特徴量 (n_samples, n_features)
+
+        Returns:
+            対数尤度 (n_samples, n_states)
+        """
+        if not self._param_cache:
+            self._precompute_params()
+        cache = self._param_cache
+
+        # (n_samples, n_states, n_features) のマハラノビス変換
+        diff = X_scaled[:, None, :] - cache['means'][None, :, :]
+        y = np.einsum('tkf,kfg->tkg', diff, cache['prec_chol'])
+
+        return cache['log_norm'] - 0.5 * np.einsum('tkg,tkg->tk', y, y)
+
+    def _emission_prob(self, X_scaled: np.ndarray) -> np.ndarray:
+        """
+        観測尤度（アンダーフロー防止のため行ごとに最大値で正規化）
+
+        行ごとの定数倍はフィルタリング・事後確率の正規化で打ち消される
+
+        Args:
+            X_scaled: 標準化済み特徴量 (n_samples, n_features)
+
+        Returns:
+            正規化済み尤度 (n_samples, n_states)
+        """
+        log_likelihood = self._log_emission(X_scaled)
+        return np.exp(log_likelihood - log_likelihood.max(axis=1, keepdims=True))
+
+    def _decode_viterbi(self, X_scaled: np.ndarray) -> np.ndarray:
+        """
+        Viterbiアルゴリズムで状態系列をデコード
+
+        事前計算済みの観測対数尤度をC++カーネルに直接渡し、
+        hmmlearnの呼び出し毎のパラメータ検証・共分散分解を省く
+
+        Args:
+            X_scaled: 標準化済み特徴量
+
+        Returns:
+            状態配列 (n_samples,)
+        """
+        if not HAS_HMMC:
+            return self.model.predict(X_scaled)
+
+        _, states = _hmmc.viterbi(
+            self.model.startprob_, self.model.transmat_, self._log_emission(X_scaled)
+        )
+        return states
+
+    def _posteriors(self, X_scaled: np.ndarray) -> np.ndarray:
+        """
+        forward-backwardで各時点の状態事後確率を計算
+
+        Args:
+            X_scaled: 標準化済み特徴量
+
+        Returns:
+            事後確率 (n_samples, n_states)
+        """
+        if not HAS_HMMC:
+            _, posteriors = self.model.score_samples(X_scaled)
+            return posteriors
+
+        startprob = self.model.startprob_
+        transmat = self.model.transmat_
+        frameprob = self._emission_prob(X_scaled)
+
+        _, fwdlattice, scaling = _hmmc.forward_scaling(startprob, transmat, frameprob)
+        bwdlattice = _hmmc.backward_scaling(startprob, transmat, frameprob, scaling)
+
+        posteriors = fwdlattice * bwdlattice
+        posteriors /= posteriors.sum(axis=1, keepdims=True)
+        return posteriors
+
+    def _scale(self, X: np.ndarray) -> np.ndarray:
+        """
+        学習済みスケーラーで標準化（scaler.transformと同じ演算）
+
+        出力バッファを1つだけ確保して減算・除算をin-placeで行う。
+        Xは書き換えない。
+
+        Args:
+            X: 特徴量 (n_samples, n_features)
+
+        Returns:
+            標準化済み特徴量
+        """
+        X_scaled = np.subtract(X, self.scaler.mean_)
+        X_scaled /= self.scaler.scale_
+        return X_scaled
+
     def fit(self, df: pd.DataFrame) -> 'MarketRegimeHMM':
         """
         HMMモデルを学習
@@ -123,6 +321,10 @@ class MarketRegimeHMM:
         self.model.fit(X_scaled)
         self.is_fitted = True
 
+        # 学習データのエンコード結果をキャッシュ（_interpret_states等で再利用）
+        self._encode_cache = [{'ref': weakref.ref(df), 'key': self._cache_key(df), 'X_scaled': X_scaled}]
+        self._precompute_params()
+
         # 状態の意味を推定
         self._interpret_states(df)
 
@@ -140,19 +342,17 @@ class MarketRegimeHMM:
             df: 予測データ
 
         Returns:
-            状態配列 (n_samples,)
+            状態配列 (n_samples,)（キャッシュとは別のコピー）
         """
         if not self.is_fitted:
             raise ValueError("モデルが学習されていません。先にfit()を実行してください。")
 
-        # 特徴量準備
-        X = self.prepare_features(df)
-
-        # 標準化
-        X_scaled = self.scaler.transform(X)
+        entry = self._encode(df)
 
         # 最も可能性の高い状態系列をデコード（Viterbiアルゴリズム）
-        states = self.model.predict(X_scaled)
+        if 'states' not in entry:
+            entry['states'] = self._decode_viterbi(entry['X_scaled'])
+        states = entry['states'].copy()
 
         logger.debug(f"状態予測完了: {len(states)}サンプル")
 
@@ -166,24 +366,89 @@ class MarketRegimeHMM:
             df: 予測データ
 
         Returns:
-            確率配列 (n_samples, n_states)
+            確率配列 (n_samples, n_states)（キャッシュとは別のコピー）
         """
         if not self.is_fitted:
             raise ValueError("モデルが学習されていません。先にfit()を実行してください。")
 
-        # 特徴量準備
-        X = self.prepare_features(df)
-
-        # 標準化
-        X_scaled = self.scaler.transform(X)
+        entry = self._encode(df)
 
         # 状態確率を計算
-        log_prob, posteriors = self.model.score_samples(X_scaled)
+        if 'posteriors' not in entry:
+            entry['posteriors'] = self._posteriors(entry['X_scaled'])
+        posteriors = entry['posteriors'].copy()
 
         logger.debug(f"状態確率予測完了: {posteriors.shape}")
 
         return posteriors
 
+    def predict_filtered_proba(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        各時点までのデータのみを使った状態確率を予測（フィルタリング）
+
+        forwardパスのみで計算するため先読みがなく、各行の値は
+        その行までのデータでpredict_proba()を実行した最終行と一致する
+
+        Args:
+            df: 予測データ
+
+        Returns:
+            確率配列 (n_samples, n_states)
+        """
+        if not self.is_fitted:
+            raise ValueError("モデルが学習されていません。先にfit()を実行してください。")
+
+        return self._filtered_proba(self._encode(df)['X_scaled'])
+
+    def _filtered_proba(self, X_scaled: np.ndarray) -> np.ndarray:
+        """
+        forwardパスで各時点のフィルタ確率を計算
+
+        Args:
+            X_scaled: 標準化済み特徴量
+
+        Returns:
+            確率配列 (n_samples, n_states)
+        """
+        emission = self._emission_prob(X_scaled)
+        transmat = self.model.transmat_
+
+        # スケーリング付きforwardアルゴリズム（各行が正規化済みのforward変数＝フィルタ確率）
+        if HAS_HMMC:
+            _, filtered, _ = _hmmc.forward_scaling(self.model.startprob_, transmat, emission)
+        else:
+            filtered = np.empty_like(emission)
+            alpha = self.model.startprob_ * emission[0]
+            filtered[0] = alpha / alpha.sum()
+            for t in range(1, len(emission)):
+                alpha = (filtered[t - 1] @ transmat) * emission[t]
+                filtered[t] = alpha / alpha.sum()
+
+        logger.debug(f"フィルタリング状態確率予測完了: {filtered.shape}")
+
+        return filtered
+
+    def predict_proba_last(self, df: pd.DataFrame, lookback: int = 200) -> np.ndarray:
+        """
+        最新時点の状態確率のみを予測
+
+        直近lookback行だけをforwardパスで処理するため、
+        データ長に関係なく計算量はO(lookback)
+
+        Args:
+            df: 予測データ
+            lookback: 使用する直近の行数
+
+        Returns:
+            確率配列 (n_states,)
+        """
+        if not self.is_fitted:
+            raise ValueError("モデルが学習されていません。先にfit()を実行してください。")
+
+        # 毎回新しいスライスのためキャッシュしない（有用なエントリを追い出さない）
+        X_scaled = self._encode(df.iloc[-lookback:], use_cache=False)['X_scaled']
+        return self._filtered_proba(X_scaled)[-1]
+
     def get_current_state(self, df: pd.DataFrame, lookback: int = 50) -> Dict:
         """
         現在の市場状態を取得
@@ -195,12 +460,15 @@ class MarketRegimeHMM:
         Returns:
             状態情報の辞書
         """
-        # 最新N期間のデータ
-        df_recent = df.tail(lookback)
+        if not self.is_fitted:
+            raise ValueError("モデルが学習されていません。先にfit()を実行してください。")
+
+        # 最新N期間のデータ（位置スライス、毎回新しいスライスのためキャッシュしない）
+        df_recent = df.iloc[-lookback:]
 
-        # 状態予測
-        states = self.predict_states(df_recent)
-        proba = self.predict_proba(df_recent)
+        # 状態予測（forward-backward 1回で状態と確率を同時に求める）
+        proba = self._posteriors(self._encode(df_recent, use_cache=False)['X_scaled'])
+        states = proba.argmax(axis=1)
 
         # 最新の状態
         current_state = states[-1]
@@ -231,33 +499,51 @@ class MarketRegimeHMM:
         # 全データで状態予測
         states = self.predict_states(df)
 
-        # 元データとマージ（長さを合わせる）
-        df_temp = df.copy()
-        if 'return_1' in df_temp.columns:
-            returns = df_temp['return_1'].dropna().values[:len(states)]
+        # 元データと長さを合わせる
+        if 'return_1' in df.columns:
+            returns = df['return_1'].dropna().to_numpy()
         else:
-            returns = df_temp['close'].pct_change().dropna().values[:len(states)]
+            returns = df['close'].pct_change().dropna().to_numpy()
+        n = min(len(states), len(returns))
+        states, returns = states[:n], returns[:n]
+
+        # 各状態の件数・リターン和・二乗和を1パスで集計
+        counts = np.bincount(states, minlength=self.n_states)
+        sums = np.bincount(states, weights=returns, minlength=self.n_states)
+        sq_sums = np.bincount(states, weights=returns * returns, minlength=self.n_states)
 
-        # 各状態の平均リターンを計算
+        # 各状態の平均リターンを計算（デコード結果に現れない状態はNaN）
         state_characteristics = {}
 
         for state in range(self.n_states):
-            mask = (states == state)
-            if mask.sum() > 0:
-                avg_return = returns[mask].mean()
-                avg_volatility = returns[mask].std()
-
-                state_characteristics[state] = {
-                    'avg_return': avg_return,
-                    'avg_volatility': avg_volatility,
-                    'count': mask.sum()
-                }
+            count = int(counts[state])
+            if count:
+                avg_return = sums[state] / count
+                avg_volatility = np.sqrt(max(sq_sums[state] / count - avg_return ** 2, 0.0))
+            else:
+                avg_return = avg_volatility = np.nan
+
+            state_characteristics[state] = {
+                'avg_return': avg_return,
+                'avg_volatility': avg_volatility,
+                'count': count
+            }
 
-        # 平均リターンでソート
-        sorted_states = sorted(state_characteristics.items(), key=lambda x: x[1]['avg_return'])
+        # 平均リターンでソート（出現しない状態は末尾）
+        sorted_states = sorted(
+            state_characteristics.items(),
+            key=lambda x: (x[1]['count'] == 0, x[1]['avg_return'])
+        )
+        unseen = self.n_states - np.count_nonzero(counts)
 
         # ラベル付け
-        if self.n_states == 2:
+        self.state_labels = {}
+        if unseen:
+            # 出現しない状態があるとリターン順の意味付けができないため番号のみ
+            logger.warning(f"学習データに出現しない状態があります: {unseen}件")
+            for i, (state, _) in enumerate(sorted_states):
+                self.state_labels[state] = f'State_{i}'
+        elif self.n_states == 2:
             # 2状態: 下降/上昇
             self.state_labels = {
                 sorted_states[0][0]: 'Bear (下降)',
@@ -307,7 +593,7 @@ class MarketRegimeHMM:
             'is_fitted': self.is_fitted
         }
 
-        joblib.dump(model_data, filepath, compress=3)
+        joblib.dump(model_data, filepath, compress=MODEL_COMPRESS)
 
         logger.info(f"HMMモデル保存: {filepath}")
 
@@ -325,6 +611,10 @@ class MarketRegimeHMM:
         self.n_states = model_data['n_states']
         self.state_labels = model_data['state_labels']
         self.is_fitted = model_data['is_fitted']
+        self._encode_cache = []
+        self._param_cache = {}
+        if self.is_fitted:
+            self._precompute_params()
 
         logger.info(f"HMMモデル読み込み: {filepath}")
 
@@ -13,12 +13,17 @@ import lightgbm as lgb
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
 
+from utils.constants import MODEL_COMPRESS
+
 logger = logging.getLogger(__name__)
 
 
 class PriceDirectionLGBM:
     """価格方向を予測するLightGBMモデル"""
 
+    # device_type='auto'指定時の学習デバイス（初回の_detect_device()で確定し、以降はプロセス内で共有）
+    _detected_device: Optional[str] = None
+
     def __init__(
         self,
         n_classes: int = 3,
@@ -30,7 +35,7 @@ class PriceDirectionLGBM:
 
         Args:
             n_classes: クラス数（2: 上昇/下降、3: 上昇/横ばい/下降）
-            params: LightGBMパラメータ
+            params: LightGBMパラメータ（device_type='auto'で学習時にCUDAの利用可否を判定）
             random_state: 乱数シード
         """
         self.n_classes = n_classes
@@ -50,6 +55,10 @@ class PriceDirectionLGBM:
             'bagging_fraction': 0.8,
             'bagging_freq': 5,
             'min_data_in_leaf': 20,
+            # ビン構築（Dataset作成時間に直結）: サンプル数を抑え、メモリ上で1パス構築
+            'max_bin': 255,
+            'bin_construct_sample_cnt': 100000,
+            'two_round': False,
             'verbosity': -1,
             'seed': random_state
         }
@@ -62,10 +71,39 @@ class PriceDirectionLGBM:
         self.model = None
         self.feature_names = []
         self.feature_importance = {}
+        # gain降順の特徴量名（get_feature_importance用、Noneなら未計算）
+        self._importance_order: Optional[List[str]] = None
         self.is_fitted = False
 
         logger.info(f"LightGBMモデル初期化: {n_classes}クラス分類")
 
+    @classmethod
+    def _detect_device(cls) -> str:
+        """
+        LightGBMのCUDA学習が使えるか判定（結果はクラス単位でキャッシュ）
+
+        Returns:
+            'cuda' または 'cpu'
+        """
+        if cls._detected_device is None:
+            try:
+                probe = lgb.Dataset(
+                    np.arange(20, dtype=np.float64).reshape(10, 2),
+                    label=np.arange(10) % 2
+                )
+                lgb.train(
+                    {'device_type': 'cuda', 'objective': 'binary',
+                     'verbosity': -1, 'num_iterations': 1},
+                    probe
+                )
+                cls._detected_device = 'cuda'
+            except Exception:
+                cls._detected_device = 'cpu'
+
+            logger.info(f"LightGBM学習デバイス: {cls._detected_device}")
+
+        return cls._detected_device
+
     def prepare_data(
         self,
         df: pd.DataFrame,
@@ -98,21 +136,28 @@ class PriceDirectionLGBM:
             logger.warning("特徴量に欠損値あり - 削除します")
             df = df.dropna(subset=feature_cols)
 
+        # ターゲットが未確定の行（末尾の先読み期間など）は学習に使えない
+        if df[target_col].isna().any():
+            logger.warning("ターゲットに欠損値あり - 削除します")
+            df = df.dropna(subset=[target_col])
+
         # ターゲット変数の調整
         if target_col == 'target_direction':
             # LightGBMは0から始まる連続したラベルが必要
-            # -1, 0, 1 → 0, 1, 2
-            y_raw = df[target_col].values
-            y = np.where(y_raw == -1, 0, np.where(y_raw == 0, 1, 2))
+            y_raw = df[target_col].to_numpy(dtype=np.int8)
 
             if self.n_classes == 2:
                 # 2クラスの場合: 横ばいを上昇に含める
-                # 0(下降), 1,2(横ばい・上昇) → 0, 1
-                y = (y_raw >= 0).astype(int)
+                # -1(下降), 0,1(横ばい・上昇) → 0, 1
+                y = (y_raw >= 0).view(np.int8)
+            else:
+                # -1, 0, 1 → 0, 1, 2（+1するだけ）
+                y = y_raw + np.int8(1)
         else:
             y = df[target_col].values
 
-        X = df[feature_cols].values
+        # float32で取り出す（LightGBMはヒストグラム化するため精度は落ちない）
+        X = df[feature_cols].to_numpy(dtype=np.float32)
 
         # Train/Testデータ分割
         X_train, X_test, y_train, y_test = train_test_split(
@@ -156,17 +201,30 @@ class PriceDirectionLGBM:
                 X_train, y_train, test_size=0.2, random_state=self.random_state
             )
 
-        # LightGBM Dataset作成
-        train_data = lgb.Dataset(X_train, label=y_train, feature_name=feature_names)
-        val_data = lgb.Dataset(X_val, label=y_val, reference=train_data)
+        # ビン境界探索のサンプル数は学習データ数を上限とする（self.paramsは変更しない）
+        params = dict(self.params)
+        params['bin_construct_sample_cnt'] = min(
+            len(X_train), params.get('bin_construct_sample_cnt', 200000)
+        )
+
+        # 学習デバイス（device_type='auto'指定時のみ、CUDAビルドかつGPUがあればcuda）
+        # 推論は常にCPU。GPU向けのmax_bin等は呼び出し側でparamsに指定する
+        if params.get('device_type') == 'auto':
+            params['device_type'] = self._detect_device()
+
+        # LightGBM Dataset作成（ビン化後は生データを保持しない）
+        train_data = lgb.Dataset(
+            X_train, label=y_train, feature_name=feature_names, free_raw_data=True
+        )
+        val_data = lgb.Dataset(X_val, label=y_val, reference=train_data, free_raw_data=True)
 
         # 学習
         self.model = lgb.train(
-            self.params,
+            params,
             train_data,
             num_boost_round=num_boost_round,
-            valid_sets=[train_data, val_data],
-            valid_names=['train', 'valid'],
+            valid_sets=[val_data],  # 学習データの評価は不要（Early Stoppingは検証データのみで判定）
+            valid_names=['valid'],
             callbacks=[
                 lgb.early_stopping(stopping_rounds=early_stopping_rounds, verbose=False),
                 lgb.log_evaluation(period=0)  # ログ出力抑制
@@ -198,14 +256,17 @@ class PriceDirectionLGBM:
         if not self.is_fitted:
             raise ValueError("モデルが学習されていません。先にfit()を実行してください。")
 
-        y_pred_proba = self.model.predict(X)
+        # クラスラベルだけならsoftmax/sigmoid変換は不要（生スコアで大小関係は同じ）
+        raw_score = self.model.predict(
+            X, raw_score=True, num_threads=self.params.get('num_threads', 2)
+        )
 
         if self.n_classes > 2:
-            # マルチクラス: 最大確率のクラスを選択
-            y_pred = np.argmax(y_pred_proba, axis=1)
+            # マルチクラス: 最大スコアのクラスを選択
+            y_pred = np.argmax(raw_score, axis=1)
         else:
-            # バイナリ: 0.5で閾値
-            y_pred = (y_pred_proba > 0.5).astype(int)
+            # バイナリ: 確率0.5 ⇔ 生スコア0で閾値
+            y_pred = (raw_score > 0).astype(int)
 
         return y_pred
 
@@ -279,23 +340,19 @@ class PriceDirectionLGBM:
         importance_split = self.model.feature_importance(importance_type='split')
 
         self.feature_importance = {
-            name: {
-                'gain': float(gain),
-                'split': int(split)
-            }
-            for name, gain, split in zip(self.feature_names, importance_gain, importance_split)
+            name: {'gain': gain, 'split': split}
+            for name, gain, split in zip(
+                self.feature_names, importance_gain.tolist(), importance_split.tolist()
+            )
         }
 
-        # 重要度でソート
-        sorted_importance = sorted(
-            self.feature_importance.items(),
-            key=lambda x: x[1]['gain'],
-            reverse=True
-        )
+        # 重要度でソート（学習時に1回だけ）
+        order = np.argsort(-importance_gain, kind='stable')
+        self._importance_order = [self.feature_names[i] for i in order]
 
         logger.info("Top 10特徴量重要度:")
-        for i, (name, imp) in enumerate(sorted_importance[:10], 1):
-            logger.info(f"  {i:2d}. {name:30s} (gain: {imp['gain']:.2f})")
+        for i, name in enumerate(self._importance_order[:10], 1):
+            logger.info(f"  {i:2d}. {name:30s} (gain: {self.feature_importance[name]['gain']:.2f})")
 
     def get_feature_importance(self, top_n: int = 20) -> Dict:
         """
@@ -310,35 +367,46 @@ class PriceDirectionLGBM:
         if not self.is_fitted:
             raise ValueError("モデルが学習されていません。")
 
-        sorted_importance = sorted(
-            self.feature_importance.items(),
-            key=lambda x: x[1]['gain'],
-            reverse=True
-        )
+        if self._importance_order is None:
+            # 読み込み直後などは保存済みの重要度から1回だけ並べ替える
+            self._importance_order = sorted(
+                self.feature_importance,
+                key=lambda name: self.feature_importance[name]['gain'],
+                reverse=True
+            )
 
-        return dict(sorted_importance[:top_n])
+        return {name: self.feature_importance[name] for name in self._importance_order[:top_n]}
 
     def save(self, filepath: str):
         """
         モデルを保存
 
+        BoosterはLightGBMネイティブのテキスト形式（拡張子.txt）で保存し、
+        filepathにはパラメータ等の設定のみを保存する
+
         Args:
             filepath: 保存先パス
         """
-        Path(filepath).parent.mkdir(parents=True, exist_ok=True)
+        path = Path(filepath)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        booster_path = path.with_suffix('.txt')
+        if self.model is not None:
+            self.model.save_model(str(booster_path))
 
         model_data = {
-            'model': self.model,
+            'model_format': 'text',
             'params': self.params,
             'n_classes': self.n_classes,
             'feature_names': self.feature_names,
             'feature_importance': self.feature_importance,
+            'best_iteration': self.model.best_iteration if self.model is not None else 0,
             'is_fitted': self.is_fitted
         }
 
-        joblib.dump(model_data, filepath, compress=3)
+        joblib.dump(model_data, filepath, compress=MODEL_COMPRESS)
 
-        logger.info(f"LightGBMモデル保存: {filepath}")
+        logger.info(f"LightGBMモデル保存: {filepath} (Booster: {booster_path})")
 
     def load(self, filepath: str):
         """
@@ -346,15 +414,32 @@ class PriceDirectionLGBM:
 
         Args:
             filepath: 読み込み元パス
+
+        Raises:
+            FileNotFoundError: 学習済みモデルのBoosterファイル（.txt）がない場合
         """
         model_data = joblib.load(filepath)
 
-        self.model = model_data['model']
+        if model_data.get('model_format') == 'text':
+            booster_path = Path(filepath).with_suffix('.txt')
+            if booster_path.exists():
+                self.model = lgb.Booster(model_file=str(booster_path))
+                self.model.best_iteration = model_data['best_iteration']
+            elif model_data['is_fitted']:
+                raise FileNotFoundError(f"Boosterファイルが見つかりません: {booster_path}")
+            else:
+                # 未学習のまま保存されたモデル
+                self.model = None
+        else:
+            # 旧形式（Boosterごとpickle）
+            self.model = model_data['model']
+
         self.params = model_data['params']
         self.n_classes = model_data['n_classes']
         self.feature_names = model_data['feature_names']
         self.feature_importance = model_data['feature_importance']
-        self.is_fitted = model_data['is_fitted']
+        self._importance_order = None
+        self.is_fitted = model_data['is_fitted'] and self.model is not None
 
         logger.info(f"LightGBMモデル読み込み: {filepath}")
 
@@ -7,10 +7,85 @@ import pandas as pd
 import numpy as np
 import logging
 from typing import List, Dict, Optional
+from collections import namedtuple
 from datetime import datetime
+from numpy.lib.stride_tricks import sliding_window_view
+
+# numexprがあれば要素演算の式を1パスで評価
+# （スレッド数はプロセス全体の設定のため変更しない。必要なら環境変数NUMEXPR_NUM_THREADSで指定）
+try:
+    import numexpr as ne
+    HAS_NUMEXPR = True
+except ImportError:
+    HAS_NUMEXPR = False
 
 logger = logging.getLogger(__name__)
 
+# 元データ（OHLCV）のカラム
+BASE_COLUMNS = ('timestamp', 'open', 'high', 'low', 'close', 'volume')
+
+# 価格・出来高の水準そのものを表す特徴量。精度を保つためfloat32化の対象外
+LEVEL_FEATURE_PREFIXES = (
+    'close_lag_', 'close_ma_', 'close_std_', 'close_max_', 'close_min_',
+    'volume_ma', 'volume_lag_', 'obv_ma', 'turnover',
+)
+
+# 終値ラグ行列の最大ラグ（価格・トレンド・モメンタム・ラグ特徴量で共有）
+CLOSE_MAX_LAG = 20
+
+# 各ステージで共有する元データのndarray（o/h/l/c/vはfloat64、tsはtimestampがなければNone）
+# leadは入力カラム（技術指標）ごとの先頭NaN行数
+_Ctx = namedtuple('_Ctx', 'o h l c v ts c_lags lead')
+
+
+def _lag_matrix(values: np.ndarray, max_lag: int) -> np.ndarray:
+    """
+    ラグ値をまとめた2次元ビューを作成
+
+    Args:
+        values: 元の系列 (n,)
+        max_lag: 最大ラグ
+
+    Returns:
+        (n, max_lag + 1) のビュー。列kがk期前の値（存在しない期間はNaN）
+    """
+    padded = np.concatenate([np.full(max_lag, np.nan), values])
+    return sliding_window_view(padded, max_lag + 1)[:, ::-1]
+
+
+def _leading_nan(values: np.ndarray) -> int:
+    """
+    先頭から連続するNaNの行数を取得
+
+    Args:
+        values: 元の系列 (n,)
+
+    Returns:
+        先頭NaNの行数（全てNaNならn）
+    """
+    is_nan = np.isnan(values)
+    return len(values) if is_nan.all() else int(is_nan.argmin())
+
+
+def _crossover(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    クロスオーバーシグナルを計算
+
+    Args:
+        a: 系列A
+        b: 系列B
+
+    Returns:
+        int8配列（1: AがBを上抜け, -1: 下抜け, 0: 変化なし）。
+        先頭行は前期間がないため (A > B) の値そのもの
+    """
+    above = np.greater(a, b).view(np.int8)
+    out = np.empty_like(above)
+    if len(above):
+        out[0] = above[0]
+        np.subtract(above[1:], above[:-1], out=out[1:])
+    return out
+
 
 class FeatureEngineer:
     """特徴量エンジニアリングクラス"""
@@ -32,262 +107,382 @@ class FeatureEngineer:
         """
         logger.info(f"特徴量生成開始: {len(df)}行")
 
-        df = df.copy()
+        # 元データは最初に1回だけndarray化して各ステージで共有
+        close = df['close'].to_numpy(dtype=np.float64)
+        ctx = _Ctx(
+            o=df['open'].to_numpy(dtype=np.float64),
+            h=df['high'].to_numpy(dtype=np.float64),
+            l=df['low'].to_numpy(dtype=np.float64),
+            c=close,
+            v=df['volume'].to_numpy(dtype=np.float64),
+            ts=df['timestamp'].to_numpy() if 'timestamp' in df.columns else None,
+            c_lags=_lag_matrix(close, CLOSE_MAX_LAG),
+            lead={
+                col: _leading_nan(df[col].to_numpy())
+                for col in df.columns
+                if col not in BASE_COLUMNS and pd.api.types.is_float_dtype(df[col])
+            },
+        )
+
+        # 各ステージは新しい特徴量をこのdictに追加し、DataFrameは最後に1回だけ組み立てる
+        arrays: Dict[str, np.ndarray] = {}
+
+        # 各ステージは自身のウォームアップ行数（最大のRollingウィンドウ・ラグ）を返す
+        # 入力カラム自体のウォームアップもここに含める
+        warmup = max(ctx.lead.values(), default=0)
 
         # 1. 価格ベースの特徴量
-        df = self._add_price_features(df)
+        warmup = max(warmup, self._add_price_features(df, ctx, arrays))
 
         # 2. ボラティリティ特徴量
-        df = self._add_volatility_features(df)
+        warmup = max(warmup, self._add_volatility_features(df, ctx, arrays))
 
         # 3. トレンド特徴量
-        df = self._add_trend_features(df)
+        warmup = max(warmup, self._add_trend_features(df, ctx, arrays))
 
         # 4. モメンタム特徴量
-        df = self._add_momentum_features(df)
+        warmup = max(warmup, self._add_momentum_features(df, ctx, arrays))
 
         # 5. 出来高特徴量
-        df = self._add_volume_features(df)
+        warmup = max(warmup, self._add_volume_features(df, ctx, arrays))
 
         # 6. 時系列特徴量
-        df = self._add_temporal_features(df)
+        warmup = max(warmup, self._add_temporal_features(df, ctx, arrays))
 
         # 7. ラグ特徴量
-        df = self._add_lag_features(df)
+        warmup = max(warmup, self._add_lag_features(df, ctx, arrays))
 
         # 8. 統計特徴量
-        df = self._add_statistical_features(df)
-
-        # NaN除去（最初の期間は計算できない）
-        df = df.dropna()
+        warmup = max(warmup, self._add_statistical_features(df, ctx, arrays))
+
+        # 比率・リターン系の派生特徴量はfloat32で保持
+        # （入力の技術指標と価格水準の特徴量は精度を保つためfloat64のまま）
+        for col, values in arrays.items():
+            if values.dtype == np.float64 and not col.startswith(LEVEL_FEATURE_PREFIXES):
+                arrays[col] = values.astype(np.float32)
+
+        # 特徴量ブロックを一括で構築し、入力カラムと結合
+        # （入力と同名の特徴量は元の位置で置き換える）
+        feature_df = pd.DataFrame(arrays, index=df.index, copy=False)
+        overlap = feature_df.columns.intersection(df.columns)
+        if len(overlap):
+            df = df.assign(**{col: feature_df.pop(col) for col in overlap})
+        df = pd.concat([df, feature_df], axis=1)
+
+        # ウォームアップ期間（最初の期間は計算できない）を既知のオフセットでスライス
+        df = df.iloc[warmup:]
+
+        # 途中に欠損がある行（出来高0の区間など）を除去
+        # HMMは欠損行を除いて予測するため、残すと特徴量行と状態の対応がずれる
+        # float列のみ列ごとに調べ、行マスクに畳み込む（N×Fのマスクは作らない）
+        stray = np.zeros(len(df), dtype=bool)
+        for col in df.columns:
+            values = df[col].to_numpy()
+            if values.dtype.kind == 'f':
+                stray |= np.isnan(values)
+        if stray.any():
+            logger.warning(f"ウォームアップ期間外の欠損行を除去: {int(stray.sum())}行")
+            df = df[~stray]
 
         logger.info(f"特徴量生成完了: {len(df)}行, {len(df.columns)}列")
-        self.feature_columns = [col for col in df.columns if col not in ['timestamp', 'open', 'high', 'low', 'close', 'volume']]
+        self.feature_columns = [col for col in df.columns if col not in BASE_COLUMNS]
 
         return df
 
-    def _add_price_features(self, df: pd.DataFrame) -> pd.DataFrame:
-        """価格ベースの特徴量"""
+    def _add_price_features(self, df: pd.DataFrame, ctx: _Ctx, arrays: Dict[str, np.ndarray]) -> int:
+        """価格ベースの特徴量（戻り値はウォームアップ行数）"""
+
+        close = ctx.c
+        close_lags = ctx.c_lags
 
         # 価格変化率（リターン）
-        df['return_1'] = df['close'].pct_change(1)
-        df['return_5'] = df['close'].pct_change(5)
-        df['return_10'] = df['close'].pct_change(10)
-        df['return_20'] = df['close'].pct_change(20)
+        periods = (1, 5, 10, 20)
+        for period in periods:
+            arrays[f'return_{period}'] = close / close_lags[:, period] - 1
 
         # 対数リターン
-        df['log_return'] = np.log(df['close'] / df['close'].shift(1))
+        arrays['log_return'] = np.log(close / close_lags[:, 1])
+
+        open_, high, low = ctx.o, ctx.h, ctx.l
+        hl_range = high - low + 1e-10  # 共通の分母
 
         # 高値・安値からの価格位置
-        df['high_low_ratio'] = (df['close'] - df['low']) / (df['high'] - df['low'] + 1e-10)
+        arrays['high_low_ratio'] = (close - low) / hl_range
 
         # 終値と始値の差
-        df['close_open_ratio'] = df['close'] / df['open']
+        arrays['close_open_ratio'] = close / open_
 
         # 上下ヒゲの長さ
-        df['upper_shadow'] = (df['high'] - df[['open', 'close']].max(axis=1)) / (df['high'] - df['low'] + 1e-10)
-        df['lower_shadow'] = (df[['open', 'close']].min(axis=1) - df['low']) / (df['high'] - df['low'] + 1e-10)
+        arrays['upper_shadow'] = (high - np.maximum(open_, close)) / hl_range
+        arrays['lower_shadow'] = (np.minimum(open_, close) - low) / hl_range
 
         # ローソク実体の長さ
-        df['body_size'] = abs(df['close'] - df['open']) / df['open']
+        arrays['body_size'] = np.abs(close - open_) / open_
 
-        return df
+        return max(periods)
 
-    def _add_volatility_features(self, df: pd.DataFrame) -> pd.DataFrame:
-        """ボラティリティ特徴量"""
+    def _add_volatility_features(self, df: pd.DataFrame, ctx: _Ctx, arrays: Dict[str, np.ndarray]) -> int:
+        """ボラティリティ特徴量（戻り値はウォームアップ行数）"""
+
+        h, l, o, c = ctx.h, ctx.l, ctx.o, ctx.c
+        ln2 = np.log(2)
 
         # リターンの標準偏差（ボラティリティ）
-        df['volatility_5'] = df['return_1'].rolling(window=5).std()
-        df['volatility_10'] = df['return_1'].rolling(window=10).std()
-        df['volatility_20'] = df['return_1'].rolling(window=20).std()
+        return_1 = pd.Series(arrays['return_1'], copy=False)
+        windows = (5, 10, 20)
+        for window in windows:
+            arrays[f'volatility_{window}'] = return_1.rolling(window=window).std().to_numpy()
 
         # 高値-安値の範囲
-        df['hl_range'] = (df['high'] - df['low']) / df['close']
-        df['hl_range_ma5'] = df['hl_range'].rolling(window=5).mean()
+        hl_range = (h - l) / c
+        arrays['hl_range'] = hl_range
+        arrays['hl_range_ma5'] = pd.Series(hl_range, copy=False).rolling(window=5).mean().to_numpy()
 
-        # Parkinson's Volatility（高値・安値を使ったボラティリティ推定）
-        df['parkinson_vol'] = np.sqrt(
-            (np.log(df['high'] / df['low']) ** 2) / (4 * np.log(2))
-        )
+        if HAS_NUMEXPR:
+            # Parkinson's Volatility（高値・安値を使ったボラティリティ推定）
+            arrays['parkinson_vol'] = ne.evaluate('sqrt(log(h / l) ** 2 / (4 * ln2))')
 
-        # Garman-Klass Volatility
-        df['gk_vol'] = np.sqrt(
-            0.5 * (np.log(df['high'] / df['low']) ** 2) -
-            (2 * np.log(2) - 1) * (np.log(df['close'] / df['open']) ** 2)
-        )
+            # Garman-Klass Volatility
+            arrays['gk_vol'] = ne.evaluate(
+                'sqrt(0.5 * log(h / l) ** 2 - (2 * ln2 - 1) * log(c / o) ** 2)'
+            )
+        else:
+            # log(高値/安値)^2 は両指標で共通
+            log_hl_sq = np.log(h / l) ** 2
+
+            # Parkinson's Volatility（高値・安値を使ったボラティリティ推定）
+            arrays['parkinson_vol'] = np.sqrt(log_hl_sq / (4 * ln2))
+
+            # Garman-Klass Volatility
+            arrays['gk_vol'] = np.sqrt(
+                0.5 * log_hl_sq - (2 * ln2 - 1) * (np.log(c / o) ** 2)
+            )
 
         # ATR正規化（ボラティリティ正規化）
         if 'atr' in df.columns:
-            df['atr_pct'] = df['atr'] / df['close']
+            arrays['atr_pct'] = df['atr'].to_numpy() / c
 
         # ボラティリティレジーム（高/低）
-        if 'volatility_20' in df.columns:
-            df['vol_regime'] = (df['volatility_20'] > df['volatility_20'].rolling(window=50).mean()).astype(int)
+        volatility_20 = arrays['volatility_20']
+        vol_ma50 = pd.Series(volatility_20, copy=False).rolling(window=50).mean().to_numpy()
+        arrays['vol_regime'] = np.greater(volatility_20, vol_ma50).view(np.int8)
 
-        return df
+        # return_1は先頭1行が欠損するため、その上のRollingは1行ずれる
+        return max(max(windows), ctx.lead.get('atr', 0))
+
+    def _add_trend_features(self, df: pd.DataFrame, ctx: _Ctx, arrays: Dict[str, np.ndarray]) -> int:
+        """トレンド特徴量（戻り値はウォームアップ行数）"""
 
-    def _add_trend_features(self, df: pd.DataFrame) -> pd.DataFrame:
-        """トレンド特徴量"""
+        close = ctx.c
+        lead = ctx.lead
 
         # 移動平均からの乖離率
         if 'sma_20' in df.columns:
-            df['sma20_distance'] = (df['close'] - df['sma_20']) / df['sma_20']
-            df['sma20_crossover'] = ((df['close'] > df['sma_20']).astype(int) -
-                                     (df['close'].shift(1) > df['sma_20'].shift(1)).astype(int))
+            sma_20 = df['sma_20'].to_numpy()
+            arrays['sma20_distance'] = (close - sma_20) / sma_20
+            arrays['sma20_crossover'] = _crossover(close, sma_20)
 
         if 'sma_50' in df.columns:
-            df['sma50_distance'] = (df['close'] - df['sma_50']) / df['sma_50']
+            sma_50 = df['sma_50'].to_numpy()
+            arrays['sma50_distance'] = (close - sma_50) / sma_50
 
         if 'ema_12' in df.columns and 'ema_26' in df.columns:
-            df['ema_diff'] = (df['ema_12'] - df['ema_26']) / df['close']
+            arrays['ema_diff'] = (df['ema_12'].to_numpy() - df['ema_26'].to_numpy()) / close
 
         # 価格が上昇トレンドかどうか
-        df['uptrend_5'] = (df['close'] > df['close'].shift(5)).astype(int)
-        df['uptrend_10'] = (df['close'] > df['close'].shift(10)).astype(int)
-        df['uptrend_20'] = (df['close'] > df['close'].shift(20)).astype(int)
+        close_lags = ctx.c_lags
+        for period in (5, 10, 20):
+            arrays[f'uptrend_{period}'] = np.greater(close, close_lags[:, period]).view(np.int8)
 
         # 連続上昇/下降日数
-        df['price_up'] = (df['close'] > df['close'].shift(1)).astype(int)
-        df['consecutive_up'] = df['price_up'].groupby((df['price_up'] != df['price_up'].shift()).cumsum()).cumsum()
+        price_up = np.greater(close, close_lags[:, 1]).view(np.int8)
+        arrays['price_up'] = price_up
+        # 上昇の累積数から、直近の非上昇時点での累積数を引く（groupbyを使わないrun-length）
+        up = price_up.astype(np.int64)
+        up_count = up.cumsum()
+        reset_base = np.maximum.accumulate(np.where(up == 0, up_count, 0))
+        arrays['consecutive_up'] = up_count - reset_base
 
         # ADXベースのトレンド強度
         if 'adx' in df.columns:
-            df['strong_trend'] = (df['adx'] > 25).astype(int)
+            arrays['strong_trend'] = (df['adx'].to_numpy() > 25).view(np.int8)
 
-        return df
+        # フラグ類は欠損を含まないため、入力指標を使う乖離率のみ
+        return max(lead.get(col, 0) for col in ('sma_20', 'sma_50', 'ema_12', 'ema_26'))
 
-    def _add_momentum_features(self, df: pd.DataFrame) -> pd.DataFrame:
-        """モメンタム特徴量"""
+    def _add_momentum_features(self, df: pd.DataFrame, ctx: _Ctx, arrays: Dict[str, np.ndarray]) -> int:
+        """モメンタム特徴量（戻り値はウォームアップ行数）"""
+
+        lead = ctx.lead
 
         # RSIベース
         if 'rsi' in df.columns:
-            df['rsi_overbought'] = (df['rsi'] > 70).astype(int)
-            df['rsi_oversold'] = (df['rsi'] < 30).astype(int)
-            df['rsi_neutral'] = ((df['rsi'] >= 40) & (df['rsi'] <= 60)).astype(int)
-            df['rsi_change'] = df['rsi'].diff()
+            rsi = df['rsi']
+            rsi_values = rsi.to_numpy()
+            arrays['rsi_overbought'] = (rsi_values > 70).view(np.int8)
+            arrays['rsi_oversold'] = (rsi_values < 30).view(np.int8)
+            arrays['rsi_neutral'] = ((rsi_values >= 40) & (rsi_values <= 60)).view(np.int8)
+            arrays['rsi_change'] = rsi.diff().to_numpy()
 
         # Stochasticベース
         if 'stoch_k' in df.columns and 'stoch_d' in df.columns:
-            df['stoch_crossover'] = ((df['stoch_k'] > df['stoch_d']).astype(int) -
-                                     (df['stoch_k'].shift(1) > df['stoch_d'].shift(1)).astype(int))
+            arrays['stoch_crossover'] = _crossover(df['stoch_k'].to_numpy(), df['stoch_d'].to_numpy())
 
         # MACDベース
         if 'macd' in df.columns and 'macd_signal' in df.columns:
-            df['macd_crossover'] = ((df['macd'] > df['macd_signal']).astype(int) -
-                                    (df['macd'].shift(1) > df['macd_signal'].shift(1)).astype(int))
-            df['macd_histogram'] = df['macd'] - df['macd_signal']
-            df['macd_histogram_change'] = df['macd_histogram'].diff()
+            macd = df['macd'].to_numpy()
+            macd_signal = df['macd_signal'].to_numpy()
+            arrays['macd_crossover'] = _crossover(macd, macd_signal)
+            macd_histogram = macd - macd_signal
+            arrays['macd_histogram'] = macd_histogram
+            arrays['macd_histogram_change'] = pd.Series(macd_histogram, copy=False).diff().to_numpy()
 
         # CCIベース
         if 'cci' in df.columns:
-            df['cci_overbought'] = (df['cci'] > 100).astype(int)
-            df['cci_oversold'] = (df['cci'] < -100).astype(int)
+            cci = df['cci'].to_numpy()
+            arrays['cci_overbought'] = (cci > 100).view(np.int8)
+            arrays['cci_oversold'] = (cci < -100).view(np.int8)
 
         # ROC（Rate of Change）
-        df['roc_5'] = ((df['close'] - df['close'].shift(5)) / df['close'].shift(5)) * 100
-        df['roc_10'] = ((df['close'] - df['close'].shift(10)) / df['close'].shift(10)) * 100
+        close = ctx.c
+        close_lags = ctx.c_lags
+        roc_periods = (5, 10)
+        for period in roc_periods:
+            arrays[f'roc_{period}'] = ((close - close_lags[:, period]) / close_lags[:, period]) * 100
+
+        # diffは入力指標のウォームアップより1行多く欠損する
+        return max(
+            max(roc_periods),
+            lead.get('rsi', 0) + 1,
+            max(lead.get('macd', 0), lead.get('macd_signal', 0)) + 1,
+        )
 
-        return df
+    def _add_volume_features(self, df: pd.DataFrame, ctx: _Ctx, arrays: Dict[str, np.ndarray]) -> int:
+        """出来高特徴量（戻り値はウォームアップ行数）"""
 
-    def _add_volume_features(self, df: pd.DataFrame) -> pd.DataFrame:
-        """出来高特徴量"""
+        volume_values = ctx.v
+        volume = pd.Series(volume_values, copy=False)
 
         # 出来高変化率
-        df['volume_change'] = df['volume'].pct_change()
-        df['volume_ma5'] = df['volume'].rolling(window=5).mean()
-        df['volume_ma20'] = df['volume'].rolling(window=20).mean()
-        df['volume_ratio'] = df['volume'] / (df['volume_ma20'] + 1e-10)
+        arrays['volume_change'] = volume.pct_change().to_numpy()
+        arrays['volume_ma5'] = volume.rolling(window=5).mean().to_numpy()
+        volume_ma20 = volume.rolling(window=20).mean().to_numpy()
+        arrays['volume_ma20'] = volume_ma20
+        arrays['volume_ratio'] = volume_values / (volume_ma20 + 1e-10)
 
         # 出来高急増フラグ
-        df['volume_spike'] = (df['volume'] > df['volume_ma20'] * 2).astype(int)
+        arrays['volume_spike'] = (volume_values > volume_ma20 * 2).view(np.int8)
 
         # OBVベース
         if 'obv' in df.columns:
-            df['obv_change'] = df['obv'].pct_change()
-            df['obv_ma5'] = df['obv'].rolling(window=5).mean()
-            df['obv_trend'] = (df['obv'] > df['obv_ma5']).astype(int)
+            obv = df['obv']
+            obv_ma5 = obv.rolling(window=5).mean().to_numpy()
+            arrays['obv_change'] = obv.pct_change().to_numpy()
+            arrays['obv_ma5'] = obv_ma5
+            arrays['obv_trend'] = (obv.to_numpy() > obv_ma5).view(np.int8)
+
+        close = ctx.c
 
         # VWAP距離
         if 'vwap' in df.columns:
-            df['vwap_distance'] = (df['close'] - df['vwap']) / df['vwap']
+            vwap = df['vwap'].to_numpy()
+            arrays['vwap_distance'] = (close - vwap) / vwap
 
         # 価格×出来高（取引代金）
-        df['turnover'] = df['close'] * df['volume']
-        df['turnover_ma5'] = df['turnover'].rolling(window=5).mean()
+        turnover = close * volume_values
+        arrays['turnover'] = turnover
+        arrays['turnover_ma5'] = pd.Series(turnover, copy=False).rolling(window=5).mean().to_numpy()
 
-        return df
+        # 20期間の出来高移動平均と、入力指標（OBV・VWAP）上の計算
+        lead = ctx.lead
+        return max(20 - 1, lead.get('obv', 0) + 5 - 1, lead.get('vwap', 0))
 
-    def _add_temporal_features(self, df: pd.DataFrame) -> pd.DataFrame:
-        """時系列特徴量（時間・曜日など）"""
+    def _add_temporal_features(self, df: pd.DataFrame, ctx: _Ctx, arrays: Dict[str, np.ndarray]) -> int:
+        """時系列特徴量（時間・曜日など）（戻り値はウォームアップ行数）"""
 
         # timestampから日時情報を抽出
-        if 'timestamp' in df.columns:
-            df['datetime'] = pd.to_datetime(df['timestamp'], unit='s')
-            df['hour'] = df['datetime'].dt.hour
-            df['day_of_week'] = df['datetime'].dt.dayofweek
-            df['day_of_month'] = df['datetime'].dt.day
-            df['month'] = df['datetime'].dt.month
+        if ctx.ts is not None:
+            dt = pd.to_datetime(ctx.ts, unit='s')
+            hour = dt.hour.to_numpy(dtype=np.int8)
+            day_of_week = dt.dayofweek.to_numpy(dtype=np.int8)
+            arrays['hour'] = hour
+            arrays['day_of_week'] = day_of_week
+            arrays['day_of_month'] = dt.day.to_numpy(dtype=np.int8)
+            arrays['month'] = dt.month.to_numpy(dtype=np.int8)
 
             # 週末フラグ
-            df['is_weekend'] = (df['day_of_week'] >= 5).astype(int)
+            arrays['is_weekend'] = (day_of_week >= 5).view(np.int8)
 
-            # 取引時間帯（アジア・欧州・米国）
-            df['is_asian_hours'] = ((df['hour'] >= 0) & (df['hour'] < 8)).astype(int)
-            df['is_european_hours'] = ((df['hour'] >= 8) & (df['hour'] < 16)).astype(int)
-            df['is_us_hours'] = ((df['hour'] >= 16) & (df['hour'] < 24)).astype(int)
+            # 取引時間帯（アジア・欧州・米国）: 8時間ごとの区分 0-7, 8-15, 16-23
+            session = hour >> 3
+            arrays['is_asian_hours'] = (session == 0).view(np.int8)
+            arrays['is_european_hours'] = (session == 1).view(np.int8)
+            arrays['is_us_hours'] = (session == 2).view(np.int8)
 
-            # datetimeカラムは削除（モデルに不要）
-            df = df.drop('datetime', axis=1)
+        return 0
 
-        return df
+    def _add_lag_features(
+        self,
+        df: pd.DataFrame,
+        ctx: _Ctx,
+        arrays: Dict[str, np.ndarray],
+        lags: List[int] = [1, 2, 3, 5, 10]
+    ) -> int:
+        """ラグ特徴量（過去の値）（戻り値はウォームアップ行数）"""
 
-    def _add_lag_features(self, df: pd.DataFrame, lags: List[int] = [1, 2, 3, 5, 10]) -> pd.DataFrame:
-        """ラグ特徴量（過去の値）"""
+        max_lag = max(lags)
+        short_lags = lags[:3]  # 1, 2, 3のみ
 
         # 終値のラグ
+        close_lags = ctx.c_lags if max_lag <= CLOSE_MAX_LAG else _lag_matrix(ctx.c, max_lag)
         for lag in lags:
-            df[f'close_lag_{lag}'] = df['close'].shift(lag)
+            arrays[f'close_lag_{lag}'] = close_lags[:, lag]
 
         # リターンのラグ
-        for lag in lags[:3]:  # 1, 2, 3のみ
-            if 'return_1' in df.columns:
-                df[f'return_lag_{lag}'] = df['return_1'].shift(lag)
+        return_lags = _lag_matrix(arrays['return_1'], max_lag)
+        for lag in short_lags:
+            arrays[f'return_lag_{lag}'] = return_lags[:, lag]
 
         # ボリュームのラグ
-        for lag in lags[:3]:
-            df[f'volume_lag_{lag}'] = df['volume'].shift(lag)
+        volume_lags = _lag_matrix(ctx.v, max_lag)
+        for lag in short_lags:
+            arrays[f'volume_lag_{lag}'] = volume_lags[:, lag]
 
-        return df
+        # return_1のラグは先頭1行分さらに欠損する
+        return max(max_lag, 1 + max(short_lags))
 
-    def _add_statistical_features(self, df: pd.DataFrame) -> pd.DataFrame:
-        """統計特徴量"""
+    def _add_statistical_features(self, df: pd.DataFrame, ctx: _Ctx, arrays: Dict[str, np.ndarray]) -> int:
+        """統計特徴量（戻り値はウォームアップ行数）"""
 
         windows = [5, 10, 20]
+        close_values = ctx.c
+        close = pd.Series(close_values, copy=False)
 
         for window in windows:
-            # 移動平均
-            df[f'close_ma_{window}'] = df['close'].rolling(window=window).mean()
+            # 同じウィンドウのRolling集計は1つのRollingオブジェクトから取得
+            rolling = close.rolling(window=window)
 
-            # 移動標準偏差
-            df[f'close_std_{window}'] = df['close'].rolling(window=window).std()
+            # 移動平均・移動標準偏差
+            ma = rolling.mean().to_numpy()
+            std = rolling.std().to_numpy()
+            arrays[f'close_ma_{window}'] = ma
+            arrays[f'close_std_{window}'] = std
 
             # 最大値・最小値
-            df[f'close_max_{window}'] = df['close'].rolling(window=window).max()
-            df[f'close_min_{window}'] = df['close'].rolling(window=window).min()
+            arrays[f'close_max_{window}'] = rolling.max().to_numpy()
+            arrays[f'close_min_{window}'] = rolling.min().to_numpy()
 
-            # 変動係数（CV）
-            df[f'close_cv_{window}'] = df[f'close_std_{window}'] / (df[f'close_ma_{window}'] + 1e-10)
-
-            # Zスコア
-            df[f'close_zscore_{window}'] = (
-                (df['close'] - df[f'close_ma_{window}']) / (df[f'close_std_{window}'] + 1e-10)
-            )
+            # 変動係数（CV）・Zスコア
+            arrays[f'close_cv_{window}'] = std / (ma + 1e-10)
+            arrays[f'close_zscore_{window}'] = (close_values - ma) / (std + 1e-10)
 
         # 歪度・尖度（20期間のみ）
-        df['skewness_20'] = df['return_1'].rolling(window=20).skew()
-        df['kurtosis_20'] = df['return_1'].rolling(window=20).kurt()
+        return_rolling = pd.Series(arrays['return_1'], copy=False).rolling(window=20)
+        arrays['skewness_20'] = return_rolling.skew().to_numpy()
+        arrays['kurtosis_20'] = return_rolling.kurt().to_numpy()
 
-        return df
+        # return_1は先頭1行が欠損するため、20期間Rollingの先頭20行が欠損
+        return 20
 
     def create_target_variable(
         self,
@@ -311,13 +506,16 @@ class FeatureEngineer:
         # 将来リターン
         df['future_return'] = df['close'].shift(-prediction_horizon) / df['close'] - 1
 
-        # 3クラス分類（上昇/横ばい/下降）
-        df['target_direction'] = 0  # 横ばい
-        df.loc[df['future_return'] > threshold, 'target_direction'] = 1  # 上昇
-        df.loc[df['future_return'] < -threshold, 'target_direction'] = -1  # 下降
+        future_return = df['future_return'].to_numpy()
+
+        # 3クラス分類（上昇/横ばい/下降）int8で直接生成
+        target_direction = np.zeros(len(future_return), dtype=np.int8)  # 横ばい
+        target_direction[future_return > threshold] = 1  # 上昇
+        target_direction[future_return < -threshold] = -1  # 下降
+        df['target_direction'] = target_direction
 
         # 2クラス分類（上昇/下降）
-        df['target_binary'] = (df['future_return'] > 0).astype(int)
+        df['target_binary'] = (future_return > 0).view(np.int8)
 
         # 回帰用ターゲット（リターンそのもの）
         df['target_return'] = df['future_return']
@@ -358,11 +556,24 @@ class FeatureEngineer:
         Returns:
             選択された特徴量のリスト
         """
-        # ターゲットとの相関を計算
-        correlations = df[self.feature_columns].corrwith(df[target_col]).abs()
-
-        # 上位N個を選択
-        top_features = correlations.nlargest(top_n).index.tolist()
+        # ターゲットとの相関を計算（中心化して1回の行列ベクトル積で全特徴量分を求める）
+        X = df[self.feature_columns].to_numpy(dtype=np.float64)
+        y = df[target_col].to_numpy(dtype=np.float64)
+        X -= X.mean(axis=0)
+        y = y - y.mean()
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            correlations = np.abs(X.T @ y) / (len(y) * X.std(axis=0) * y.std())
+
+        # 上位N個を選択（定数列など相関が定義できない特徴量は最後尾）
+        is_nan = np.isnan(correlations)
+        valid = np.flatnonzero(~is_nan)
+        if top_n < len(valid):
+            valid = valid[np.argpartition(-correlations[valid], top_n - 1)[:top_n]]
+        order = valid[np.argsort(-correlations[valid], kind='stable')]
+        if len(order) < top_n:
+            order = np.concatenate([order, np.flatnonzero(is_nan)[:top_n - len(order)]])
+        top_features = [self.feature_columns[i] for i in order]
 
         logger.info(f"特徴量選択完了: {len(top_features)}個")
         logger.info(f"  - Top 5: {top_features[:5]}")
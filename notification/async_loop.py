@@ -0,0 +1,103 @@
+"""Telegram用の共有イベントループ
+
+Botハンドラー（コマンド受信）とTelegram通知の非同期処理を
+1つのバックグラウンドスレッド上のイベントループで実行する
+"""
+
+import asyncio
+import concurrent.futures
+import logging
+import threading
+from typing import Coroutine, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncLoopThread:
+    """バックグラウンドスレッドで動かすイベントループ"""
+
+    def __init__(self, name: str = "telegram-loop"):
+        """
+        Args:
+            name: ループを実行するスレッド名
+        """
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._lock = threading.Lock()
+        self._stopped = False
+
+    @property
+    def is_running(self) -> bool:
+        """ループのスレッドが動作中かどうか"""
+        return self._thread.is_alive()
+
+    def start(self):
+        """
+        ループのスレッドを起動（起動済みなら何もしない）
+
+        Raises:
+            RuntimeError: stop()後に呼び出された場合
+        """
+        with self._lock:
+            if self._stopped:
+                raise RuntimeError("Telegramイベントループは停止済みです")
+            if not self._thread.is_alive():
+                self._thread.start()
+
+    def _run(self):
+        """スレッドのメイン（stop()までループを回し、終了後にクローズ）"""
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_forever()
+        finally:
+            # 残ったタスクをキャンセルしてからクローズ
+            pending = asyncio.all_tasks(self.loop)
+            for task in pending:
+                task.cancel()
+            if pending:
+                self.loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            self.loop.run_until_complete(self.loop.shutdown_asyncgens())
+            self.loop.close()
+
+    def submit(self, coro: Coroutine) -> concurrent.futures.Future:
+        """
+        コルーチンをループに投入（他スレッドから呼び出す）
+
+        Args:
+            coro: 実行するコルーチン
+
+        Returns:
+            結果を受け取るFuture
+
+        Raises:
+            RuntimeError: stop()後に呼び出された場合（コルーチンはクローズ済み）
+        """
+        try:
+            self.start()
+            return asyncio.run_coroutine_threadsafe(coro, self.loop)
+        except RuntimeError:
+            # 実行されないコルーチンの"never awaited"警告を防ぐ
+            coro.close()
+            raise
+
+    def stop(self, timeout: Optional[float] = 10.0):
+        """
+        ループを停止してスレッドの終了を待機
+
+        Args:
+            timeout: スレッドの終了待ち時間（秒）
+        """
+        with self._lock:
+            self._stopped = True
+
+        if not self._thread.is_alive():
+            if self._thread.ident is None and not self.loop.is_closed():
+                # 一度も起動していないループ
+                self.loop.close()
+            return
+
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        if self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                logger.warning("Telegramイベントループのスレッドが時間内に終了しませんでした")
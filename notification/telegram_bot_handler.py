@@ -3,19 +3,368 @@
 ユーザーからのコマンドを受信し、システムを制御
 """
 
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import copy
+import functools
+import heapq
+import hmac
 import logging
+import os
+import secrets
 import threading
 import time
-from typing import Optional, Dict, Callable
+from typing import TYPE_CHECKING, Optional, Dict, Callable, Tuple
 from datetime import datetime
-from telegram import Update, BotCommand
-from telegram.ext import Application, CommandHandler, ContextTypes
+from urllib.parse import urlparse
 import yaml
 from pathlib import Path
-from utils.constants import SIDE_LONG
+from notification.async_loop import AsyncLoopThread
+from utils.constants import SIDE_LONG, ORDER_BUY, ORDER_SELL
+
+# libyamlのCバインディングがあれば使用（純Python実装より高速）
+try:
+    from yaml import CSafeLoader as _YamlLoader, CSafeDumper as _YamlDumper
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader, SafeDumper as _YamlDumper
+
+# telegram/aiohttpはBot起動時に遅延インポートする（Bot無効時の起動時間・メモリを削減）
+if TYPE_CHECKING:
+    from aiohttp import web
+    from telegram import Update
+    from telegram.ext import Application, ContextTypes
 
 logger = logging.getLogger(__name__)
 
+# 設定ファイルパス
+CONFIG_PATH = Path("config/config.yaml")
+
+# 設定ファイルのバックアップ世代数（config.yaml.bak.0 が最新）
+CONFIG_BACKUP_COUNT = 5
+
+# 設定ファイルのキャッシュ {パス: (mtime_ns, サイズ, 設定dict)}
+_config_cache: Dict[str, Tuple[int, int, dict]] = {}
+
+# コマンド一覧（簡潔版）メッセージ
+_COMMANDS_MSG = """
+📋 <b>コマンド一覧</b>
+
+/status - 状態確認
+/positions - ポジション
+/config - 設定表示
+/allocation - 戦略配分確認
+/leverage - レバレッジ設定
+/pause - 一時停止
+/resume - 再開
+/close_all - 全ポジション売却
+/rebalance - 配分に合わせてリバランス
+/set_stop_loss <値> - 損切変更
+/set_alloc <種類> <値> - 配分変更
+/set_leverage <設定> - レバレッジ変更
+/commands - この一覧
+/help - 詳細ヘルプ
+
+💡 「/」を入力するとコマンド候補が表示されます
+""".strip()
+
+# ヘルプ（詳細版）メッセージ
+_HELP_MSG = """
+🤖 <b>利用可能なコマンド</b>
+━━━━━━━━━━━━━━━━
+
+📊 <b>情報取得</b>
+/status - システム状態確認
+/positions - 保有ポジション一覧
+/config - 現在の設定表示
+/allocation - 戦略配分確認
+/leverage - レバレッジ設定
+
+⚙️ <b>制御</b>
+/pause - 取引一時停止
+/resume - 取引再開
+/close_all - 全ポジション売却
+/rebalance - 配分に合わせてリバランス
+
+🔧 <b>設定変更</b>
+/set_stop_loss <値> - 損切ライン変更
+/set_alloc <種類> <値> - 戦略配分変更
+/set_leverage <設定> - レバレッジ変更
+
+⚡ <b>レバレッジ例</b>
+/set_leverage on - FX取引有効
+/set_leverage off - 現物取引
+/set_leverage 1.5 - 倍率変更
+
+❓ <b>その他</b>
+/commands - コマンド一覧（簡潔版）
+/help - この詳細ヘルプ
+
+💡 <b>ヒント</b>
+チャット入力欄で「/」を入力すると
+コマンド候補が自動的に表示されます！
+""".strip()
+
+# 許可されていないチャットへの返信
+_AUTH_ERROR_MSG = "⛔ 認証エラー：このBotを使用する権限がありません"
+
+# /positions の1ポジション分の表示テンプレート
+_POSITION_TEMPLATE = (
+    "\n{side_emoji} <b>{symbol}</b> {side}\n"
+    "数量: {quantity:.6f}\n"
+    "エントリー: ¥{entry_price:,.0f}\n"
+    "現在値: ¥{current_price:,.0f}\n"
+    "{pnl_emoji} 損益: <b>¥{unrealized_pnl:,.0f}</b> ({unrealized_pnl_pct:+.2f}%)\n"
+)
+
+# 円表記（¥1,234）のフォーマッタ
+_fmt_yen = "¥{:,.0f}".format
+
+# Telegram UIに表示するコマンド候補（コマンド名, 説明）
+_BOT_COMMANDS = (
+    ("status", "システム状態確認"),
+    ("positions", "保有ポジション一覧"),
+    ("config", "現在の設定表示"),
+    ("allocation", "戦略配分確認"),
+    ("leverage", "レバレッジ設定確認"),
+    ("pause", "取引一時停止"),
+    ("resume", "取引再開"),
+    ("close_all", "全ポジション売却"),
+    ("rebalance", "配分に合わせてリバランス"),
+    ("set_stop_loss", "損切ライン変更"),
+    ("set_alloc", "戦略配分変更"),
+    ("set_leverage", "レバレッジ設定変更"),
+    ("commands", "コマンド一覧"),
+    ("help", "詳細ヘルプ"),
+)
+
+# コマンドのレート制限（チャットごとのトークンバケット）
+RATE_LIMIT_PER_SEC = 0.5  # トークン補充速度（回/秒）
+RATE_LIMIT_BURST = 5      # 連続実行できる最大回数
+
+# ロングポーリング設定（秒）: 更新が届くまでTelegram側で接続を保持させる
+POLLING_TIMEOUT = 30
+# getUpdatesの読み取りタイムアウトはロングポーリング待機より長くする
+GET_UPDATES_READ_TIMEOUT = POLLING_TIMEOUT + 5
+
+# Webhook設定（webhook_url指定時はポーリングの代わりに使用）
+# HTTPSはリバースプロキシで終端するため、平文HTTPの待ち受けは既定でローカルのみ
+WEBHOOK_LISTEN = "127.0.0.1"
+WEBHOOK_PORT = 8443
+WEBHOOK_SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+# 返信フッターの時刻表示形式
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+# 現在時刻の取得（属性参照を省くため束縛しておく）
+_now = datetime.now
+
+# 1通の返信の最大文字数（Telegram上限4096文字に余裕を持たせ、超える返信は分割送信）
+REPLY_MAX_CHARS = 3800
+
+# 残高・価格の再利用期間（秒）: 連続したコマンドで取引所APIを重複呼び出ししない
+MARKET_DATA_TTL = 2.0
+
+
+def _timestamp() -> str:
+    """返信フッター用の現在時刻文字列"""
+    return time.strftime(TIMESTAMP_FORMAT)
+
+
+def _split_message(parts: list, limit: int = REPLY_MAX_CHARS) -> list:
+    """
+    メッセージ断片をlimit文字未満ごとにまとめる（断片の途中では分割しない）
+
+    Args:
+        parts: メッセージ断片のリスト
+        limit: 1通あたりの最大文字数
+
+    Returns:
+        送信するメッセージのリスト
+    """
+    chunks = []
+    buf = []
+    length = 0
+    for part in parts:
+        if buf and length + len(part) >= limit:
+            chunks.append("".join(buf))
+            buf = []
+            length = 0
+        buf.append(part)
+        length += len(part)
+    if buf:
+        chunks.append("".join(buf))
+    return chunks
+
+
+def _load_config(config_path: Path) -> dict:
+    """
+    設定ファイルを読み込み（更新がなければキャッシュを返す）
+
+    Args:
+        config_path: 設定ファイルパス
+
+    Returns:
+        設定dict（キャッシュと共有のため、変更する場合はコピーすること）
+    """
+    stat = os.stat(config_path)
+    key = str(config_path)
+    cached = _config_cache.get(key)
+    if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        return cached[2]
+
+    with open(config_path, 'r', encoding='utf-8') as f:
+        # 置き換えられた場合に備え、実際に読んだファイルのstatをキャッシュキーにする
+        stat = os.fstat(f.fileno())
+        config = yaml.load(f, Loader=_YamlLoader)
+
+    _config_cache[key] = (stat.st_mtime_ns, stat.st_size, config)
+    return config
+
+
+def _rotate_backups(config_path: Path, data: bytes) -> Path:
+    """
+    設定ファイルのバックアップをローテーションして保存
+
+    config.yaml.bak.0（最新）～ config.yaml.bak.{N-1}（最古）の固定世代で保持する
+
+    Args:
+        config_path: 設定ファイルパス
+        data: バックアップする内容（変更前の設定ファイル）
+
+    Returns:
+        最新バックアップのパス
+    """
+    backups = [
+        config_path.with_name(f"{config_path.name}.bak.{i}")
+        for i in range(CONFIG_BACKUP_COUNT)
+    ]
+    for src, dst in zip(reversed(backups[:-1]), reversed(backups[1:])):
+        if src.exists():
+            os.replace(src, dst)
+
+    backups[0].write_bytes(data)
+    return backups[0]
+
+
+def _save_config(config_path: Path, config: dict) -> Optional[Path]:
+    """
+    変更前の内容をバックアップし、設定ファイルをアトミックに保存
+
+    内容に変更がない場合は書き込みを行わない。
+    一時ファイルに書き込んでからos.replaceで置き換えるため、
+    書き込み途中で停止しても設定ファイルが壊れない
+
+    Args:
+        config_path: 設定ファイルパス
+        config: 保存する設定dict
+
+    Returns:
+        作成したバックアップのパス（変更なしの場合はNone）
+    """
+    new_data = yaml.dump(
+        config, Dumper=_YamlDumper, allow_unicode=True, default_flow_style=False
+    ).encode('utf-8')
+    old_data = config_path.read_bytes()
+
+    if old_data == new_data:
+        return None
+
+    backup_path = _rotate_backups(config_path, old_data)
+
+    tmp_path = config_path.with_name(config_path.name + '.tmp')
+    tmp_path.write_bytes(new_data)
+    os.replace(tmp_path, config_path)
+
+    stat = os.stat(config_path)
+    _config_cache[str(config_path)] = (stat.st_mtime_ns, stat.st_size, config)
+    return backup_path
+
+
+class _RateLimiter:
+    """チャットごとのトークンバケット方式レート制限"""
+
+    def __init__(self, rate: float = RATE_LIMIT_PER_SEC, burst: int = RATE_LIMIT_BURST):
+        """
+        Args:
+            rate: トークン補充速度（個/秒）
+            burst: バケット容量
+        """
+        self.rate = rate
+        self.burst = burst
+        # {chat_id: (残りトークン, 最終更新時刻)}
+        self._buckets: Dict[int, Tuple[float, float]] = {}
+
+    def acquire(self, chat_id: int) -> float:
+        """
+        トークンを1つ消費
+
+        Args:
+            chat_id: チャットID
+
+        Returns:
+            0.0なら実行可、正の値なら次のトークンまでの待ち秒数
+        """
+        now = time.monotonic()
+        tokens, last = self._buckets.get(chat_id, (float(self.burst), now))
+        tokens = min(float(self.burst), tokens + (now - last) * self.rate)
+
+        if tokens < 1.0:
+            self._buckets[chat_id] = (tokens, now)
+            return (1.0 - tokens) / self.rate
+
+        self._buckets[chat_id] = (tokens - 1.0, now)
+        return 0.0
+
+
+def _authorized(handler: Callable) -> Callable:
+    """
+    コマンドハンドラーに認証チェックと共通エラー処理を付与するデコレーター
+
+    Args:
+        handler: cmd_* ハンドラー（self, update, context を受け取るコルーチン関数）
+
+    Returns:
+        ラップしたハンドラー
+    """
+    command = handler.__name__[len("cmd_"):]
+
+    @functools.wraps(handler)
+    async def wrapper(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        if not self._check_authorization(update):
+            await self._send_reply(update, _AUTH_ERROR_MSG)
+            return
+
+        try:
+            return await handler(self, update, context)
+        except Exception as e:
+            logger.error(f"{command}コマンドエラー: {e}")
+            await self._send_reply(update, f"⚠️ エラー: {str(e)}")
+
+    return wrapper
+
+
+def _exclusive(handler: Callable) -> Callable:
+    """
+    注文・設定変更を行うハンドラーを1つずつ実行させるデコレーター
+
+    並行処理されるアップデート同士が同じポジションへ重複して注文したり、
+    設定ファイルの読み込み→保存が交錯して変更が失われたりしないようにする。
+    ポジション・設定はロック取得後に読み込むこと
+
+    Args:
+        handler: cmd_* ハンドラー（self, update, context を受け取るコルーチン関数）
+
+    Returns:
+        ラップしたハンドラー
+    """
+    @functools.wraps(handler)
+    async def wrapper(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        async with self._state_lock:
+            return await handler(self, update, context)
+
+    return wrapper
+
 
 class TelegramBotHandler:
     """Telegram Botコマンドハンドラークラス"""
@@ -24,16 +373,35 @@ class TelegramBotHandler:
         self,
         bot_token: Optional[str] = None,
         allowed_chat_ids: Optional[list] = None,
-        trader_instance=None
+        trader_instance=None,
+        webhook_url: Optional[str] = None,
+        webhook_port: int = WEBHOOK_PORT,
+        webhook_listen: str = WEBHOOK_LISTEN,
+        loop_thread: Optional[AsyncLoopThread] = None
     ):
         """
         Args:
             bot_token: Telegram Bot Token
             allowed_chat_ids: 許可するChat IDのリスト
             trader_instance: CryptoTraderインスタンス（制御用）
+            webhook_url: 公開WebhookのHTTPS URL（Noneの場合はポーリング）
+            webhook_port: Webhookのローカル待ち受けポート
+            webhook_listen: Webhookの待ち受けアドレス（既定はローカルのみ）
+            loop_thread: 共有イベントループ（Noneの場合は専用のループを作成）
         """
         self.bot_token = bot_token
+        self.webhook_url = webhook_url
+        self.webhook_port = webhook_port
+        self.webhook_listen = webhook_listen
         self.allowed_chat_ids = allowed_chat_ids or []
+        # 認証チェック用（TelegramのChat IDは整数のためintに正規化した集合）
+        allowed = set()
+        for cid in self.allowed_chat_ids:
+            try:
+                allowed.add(int(cid))
+            except (TypeError, ValueError):
+                logger.warning(f"無効なChat IDを無視: {cid}")
+        self._allowed_set = frozenset(allowed)
         self.trader = trader_instance
         self.enabled = bool(bot_token and self.allowed_chat_ids)
 
@@ -42,21 +410,113 @@ class TelegramBotHandler:
             return
 
         self.application = None
-        self.bot_thread = None
         self.is_running = False
+        self._rate_limiter = _RateLimiter()
+        # Botを実行するイベントループ（共有ループが渡されなければ専用に作成して停止時に止める）
+        self._owns_loop = loop_thread is None
+        self._loop_thread = loop_thread or AsyncLoopThread(name="telegram-bot")
+        # Botライフサイクルの実行結果と停止通知（start後に設定）
+        self._bot_future = None
+        self._webhook_runner: Optional[web.AppRunner] = None
+        self._stop_event: Optional[asyncio.Event] = None
+        # 残高・価格の短期キャッシュ {キー: (取得時刻, 値)}
+        self._market_cache: Dict[Tuple[str, str], Tuple[float, object]] = {}
+        # 取得中は同じデータへの並行取得を待たせ、取得結果を共有する
+        self._market_lock = threading.Lock()
+        # 注文・設定変更コマンドの排他制御（_exclusive）
+        self._state_lock = asyncio.Lock()
 
         logger.info(f"Telegram Botハンドラー初期化（許可Chat ID: {len(self.allowed_chat_ids)}件）")
 
     def _check_authorization(self, update: Update) -> bool:
         """チャットIDの認証確認"""
-        chat_id = str(update.effective_chat.id)
+        chat_id = update.effective_chat.id
 
-        if chat_id not in [str(cid) for cid in self.allowed_chat_ids]:
+        if chat_id not in self._allowed_set:
             logger.warning(f"未認証アクセス試行: Chat ID {chat_id}")
             return False
 
         return True
 
+    def _get_position_prices(self, positions: list) -> Dict[str, float]:
+        """
+        保有ポジションの現在価格をまとめて取得（同期API呼び出しのためスレッドで実行すること）
+
+        Args:
+            positions: ポジションのリスト
+
+        Returns:
+            {シンボル: 現在価格}（取得に失敗したシンボルは含まない）
+        """
+        if not positions:
+            return {}
+
+        with self._market_lock:
+            now = time.monotonic()
+            prices = {}
+            missing = []
+            for symbol in dict.fromkeys(pos.symbol for pos in positions):
+                cached = self._market_cache.get(('price', symbol))
+                if cached and now - cached[0] < MARKET_DATA_TTL:
+                    prices[symbol] = cached[1]
+                else:
+                    missing.append(symbol)
+
+            if missing:
+                try:
+                    fetched = self.trader.order_executor.get_prices(missing)
+                except Exception as e:
+                    logger.warning(f"価格取得エラー: {e}")
+                    fetched = {}
+                for symbol, price in fetched.items():
+                    self._market_cache[('price', symbol)] = (now, price)
+                prices.update(fetched)
+
+        return prices
+
+    def _get_jpy_balance(self) -> dict:
+        """
+        JPY残高を取得（MARKET_DATA_TTL秒以内の取得結果は再利用、スレッドで実行すること）
+
+        Returns:
+            残高情報（取得に失敗した場合は空dict）
+        """
+        with self._market_lock:
+            now = time.monotonic()
+            cached = self._market_cache.get(('balance', 'JPY'))
+            if cached and now - cached[0] < MARKET_DATA_TTL:
+                return cached[1]
+
+            try:
+                balance = self.trader.order_executor.get_balance('JPY')
+            except Exception as e:
+                logger.warning(f"残高取得エラー: {e}")
+                return {}
+
+            self._market_cache[('balance', 'JPY')] = (now, balance)
+            return balance
+
+    async def _check_rate_limit(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """
+        レート制限チェック（全コマンドハンドラーの前に実行）
+
+        制限超過時は返信してApplicationHandlerStopで以降のハンドラーを止める。
+        許可されていないチャットはバケットを作らず、認証チェック（_authorized）に任せる
+        """
+        if update.effective_chat is None or update.message is None:
+            return
+
+        if update.effective_chat.id not in self._allowed_set:
+            return
+
+        wait = self._rate_limiter.acquire(update.effective_chat.id)
+        if wait > 0:
+            from telegram.ext import ApplicationHandlerStop
+
+            logger.warning(f"レート制限: Chat ID {update.effective_chat.id}")
+            await self._send_reply(update, f"⏳ コマンドの実行回数が上限に達しました。{wait:.1f}秒後に再試行してください")
+            raise ApplicationHandlerStop
+
     async def _send_reply(self, update: Update, message: str):
         """返信送信"""
         try:
@@ -66,37 +526,28 @@ class TelegramBotHandler:
 
     # ========== コマンドハンドラー ==========
 
+    @_authorized
     async def cmd_status(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """システム状態確認コマンド"""
-        if not self._check_authorization(update):
-            await self._send_reply(update, "⛔ 認証エラー：このBotを使用する権限がありません")
+        if not self.trader:
+            await self._send_reply(update, "⚠️ トレーダーインスタンスが未設定です")
             return
 
-        try:
-            if not self.trader:
-                await self._send_reply(update, "⚠️ トレーダーインスタンスが未設定です")
-                return
+        # システム状態取得
+        is_running = self.trader.is_running
+        trading_paused = self.trader.risk_manager.trading_paused
+        positions = list(self.trader.position_manager.get_all_positions().values())
 
-            # システム状態取得
-            is_running = self.trader.is_running
-            trading_paused = self.trader.risk_manager.trading_paused
-            positions = self.trader.position_manager.get_all_positions()
+        # 残高取得
+        balance = await asyncio.to_thread(self._get_jpy_balance)
+        total_balance = balance.get('total', 0)
+        available = balance.get('free', 0)
 
-            # 残高取得
-            try:
-                balance = self.trader.order_executor.get_balance('JPY')
-                total_balance = balance.get('total', 0)
-                available = balance.get('free', 0)
-            except Exception as e:
-                logger.warning(f"残高取得エラー: {e}")
-                total_balance = 0
-                available = 0
-
-            # ステータスメッセージ作成
-            status_emoji = "🟢" if is_running else "🔴"
-            pause_emoji = "⏸️" if trading_paused else "▶️"
+        # ステータスメッセージ作成
+        status_emoji = "🟢" if is_running else "🔴"
+        pause_emoji = "⏸️" if trading_paused else "▶️"
 
-            message = f"""
+        parts = [f"""
 📊 <b>システム状態</b>
 ━━━━━━━━━━━━━━━━
 
@@ -109,41 +560,35 @@ class TelegramBotHandler:
 
 📈 <b>ポジション</b>
 保有数: {len(positions)}件
-"""
-
-            if positions:
-                for pos in positions:
-                    try:
-                        current_price = self.trader.order_executor.get_current_price(pos.symbol)
-                        unrealized_pnl_pct = pos.calculate_unrealized_pnl_pct(current_price)
-                        message += f"\n• {pos.symbol} {pos.side.upper()}: {unrealized_pnl_pct:+.2f}%"
-                    except Exception:
-                        message += f"\n• {pos.symbol} {pos.side.upper()}"
+"""]
 
-            message += f"\n\n⏰ {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+        if positions:
+            prices = await asyncio.to_thread(self._get_position_prices, positions)
+            for pos in positions:
+                # 価格取得に失敗したシンボルは損益なしで表示
+                current_price = prices.get(pos.symbol)
+                if current_price is None:
+                    parts.append(f"\n• {pos.symbol} {pos.side.upper()}")
+                    continue
+                unrealized_pnl_pct = pos.calculate_unrealized_pnl_pct(current_price)
+                parts.append(f"\n• {pos.symbol} {pos.side.upper()}: {unrealized_pnl_pct:+.2f}%")
 
-            await self._send_reply(update, message.strip())
-            logger.info(f"ステータス確認: Chat ID {update.effective_chat.id}")
+        parts.append(f"\n\n⏰ {_timestamp()}")
 
-        except Exception as e:
-            logger.error(f"statusコマンドエラー: {e}")
-            await self._send_reply(update, f"⚠️ エラー: {str(e)}")
+        await self._send_reply(update, "".join(parts).strip())
+        logger.info(f"ステータス確認: Chat ID {update.effective_chat.id}")
 
+    @_authorized
     async def cmd_pause(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """取引一時停止コマンド"""
-        if not self._check_authorization(update):
-            await self._send_reply(update, "⛔ 認証エラー：このBotを使用する権限がありません")
+        if not self.trader:
+            await self._send_reply(update, "⚠️ トレーダーインスタンスが未設定です")
             return
 
-        try:
-            if not self.trader:
-                await self._send_reply(update, "⚠️ トレーダーインスタンスが未設定です")
-                return
-
-            self.trader.risk_manager.trading_paused = True
-            self.trader.risk_manager.pause_timestamp = datetime.now()
+        self.trader.risk_manager.trading_paused = True
+        self.trader.risk_manager.pause_timestamp = _now()
 
-            message = """
+        message = """
 ⏸️ <b>取引を一時停止しました</b>
 
 新規エントリーを停止します。
@@ -151,105 +596,90 @@ class TelegramBotHandler:
 
 再開するには: /resume
 """
-            await self._send_reply(update, message.strip())
-            logger.warning(f"取引一時停止: Chat ID {update.effective_chat.id}")
-
-        except Exception as e:
-            logger.error(f"pauseコマンドエラー: {e}")
-            await self._send_reply(update, f"⚠️ エラー: {str(e)}")
+        await self._send_reply(update, message.strip())
+        logger.warning(f"取引一時停止: Chat ID {update.effective_chat.id}")
 
+    @_authorized
     async def cmd_resume(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """取引再開コマンド"""
-        if not self._check_authorization(update):
-            await self._send_reply(update, "⛔ 認証エラー：このBotを使用する権限がありません")
+        if not self.trader:
+            await self._send_reply(update, "⚠️ トレーダーインスタンスが未設定です")
             return
 
-        try:
-            if not self.trader:
-                await self._send_reply(update, "⚠️ トレーダーインスタンスが未設定です")
-                return
+        self.trader.risk_manager.trading_paused = False
+        self.trader.risk_manager.consecutive_losses = 0  # リセット
 
-            self.trader.risk_manager.trading_paused = False
-            self.trader.risk_manager.consecutive_losses = 0  # リセット
-
-            message = """
+        message = """
 ▶️ <b>取引を再開しました</b>
 
 取引が再開されました。
 連続損失カウントをリセットしました。
 """
-            await self._send_reply(update, message.strip())
-            logger.info(f"取引再開: Chat ID {update.effective_chat.id}")
-
-        except Exception as e:
-            logger.error(f"resumeコマンドエラー: {e}")
-            await self._send_reply(update, f"⚠️ エラー: {str(e)}")
+        await self._send_reply(update, message.strip())
+        logger.info(f"取引再開: Chat ID {update.effective_chat.id}")
 
+    @_authorized
     async def cmd_positions(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """保有ポジション確認コマンド"""
-        if not self._check_authorization(update):
-            await self._send_reply(update, "⛔ 認証エラー：このBotを使用する権限がありません")
+        if not self.trader:
+            await self._send_reply(update, "⚠️ トレーダーインスタンスが未設定です")
             return
 
-        try:
-            if not self.trader:
-                await self._send_reply(update, "⚠️ トレーダーインスタンスが未設定です")
-                return
-
-            positions = self.trader.position_manager.get_all_positions()
+        positions = list(self.trader.position_manager.get_all_positions().values())
 
-            if not positions:
-                await self._send_reply(update, "📭 保有ポジションはありません")
-                return
-
-            message = "📈 <b>保有ポジション一覧</b>\n━━━━━━━━━━━━━━━━\n"
-
-            total_unrealized_pnl = 0
-            for pos in positions:
-                try:
-                    current_price = self.trader.order_executor.get_current_price(pos.symbol)
-                    unrealized_pnl = pos.calculate_unrealized_pnl(current_price)
-                    unrealized_pnl_pct = pos.calculate_unrealized_pnl_pct(current_price)
-                    total_unrealized_pnl += unrealized_pnl
-
-                    side_emoji = "🟢" if pos.side == SIDE_LONG else "🔴"
-                    pnl_emoji = "📈" if unrealized_pnl > 0 else "📉"
-
-                    message += f"\n{side_emoji} <b>{pos.symbol}</b> {pos.side.upper()}\n"
-                    message += f"数量: {pos.quantity:.6f}\n"
-                    message += f"エントリー: ¥{pos.entry_price:,.0f}\n"
-                    message += f"現在値: ¥{current_price:,.0f}\n"
-                    message += f"{pnl_emoji} 損益: <b>¥{unrealized_pnl:,.0f}</b> ({unrealized_pnl_pct:+.2f}%)\n"
-                except Exception as e:
-                    logger.error(f"ポジション情報取得エラー: {e}")
-                    message += f"\n⚠️ {pos.symbol} 情報取得失敗\n"
-
-            message += f"\n━━━━━━━━━━━━━━━━"
-            message += f"\n💰 合計未実現損益: <b>¥{total_unrealized_pnl:,.0f}</b>"
-            message += f"\n⏰ {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-
-            await self._send_reply(update, message.strip())
-            logger.info(f"ポジション確認: Chat ID {update.effective_chat.id}")
-
-        except Exception as e:
-            logger.error(f"positionsコマンドエラー: {e}")
-            await self._send_reply(update, f"⚠️ エラー: {str(e)}")
+        if not positions:
+            await self._send_reply(update, "📭 保有ポジションはありません")
+            return
 
+        parts = ["📈 <b>保有ポジション一覧</b>\n━━━━━━━━━━━━━━━━\n"]
+
+        total_unrealized_pnl = 0
+        prices = await asyncio.to_thread(self._get_position_prices, positions)
+        for pos in positions:
+            current_price = prices.get(pos.symbol)
+            if current_price is None:
+                logger.error(f"ポジション情報取得エラー: {pos.symbol} 価格取得失敗")
+                parts.append(f"\n⚠️ {pos.symbol} 情報取得失敗\n")
+                continue
+
+            unrealized_pnl = pos.calculate_unrealized_pnl(current_price)
+            unrealized_pnl_pct = pos.calculate_unrealized_pnl_pct(current_price)
+            total_unrealized_pnl += unrealized_pnl
+
+            parts.append(_POSITION_TEMPLATE.format_map({
+                'side_emoji': "🟢" if pos.side == SIDE_LONG else "🔴",
+                'symbol': pos.symbol,
+                'side': pos.side.upper(),
+                'quantity': pos.quantity,
+                'entry_price': pos.entry_price,
+                'current_price': current_price,
+                'pnl_emoji': "📈" if unrealized_pnl > 0 else "📉",
+                'unrealized_pnl': unrealized_pnl,
+                'unrealized_pnl_pct': unrealized_pnl_pct,
+            }))
+
+        parts.append(f"\n━━━━━━━━━━━━━━━━")
+        parts.append(f"\n💰 合計未実現損益: <b>{_fmt_yen(total_unrealized_pnl)}</b>")
+        parts.append(f"\n⏰ {_timestamp()}")
+
+        # ポジションが多い場合は上限を超えないよう分割して送信
+        chunks = _split_message(parts)
+        for i, chunk in enumerate(chunks, 1):
+            chunk = chunk.strip()
+            if len(chunks) > 1:
+                chunk = f"({i}/{len(chunks)})\n{chunk}"
+            await self._send_reply(update, chunk)
+        logger.info(f"ポジション確認: Chat ID {update.effective_chat.id}")
+
+    @_authorized
     async def cmd_config(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """現在の設定表示コマンド"""
-        if not self._check_authorization(update):
-            await self._send_reply(update, "⛔ 認証エラー：このBotを使用する権限がありません")
-            return
-
-        try:
-            config_path = Path("config/config.yaml")
-            with open(config_path, 'r', encoding='utf-8') as f:
-                config = yaml.safe_load(f)
+        config = await asyncio.to_thread(_load_config, CONFIG_PATH)
 
-            risk = config.get('risk_management', {})
-            trading = config.get('trading', {})
+        risk = config.get('risk_management', {})
+        trading = config.get('trading', {})
 
-            message = f"""
+        message = f"""
 ⚙️ <b>現在の設定</b>
 ━━━━━━━━━━━━━━━━
 
@@ -265,21 +695,15 @@ class TelegramBotHandler:
 • 最小信頼度: {trading.get('min_confidence', 0.6)}
 • 取引間隔: {trading.get('trading_interval_minutes', 5)}分
 
-⏰ {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+⏰ {_timestamp()}
 """
-            await self._send_reply(update, message.strip())
-            logger.info(f"設定確認: Chat ID {update.effective_chat.id}")
-
-        except Exception as e:
-            logger.error(f"configコマンドエラー: {e}")
-            await self._send_reply(update, f"⚠️ エラー: {str(e)}")
+        await self._send_reply(update, message.strip())
+        logger.info(f"設定確認: Chat ID {update.effective_chat.id}")
 
+    @_authorized
+    @_exclusive
     async def cmd_set_stop_loss(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """損切ライン変更コマンド"""
-        if not self._check_authorization(update):
-            await self._send_reply(update, "⛔ 認証エラー：このBotを使用する権限がありません")
-            return
-
         try:
             if len(context.args) != 1:
                 await self._send_reply(update, "❌ 使い方: /set_stop_loss <値>\n例: /set_stop_loss 8.0")
@@ -291,22 +715,15 @@ class TelegramBotHandler:
                 await self._send_reply(update, "❌ 値は1.0～30.0の範囲で指定してください")
                 return
 
-            # 設定ファイル更新
-            config_path = Path("config/config.yaml")
-            with open(config_path, 'r', encoding='utf-8') as f:
-                config = yaml.safe_load(f)
+            # 設定ファイル更新（キャッシュを書き換えないようコピーして編集）
+            config_path = CONFIG_PATH
+            config = copy.deepcopy(await asyncio.to_thread(_load_config, config_path))
 
             old_value = config['risk_management']['stop_loss_pct']
             config['risk_management']['stop_loss_pct'] = new_value
 
-            # バックアップ作成
-            backup_path = config_path.parent / f"config.yaml.backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-            with open(backup_path, 'w', encoding='utf-8') as f:
-                yaml.dump(config, f, allow_unicode=True, default_flow_style=False)
-
-            # 保存
-            with open(config_path, 'w', encoding='utf-8') as f:
-                yaml.dump(config, f, allow_unicode=True, default_flow_style=False)
+            # 保存（変更前の内容はローテーションバックアップに退避）
+            backup_path = await asyncio.to_thread(_save_config, config_path, config)
 
             # 実行中インスタンスにも反映
             if self.trader:
@@ -318,86 +735,101 @@ class TelegramBotHandler:
 {old_value}% → <b>{new_value}%</b>
 
 次回取引から適用されます。
-バックアップ: {backup_path.name}
+バックアップ: {backup_path.name if backup_path else 'なし（変更なし）'}
 """
             await self._send_reply(update, message.strip())
             logger.info(f"損切ライン変更: {old_value}% → {new_value}% (Chat ID: {update.effective_chat.id})")
 
         except ValueError:
             await self._send_reply(update, "❌ 数値を正しく入力してください")
-        except Exception as e:
-            logger.error(f"set_stop_lossコマンドエラー: {e}")
-            await self._send_reply(update, f"⚠️ エラー: {str(e)}")
 
+    @_authorized
+    @_exclusive
     async def cmd_close_all(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """全ポジションクローズコマンド"""
-        if not self._check_authorization(update):
-            await self._send_reply(update, "⛔ 認証エラー：このBotを使用する権限がありません")
+        if not self.trader:
+            await self._send_reply(update, "⚠️ トレーダーインスタンスが未設定です")
             return
 
-        try:
-            if not self.trader:
-                await self._send_reply(update, "⚠️ トレーダーインスタンスが未設定です")
-                return
-
-            positions = self.trader.position_manager.get_all_positions()
+        positions = list(self.trader.position_manager.get_all_positions().values())
 
-            if not positions:
-                await self._send_reply(update, "📭 クローズするポジションがありません")
-                return
+        if not positions:
+            await self._send_reply(update, "📭 クローズするポジションがありません")
+            return
 
-            # 確認メッセージ（引数なしの場合）
-            if not context.args or context.args[0].lower() != 'confirm':
-                message = f"""
+        # 確認メッセージ（引数なしの場合）
+        if not context.args or context.args[0].lower() != 'confirm':
+            message = f"""
 ⚠️ <b>全ポジションクローズ確認</b>
 
 {len(positions)}件のポジションをクローズします。
 
 """
-                for pos in positions:
-                    message += f"• {pos.symbol} {pos.side.upper()}\n"
+            for pos in positions:
+                message += f"• {pos.symbol} {pos.side.upper()}\n"
 
-                message += """
+            message += """
 <b>実行するには:</b>
 /close_all confirm
 """
-                await self._send_reply(update, message.strip())
-                return
+            await self._send_reply(update, message.strip())
+            return
 
-            # 実行
-            closed_count = 0
-            total_pnl = 0.0
-            errors = []
+        # 実行
+        closed_count = 0
+        total_pnl = 0.0
+        errors = []
 
-            for pos in positions:
-                try:
-                    current_price = self.trader.order_executor.get_current_price(pos.symbol)
+        prices = await asyncio.to_thread(self._get_position_prices, positions)
 
-                    # クローズ注文
-                    if pos.side == SIDE_LONG:
-                        order = self.trader.order_executor.create_market_sell(
-                            pos.symbol, pos.quantity
-                        )
-                    else:
-                        order = self.trader.order_executor.create_market_buy(
-                            pos.symbol, pos.quantity
-                        )
-
-                    if order:
-                        pnl = pos.calculate_unrealized_pnl(current_price)
-                        total_pnl += pnl
-                        self.trader.position_manager.close_position(pos.symbol)
-                        closed_count += 1
-                        logger.info(f"ポジションクローズ: {pos.symbol} PnL={pnl:.0f}")
-                except Exception as e:
-                    errors.append(f"{pos.symbol}: {str(e)}")
-                    logger.error(f"クローズエラー: {pos.symbol} - {e}")
+        def close_one(pos) -> Optional[float]:
+            """1ポジションをクローズ（同期API呼び出し、スレッドで実行）"""
+            current_price = prices[pos.symbol]
 
-            # 取引一時停止
-            self.trader.risk_manager.trading_paused = True
+            # クローズ注文（ロングは売り、ショートは買い戻し）
+            close_side = ORDER_SELL if pos.side == SIDE_LONG else ORDER_BUY
+            order = self.trader.order_executor.create_market_order(
+                pos.symbol, close_side, pos.quantity
+            )
 
-            pnl_emoji = "📈" if total_pnl >= 0 else "📉"
-            message = f"""
+            if not order:
+                return None
+
+            pnl = pos.calculate_unrealized_pnl(current_price)
+            self.trader.position_manager.close_position(pos.symbol, current_price)
+            logger.info(f"ポジションクローズ: {pos.symbol} PnL={pnl:.0f}")
+            return pnl
+
+        targets = []
+        for pos in positions:
+            if pos.symbol in prices:
+                targets.append(pos)
+            else:
+                errors.append(f"{pos.symbol}: 価格取得失敗")
+
+        # シンボルごとの注文は独立しているため並行して実行
+        results = await asyncio.gather(
+            *(asyncio.to_thread(close_one, pos) for pos in targets),
+            return_exceptions=True
+        )
+
+        for pos, result in zip(targets, results):
+            if isinstance(result, Exception):
+                errors.append(f"{pos.symbol}: {str(result)}")
+                logger.error(f"クローズエラー: {pos.symbol} - {result}")
+            elif result is not None:
+                total_pnl += result
+                closed_count += 1
+
+        # 注文後は残高・価格が変わるためキャッシュを破棄
+        with self._market_lock:
+            self._market_cache.clear()
+
+        # 取引一時停止
+        self.trader.risk_manager.trading_paused = True
+
+        pnl_emoji = "📈" if total_pnl >= 0 else "📉"
+        message = f"""
 🔴 <b>全ポジションクローズ完了</b>
 
 クローズ: {closed_count}/{len(positions)}件
@@ -406,65 +838,56 @@ class TelegramBotHandler:
 ⏸️ 取引を一時停止しました
 再開: /resume
 """
-            if errors:
-                message += f"\n⚠️ エラー: {len(errors)}件\n"
-                for err in errors[:3]:
-                    message += f"• {err}\n"
-
-            await self._send_reply(update, message.strip())
-            logger.warning(f"全ポジションクローズ実行: {closed_count}件 (Chat ID: {update.effective_chat.id})")
+        if errors:
+            message += f"\n⚠️ エラー: {len(errors)}件\n"
+            for err in errors[:3]:
+                message += f"• {err}\n"
 
-        except Exception as e:
-            logger.error(f"close_allコマンドエラー: {e}")
-            await self._send_reply(update, f"⚠️ エラー: {str(e)}")
+        await self._send_reply(update, message.strip())
+        logger.warning(f"全ポジションクローズ実行: {closed_count}件 (Chat ID: {update.effective_chat.id})")
 
+    @_authorized
+    @_exclusive
     async def cmd_rebalance(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """リバランスコマンド（配分に合わせて超過分を売却）"""
-        if not self._check_authorization(update):
-            await self._send_reply(update, "⛔ 認証エラー：このBotを使用する権限がありません")
+        if not self.trader:
+            await self._send_reply(update, "⚠️ トレーダーインスタンスが未設定です")
             return
 
-        try:
-            if not self.trader:
-                await self._send_reply(update, "⚠️ トレーダーインスタンスが未設定です")
-                return
+        # 設定読み込み
+        config = await asyncio.to_thread(_load_config, CONFIG_PATH)
 
-            # 設定読み込み
-            config_path = Path("config/config.yaml")
-            with open(config_path, 'r', encoding='utf-8') as f:
-                config = yaml.safe_load(f)
+        alloc = config.get('strategy_allocation', {})
+        crypto_ratio = alloc.get('crypto_ratio', 0.5)
 
-            alloc = config.get('strategy_allocation', {})
-            crypto_ratio = alloc.get('crypto_ratio', 0.5)
+        # 実際の総資産を計算（現金 + ポジション評価額）
+        balance = await asyncio.to_thread(self._get_jpy_balance)
+        cash_balance = balance.get('free', 0) + balance.get('used', 0)
 
-            # 実際の総資産を計算（現金 + ポジション評価額）
-            cash_balance = 0.0
-            try:
-                balance = self.trader.order_executor.get_balance('JPY')
-                cash_balance = balance.get('free', 0) + balance.get('used', 0)
-            except Exception:
-                pass
+        # 現在のポジション価値を計算（価格は1回だけ取得し、評価額と売却順の両方に使う）
+        positions = list(self.trader.position_manager.get_all_positions().values())
+        prices = await asyncio.to_thread(self._get_position_prices, positions)
 
-            # 現在のポジション価値を計算
-            positions = self.trader.position_manager.get_all_positions()
-            current_crypto = 0.0
+        pos_with_value = []
+        missing_price = []
+        for pos in positions:
+            if pos.symbol in prices:
+                current_price = prices[pos.symbol]
+                pos_with_value.append((pos, current_price, pos.quantity * current_price))
+            else:
+                missing_price.append(pos.symbol)
 
-            for pos in positions:
-                try:
-                    current_price = self.trader.order_executor.get_current_price(pos.symbol)
-                    current_crypto += pos.quantity * current_price
-                except Exception:
-                    pass
+        current_crypto = sum(value for _, _, value in pos_with_value)
 
-            total_assets = cash_balance + current_crypto
-            target_crypto = total_assets * crypto_ratio
+        total_assets = cash_balance + current_crypto
+        target_crypto = total_assets * crypto_ratio
 
-            excess = current_crypto - target_crypto
+        excess = current_crypto - target_crypto
 
-            # 確認メッセージ（引数なしの場合）
-            if not context.args or context.args[0].lower() != 'confirm':
-                if excess <= 0:
-                    message = f"""
+        # 確認メッセージ（引数なしの場合）
+        if not context.args or context.args[0].lower() != 'confirm':
+            if excess <= 0:
+                message = f"""
 ✅ <b>リバランス不要</b>
 
 総資産: ¥{total_assets:,.0f}
@@ -473,8 +896,8 @@ class TelegramBotHandler:
 
 超過分はありません。
 """
-                else:
-                    message = f"""
+            else:
+                message = f"""
 ⚖️ <b>リバランス確認</b>
 
 総資産: ¥{total_assets:,.0f}
@@ -487,63 +910,57 @@ class TelegramBotHandler:
 <b>実行するには:</b>
 /rebalance confirm
 """
-                await self._send_reply(update, message.strip())
-                return
+            await self._send_reply(update, message.strip())
+            return
 
-            if excess <= 0:
-                await self._send_reply(update, "✅ リバランス不要です（超過分なし）")
-                return
+        if excess <= 0:
+            await self._send_reply(update, "✅ リバランス不要です（超過分なし）")
+            return
 
-            # リバランス実行（超過分を売却）
-            sold_amount = 0.0
-            errors = []
+        # リバランス実行（超過分を売却）
+        sold_amount = 0.0
+        errors = [f"{symbol}: 価格取得失敗" for symbol in missing_price]
 
-            # ポジションを価値順にソート（大きいものから売却）
-            pos_with_value = []
-            for pos in positions:
-                try:
-                    current_price = self.trader.order_executor.get_current_price(pos.symbol)
-                    value = pos.quantity * current_price
-                    pos_with_value.append((pos, current_price, value))
-                except Exception as e:
-                    errors.append(f"{pos.symbol}: 価格取得失敗")
+        # 価値の大きいものから売却（超過分が解消すれば打ち切るため、全体をソートせずヒープから取り出す）
+        # 同額の場合は元の順序を保つようインデックスを第2キーにする
+        heap = [(-value, i) for i, (_, _, value) in enumerate(pos_with_value)]
+        heapq.heapify(heap)
 
-            pos_with_value.sort(key=lambda x: x[2], reverse=True)
+        remaining_excess = excess
+        while heap and remaining_excess > 0:
+            pos, current_price, value = pos_with_value[heapq.heappop(heap)[1]]
 
-            remaining_excess = excess
-            for pos, current_price, value in pos_with_value:
-                if remaining_excess <= 0:
-                    break
+            # 売却数量を計算
+            sell_value = min(remaining_excess, value)
+            sell_qty = sell_value / current_price
 
-                # 売却数量を計算
-                sell_value = min(remaining_excess, value)
-                sell_qty = sell_value / current_price
+            try:
+                # ロングは売り、ショートは買い戻し（同期API呼び出しのためスレッドで実行）
+                close_side = ORDER_SELL if pos.side == SIDE_LONG else ORDER_BUY
+                order = await asyncio.to_thread(
+                    self.trader.order_executor.create_market_order,
+                    pos.symbol, close_side, sell_qty
+                )
 
-                try:
-                    if pos.side == SIDE_LONG:
-                        order = self.trader.order_executor.create_market_sell(
-                            pos.symbol, sell_qty
-                        )
-                    else:
-                        order = self.trader.order_executor.create_market_buy(
-                            pos.symbol, sell_qty
-                        )
+                if order:
+                    sold_amount += sell_value
+                    remaining_excess -= sell_value
 
-                    if order:
-                        sold_amount += sell_value
-                        remaining_excess -= sell_value
+                    # ポジション更新
+                    if sell_qty >= pos.quantity:
+                        self.trader.position_manager.close_position(pos.symbol, current_price)
+                    else:
+                        pos.quantity -= sell_qty
 
-                        # ポジション更新
-                        if sell_qty >= pos.quantity:
-                            self.trader.position_manager.close_position(pos.symbol)
-                        else:
-                            pos.quantity -= sell_qty
+                    logger.info(f"リバランス売却: {pos.symbol} ¥{sell_value:,.0f}")
+            except Exception as e:
+                errors.append(f"{pos.symbol}: {str(e)}")
 
-                        logger.info(f"リバランス売却: {pos.symbol} ¥{sell_value:,.0f}")
-                except Exception as e:
-                    errors.append(f"{pos.symbol}: {str(e)}")
+        # 注文後は残高・価格が変わるためキャッシュを破棄
+        with self._market_lock:
+            self._market_cache.clear()
 
-            message = f"""
+        message = f"""
 ⚖️ <b>リバランス完了</b>
 
 売却額: <b>¥{sold_amount:,.0f}</b>
@@ -551,62 +968,47 @@ class TelegramBotHandler:
 
 /allocation で確認できます
 """
-            if errors:
-                message += f"\n⚠️ エラー: {len(errors)}件\n"
-                for err in errors[:3]:
-                    message += f"• {err}\n"
+        if errors:
+            message += f"\n⚠️ エラー: {len(errors)}件\n"
+            for err in errors[:3]:
+                message += f"• {err}\n"
 
-            await self._send_reply(update, message.strip())
-            logger.info(f"リバランス実行: ¥{sold_amount:,.0f} (Chat ID: {update.effective_chat.id})")
-
-        except Exception as e:
-            logger.error(f"rebalanceコマンドエラー: {e}")
-            await self._send_reply(update, f"⚠️ エラー: {str(e)}")
+        await self._send_reply(update, message.strip())
+        logger.info(f"リバランス実行: ¥{sold_amount:,.0f} (Chat ID: {update.effective_chat.id})")
 
+    @_authorized
     async def cmd_allocation(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """戦略配分確認コマンド"""
-        if not self._check_authorization(update):
-            await self._send_reply(update, "⛔ 認証エラー：このBotを使用する権限がありません")
-            return
+        config = await asyncio.to_thread(_load_config, CONFIG_PATH)
 
-        try:
-            config_path = Path("config/config.yaml")
-            with open(config_path, 'r', encoding='utf-8') as f:
-                config = yaml.safe_load(f)
+        alloc = config.get('strategy_allocation', {})
 
-            alloc = config.get('strategy_allocation', {})
+        # 実際の総資産を計算（現金 + ポジション評価額）
+        cash_balance = 0.0
+        position_value = 0.0
 
-            # 実際の総資産を計算（現金 + ポジション評価額）
-            cash_balance = 0.0
-            position_value = 0.0
+        if self.trader:
+            balance = await asyncio.to_thread(self._get_jpy_balance)
+            cash_balance = balance.get('free', 0) + balance.get('used', 0)
 
-            if self.trader:
-                try:
-                    balance = self.trader.order_executor.get_balance('JPY')
-                    cash_balance = balance.get('free', 0) + balance.get('used', 0)
-                except Exception:
-                    pass
-
-                positions = self.trader.position_manager.get_all_positions()
-                for pos in positions:
-                    try:
-                        current_price = self.trader.order_executor.get_current_price(pos.symbol)
-                        position_value += pos.quantity * current_price
-                    except Exception:
-                        pass
-
-            total_assets = cash_balance + position_value
-
-            crypto_ratio = alloc.get('crypto_ratio', 0.5)
-            trend_ratio = alloc.get('trend_ratio', 0.5)
-            coint_ratio = alloc.get('cointegration_ratio', 0.5)
-
-            target_crypto = total_assets * crypto_ratio
-            target_trend = target_crypto * trend_ratio
-            target_coint = target_crypto * coint_ratio
-            target_cash = total_assets - target_crypto
+            positions = list(self.trader.position_manager.get_all_positions().values())
+            prices = await asyncio.to_thread(self._get_position_prices, positions)
+            for pos in positions:
+                if pos.symbol in prices:
+                    position_value += pos.quantity * prices[pos.symbol]
 
-            message = f"""
+        total_assets = cash_balance + position_value
+
+        crypto_ratio = alloc.get('crypto_ratio', 0.5)
+        trend_ratio = alloc.get('trend_ratio', 0.5)
+        coint_ratio = alloc.get('cointegration_ratio', 0.5)
+
+        target_crypto = total_assets * crypto_ratio
+        target_trend = target_crypto * trend_ratio
+        target_coint = target_crypto * coint_ratio
+        target_cash = total_assets - target_crypto
+
+        message = f"""
 📊 <b>戦略配分</b>
 ━━━━━━━━━━━━━━━━
 
@@ -630,19 +1032,13 @@ class TelegramBotHandler:
 /set_alloc trend 0.5
 /set_alloc coint 0.5
 """
-            await self._send_reply(update, message.strip())
-            logger.info(f"配分確認: Chat ID {update.effective_chat.id}")
-
-        except Exception as e:
-            logger.error(f"allocationコマンドエラー: {e}")
-            await self._send_reply(update, f"⚠️ エラー: {str(e)}")
+        await self._send_reply(update, message.strip())
+        logger.info(f"配分確認: Chat ID {update.effective_chat.id}")
 
+    @_authorized
+    @_exclusive
     async def cmd_set_allocation(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """戦略配分変更コマンド"""
-        if not self._check_authorization(update):
-            await self._send_reply(update, "⛔ 認証エラー：このBotを使用する権限がありません")
-            return
-
         try:
             if len(context.args) != 2:
                 await self._send_reply(update, """❌ 使い方: /set_alloc <種類> <値>
@@ -675,10 +1071,9 @@ class TelegramBotHandler:
 
             config_key = type_map[alloc_type]
 
-            # 設定ファイル更新
-            config_path = Path("config/config.yaml")
-            with open(config_path, 'r', encoding='utf-8') as f:
-                config = yaml.safe_load(f)
+            # 設定ファイル更新（キャッシュを書き換えないようコピーして編集）
+            config_path = CONFIG_PATH
+            config = copy.deepcopy(await asyncio.to_thread(_load_config, config_path))
 
             if 'strategy_allocation' not in config:
                 config['strategy_allocation'] = {}
@@ -686,14 +1081,8 @@ class TelegramBotHandler:
             old_value = config['strategy_allocation'].get(config_key, 0.5)
             config['strategy_allocation'][config_key] = new_value
 
-            # バックアップ作成
-            backup_path = config_path.parent / f"config.yaml.backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-            with open(backup_path, 'w', encoding='utf-8') as f:
-                yaml.dump(config, f, allow_unicode=True, default_flow_style=False)
-
-            # 保存
-            with open(config_path, 'w', encoding='utf-8') as f:
-                yaml.dump(config, f, allow_unicode=True, default_flow_style=False)
+            # 保存（変更前の内容はローテーションバックアップに退避）
+            backup_path = await asyncio.to_thread(_save_config, config_path, config)
 
             type_names = {
                 'crypto': 'コイン投資比率',
@@ -715,33 +1104,24 @@ class TelegramBotHandler:
 
         except ValueError:
             await self._send_reply(update, "❌ 数値を正しく入力してください（例: 0.5）")
-        except Exception as e:
-            logger.error(f"set_allocationコマンドエラー: {e}")
-            await self._send_reply(update, f"⚠️ エラー: {str(e)}")
 
+    @_authorized
     async def cmd_leverage(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """レバレッジ設定確認コマンド"""
-        if not self._check_authorization(update):
-            await self._send_reply(update, "⛔ 認証エラー：このBotを使用する権限がありません")
-            return
-
-        try:
-            config_path = Path("config/config.yaml")
-            with open(config_path, 'r', encoding='utf-8') as f:
-                config = yaml.safe_load(f)
+        config = await asyncio.to_thread(_load_config, CONFIG_PATH)
 
-            leverage = config.get('leverage', {})
-            enabled = leverage.get('enabled', False)
-            max_leverage = leverage.get('max_leverage', 2.0)
-            fx_symbol = leverage.get('fx_symbol', 'FX_BTC_JPY')
-            margin_call = leverage.get('margin_call_threshold', 0.8)
-            liquidation = leverage.get('liquidation_threshold', 0.5)
-            allow_short = leverage.get('allow_short', False)
+        leverage = config.get('leverage', {})
+        enabled = leverage.get('enabled', False)
+        max_leverage = leverage.get('max_leverage', 2.0)
+        fx_symbol = leverage.get('fx_symbol', 'FX_BTC_JPY')
+        margin_call = leverage.get('margin_call_threshold', 0.8)
+        liquidation = leverage.get('liquidation_threshold', 0.5)
+        allow_short = leverage.get('allow_short', False)
 
-            status_emoji = "🟢" if enabled else "⚪"
-            short_emoji = "✅" if allow_short else "❌"
+        status_emoji = "🟢" if enabled else "⚪"
+        short_emoji = "✅" if allow_short else "❌"
 
-            message = f"""
+        message = f"""
 ⚡ <b>レバレッジ設定</b>
 ━━━━━━━━━━━━━━━━
 
@@ -762,24 +1142,17 @@ class TelegramBotHandler:
 /set_leverage 1.5 - レバレッジ倍率
 /set_leverage short on - ショート有効
 
-⏰ {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+⏰ {_timestamp()}
 """
-            await self._send_reply(update, message.strip())
-            logger.info(f"レバレッジ設定確認: Chat ID {update.effective_chat.id}")
-
-        except Exception as e:
-            logger.error(f"leverageコマンドエラー: {e}")
-            await self._send_reply(update, f"⚠️ エラー: {str(e)}")
+        await self._send_reply(update, message.strip())
+        logger.info(f"レバレッジ設定確認: Chat ID {update.effective_chat.id}")
 
+    @_authorized
+    @_exclusive
     async def cmd_set_leverage(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """レバレッジ設定変更コマンド"""
-        if not self._check_authorization(update):
-            await self._send_reply(update, "⛔ 認証エラー：このBotを使用する権限がありません")
-            return
-
-        try:
-            if len(context.args) < 1:
-                await self._send_reply(update, """❌ 使い方: /set_leverage <設定>
+        if len(context.args) < 1:
+            await self._send_reply(update, """❌ 使い方: /set_leverage <設定>
 
 <b>設定:</b>
 • on - FX取引（レバレッジ）有効
@@ -792,100 +1165,93 @@ class TelegramBotHandler:
 /set_leverage on
 /set_leverage 1.5
 /set_leverage short on""")
+            return
+
+        # 設定ファイル読み込み（キャッシュを書き換えないようコピーして編集）
+        config_path = CONFIG_PATH
+        config = copy.deepcopy(await asyncio.to_thread(_load_config, config_path))
+
+        if 'leverage' not in config:
+            config['leverage'] = {
+                'enabled': False,
+                'max_leverage': 2.0,
+                'fx_symbol': 'FX_BTC_JPY',
+                'margin_call_threshold': 0.8,
+                'liquidation_threshold': 0.5,
+                'allow_short': False
+            }
+
+        arg1 = context.args[0].lower()
+        change_msg = ""
+
+        # ショート設定
+        if arg1 == 'short':
+            if len(context.args) < 2:
+                await self._send_reply(update, "❌ 使い方: /set_leverage short on/off")
                 return
 
-            # 設定ファイル読み込み
-            config_path = Path("config/config.yaml")
-            with open(config_path, 'r', encoding='utf-8') as f:
-                config = yaml.safe_load(f)
-
-            if 'leverage' not in config:
-                config['leverage'] = {
-                    'enabled': False,
-                    'max_leverage': 2.0,
-                    'fx_symbol': 'FX_BTC_JPY',
-                    'margin_call_threshold': 0.8,
-                    'liquidation_threshold': 0.5,
-                    'allow_short': False
-                }
-
-            arg1 = context.args[0].lower()
-            change_msg = ""
-
-            # ショート設定
-            if arg1 == 'short':
-                if len(context.args) < 2:
-                    await self._send_reply(update, "❌ 使い方: /set_leverage short on/off")
-                    return
+            arg2 = context.args[1].lower()
+            if arg2 == 'on':
+                old_val = config['leverage'].get('allow_short', False)
+                config['leverage']['allow_short'] = True
+                change_msg = f"ショート: {'許可' if old_val else '禁止'} → <b>許可</b>"
+            elif arg2 == 'off':
+                old_val = config['leverage'].get('allow_short', False)
+                config['leverage']['allow_short'] = False
+                change_msg = f"ショート: {'許可' if old_val else '禁止'} → <b>禁止</b>"
+            else:
+                await self._send_reply(update, "❌ on または off を指定してください")
+                return
 
-                arg2 = context.args[1].lower()
-                if arg2 == 'on':
-                    old_val = config['leverage'].get('allow_short', False)
-                    config['leverage']['allow_short'] = True
-                    change_msg = f"ショート: {'許可' if old_val else '禁止'} → <b>許可</b>"
-                elif arg2 == 'off':
-                    old_val = config['leverage'].get('allow_short', False)
-                    config['leverage']['allow_short'] = False
-                    change_msg = f"ショート: {'許可' if old_val else '禁止'} → <b>禁止</b>"
-                else:
-                    await self._send_reply(update, "❌ on または off を指定してください")
-                    return
+        # FX取引有効/無効
+        elif arg1 == 'on':
+            old_val = config['leverage'].get('enabled', False)
+            config['leverage']['enabled'] = True
+            change_msg = f"レバレッジ: {'有効' if old_val else '無効'} → <b>有効（FX取引）</b>"
 
-            # FX取引有効/無効
-            elif arg1 == 'on':
-                old_val = config['leverage'].get('enabled', False)
-                config['leverage']['enabled'] = True
-                change_msg = f"レバレッジ: {'有効' if old_val else '無効'} → <b>有効（FX取引）</b>"
+            # 実行中インスタンスにも反映
+            if self.trader and hasattr(self.trader, 'leverage_config'):
+                self.trader.leverage_config['enabled'] = True
+                if hasattr(self.trader, 'order_executor'):
+                    self.trader.order_executor.leverage_enabled = True
 
-                # 実行中インスタンスにも反映
-                if self.trader and hasattr(self.trader, 'leverage_config'):
-                    self.trader.leverage_config['enabled'] = True
-                    if hasattr(self.trader, 'order_executor'):
-                        self.trader.order_executor.leverage_enabled = True
+        elif arg1 == 'off':
+            old_val = config['leverage'].get('enabled', False)
+            config['leverage']['enabled'] = False
+            change_msg = f"レバレッジ: {'有効' if old_val else '無効'} → <b>無効（現物取引）</b>"
+
+            # 実行中インスタンスにも反映
+            if self.trader and hasattr(self.trader, 'leverage_config'):
+                self.trader.leverage_config['enabled'] = False
+                if hasattr(self.trader, 'order_executor'):
+                    self.trader.order_executor.leverage_enabled = False
+
+        # レバレッジ倍率
+        else:
+            try:
+                new_leverage = float(arg1)
+                if new_leverage < 1.0 or new_leverage > 2.0:
+                    await self._send_reply(update, "❌ レバレッジは1.0～2.0の範囲で指定してください\n（bitFlyer FXは最大2倍）")
+                    return
 
-            elif arg1 == 'off':
-                old_val = config['leverage'].get('enabled', False)
-                config['leverage']['enabled'] = False
-                change_msg = f"レバレッジ: {'有効' if old_val else '無効'} → <b>無効（現物取引）</b>"
+                old_val = config['leverage'].get('max_leverage', 2.0)
+                config['leverage']['max_leverage'] = new_leverage
+                change_msg = f"最大レバレッジ: {old_val}倍 → <b>{new_leverage}倍</b>"
 
                 # 実行中インスタンスにも反映
                 if self.trader and hasattr(self.trader, 'leverage_config'):
-                    self.trader.leverage_config['enabled'] = False
+                    self.trader.leverage_config['max_leverage'] = new_leverage
                     if hasattr(self.trader, 'order_executor'):
-                        self.trader.order_executor.leverage_enabled = False
+                        self.trader.order_executor.max_leverage = new_leverage
 
-            # レバレッジ倍率
-            else:
-                try:
-                    new_leverage = float(arg1)
-                    if new_leverage < 1.0 or new_leverage > 2.0:
-                        await self._send_reply(update, "❌ レバレッジは1.0～2.0の範囲で指定してください\n（bitFlyer FXは最大2倍）")
-                        return
-
-                    old_val = config['leverage'].get('max_leverage', 2.0)
-                    config['leverage']['max_leverage'] = new_leverage
-                    change_msg = f"最大レバレッジ: {old_val}倍 → <b>{new_leverage}倍</b>"
-
-                    # 実行中インスタンスにも反映
-                    if self.trader and hasattr(self.trader, 'leverage_config'):
-                        self.trader.leverage_config['max_leverage'] = new_leverage
-                        if hasattr(self.trader, 'order_executor'):
-                            self.trader.order_executor.max_leverage = new_leverage
-
-                except ValueError:
-                    await self._send_reply(update, "❌ 無効な設定です。on/off または数値（1.0～2.0）を指定してください")
-                    return
-
-            # バックアップ作成
-            backup_path = config_path.parent / f"config.yaml.backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-            with open(backup_path, 'w', encoding='utf-8') as f:
-                yaml.dump(config, f, allow_unicode=True, default_flow_style=False)
+            except ValueError:
+                await self._send_reply(update, "❌ 無効な設定です。on/off または数値（1.0～2.0）を指定してください")
+                return
 
-            # 保存
-            with open(config_path, 'w', encoding='utf-8') as f:
-                yaml.dump(config, f, allow_unicode=True, default_flow_style=False)
+        # 保存（変更前の内容はローテーションバックアップに退避）
+        backup_path = await asyncio.to_thread(_save_config, config_path, config)
 
-            message = f"""
+        message = f"""
 ✅ <b>レバレッジ設定変更完了</b>
 
 {change_msg}
@@ -896,176 +1262,251 @@ FX取引はレバレッジにより損失も拡大します。
 
 /leverage で確認できます
 """
-            await self._send_reply(update, message.strip())
-            logger.info(f"レバレッジ設定変更: {change_msg} (Chat ID: {update.effective_chat.id})")
-
-        except Exception as e:
-            logger.error(f"set_leverageコマンドエラー: {e}")
-            await self._send_reply(update, f"⚠️ エラー: {str(e)}")
+        await self._send_reply(update, message.strip())
+        logger.info(f"レバレッジ設定変更: {change_msg} (Chat ID: {update.effective_chat.id})")
 
+    @_authorized
     async def cmd_commands(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """コマンド一覧（簡潔版）"""
-        if not self._check_authorization(update):
-            await self._send_reply(update, "⛔ 認証エラー：このBotを使用する権限がありません")
-            return
+        await self._send_reply(update, _COMMANDS_MSG)
 
-        message = """
-📋 <b>コマンド一覧</b>
+    @_authorized
+    async def cmd_help(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """ヘルプコマンド（詳細版）"""
+        await self._send_reply(update, _HELP_MSG)
 
-/status - 状態確認
-/positions - ポジション
-/config - 設定表示
-/allocation - 戦略配分確認
-/leverage - レバレッジ設定
-/pause - 一時停止
-/resume - 再開
-/close_all - 全ポジション売却
-/rebalance - 配分に合わせてリバランス
-/set_stop_loss <値> - 損切変更
-/set_alloc <種類> <値> - 配分変更
-/set_leverage <設定> - レバレッジ変更
-/commands - この一覧
-/help - 詳細ヘルプ
+    # ========== Bot起動・停止 ==========
 
-💡 「/」を入力するとコマンド候補が表示されます
-"""
-        await self._send_reply(update, message.strip())
+    def start(self):
+        """Bot起動（バックグラウンドスレッドのイベントループ上で実行）"""
+        if not self.enabled:
+            logger.warning("Bot機能が無効のため起動できません")
+            return
 
-    async def cmd_help(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """ヘルプコマンド（詳細版）"""
-        if not self._check_authorization(update):
-            await self._send_reply(update, "⛔ 認証エラー：このBotを使用する権限がありません")
+        if self.is_running:
+            logger.warning("Bot既に起動中")
             return
 
-        message = """
-🤖 <b>利用可能なコマンド</b>
-━━━━━━━━━━━━━━━━
+        # 停止通知は起動直後のstop()にも対応できるよう先に作成
+        self._stop_event = asyncio.Event()
 
-📊 <b>情報取得</b>
-/status - システム状態確認
-/positions - 保有ポジション一覧
-/config - 現在の設定表示
-/allocation - 戦略配分確認
-/leverage - レバレッジ設定
+        self.is_running = True
+        self._bot_future = self._loop_thread.submit(self._run_bot_async())
+        self._bot_future.add_done_callback(self._on_bot_done)
+        logger.info("Telegram Bot起動要求完了")
 
-⚙️ <b>制御</b>
-/pause - 取引一時停止
-/resume - 取引再開
-/close_all - 全ポジション売却
-/rebalance - 配分に合わせてリバランス
+    def _on_bot_done(self, future):
+        """Botライフサイクル終了時のコールバック"""
+        self.is_running = False
+        if not future.cancelled() and future.exception():
+            logger.error(f"Bot実行エラー: {future.exception()}")
 
-🔧 <b>設定変更</b>
-/set_stop_loss <値> - 損切ライン変更
-/set_alloc <種類> <値> - 戦略配分変更
-/set_leverage <設定> - レバレッジ変更
+    async def _setup_bot(self, application: Application):
+        """Bot初期設定（ポーリング開始前にpost_initとして実行）"""
+        from telegram import BotCommand
 
-⚡ <b>レバレッジ例</b>
-/set_leverage on - FX取引有効
-/set_leverage off - 現物取引
-/set_leverage 1.5 - 倍率変更
+        try:
+            # コマンドリスト設定（Telegram UIでコマンド候補を表示）
+            await application.bot.set_my_commands(
+                [BotCommand(command, description) for command, description in _BOT_COMMANDS]
+            )
+            logger.info("Botコマンドリスト設定完了")
+        except Exception as e:
+            logger.warning(f"Botコマンドリスト設定エラー: {e}")
+
+    def _build_application(self) -> Application:
+        """Application作成とハンドラー登録"""
+        from telegram.ext import Application, CommandHandler, MessageHandler, filters
+
+        application = (
+            Application.builder()
+            .token(self.bot_token)
+            .get_updates_read_timeout(GET_UPDATES_READ_TIMEOUT)
+            .concurrent_updates(True)  # 遅いコマンドが他のチャットを待たせないよう並行処理
+            .post_init(self._setup_bot)
+            .build()
+        )
+
+        # レート制限（group=-1で全コマンドより先に実行、コマンド以外のメッセージは対象外）
+        application.add_handler(MessageHandler(filters.COMMAND, self._check_rate_limit), group=-1)
+
+        # コマンドハンドラー登録（取引所APIを呼ぶ長いコマンドはblock=Falseで非同期実行、
+        # 注文・設定変更を伴うコマンドは_exclusiveで直列化）
+        application.add_handler(CommandHandler("status", self.cmd_status, block=False))
+        application.add_handler(CommandHandler("pause", self.cmd_pause))
+        application.add_handler(CommandHandler("resume", self.cmd_resume))
+        application.add_handler(CommandHandler("positions", self.cmd_positions, block=False))
+        application.add_handler(CommandHandler("config", self.cmd_config))
+        application.add_handler(CommandHandler("allocation", self.cmd_allocation))
+        application.add_handler(CommandHandler("leverage", self.cmd_leverage))
+        application.add_handler(CommandHandler("close_all", self.cmd_close_all, block=False))
+        application.add_handler(CommandHandler("rebalance", self.cmd_rebalance, block=False))
+        application.add_handler(CommandHandler("set_stop_loss", self.cmd_set_stop_loss))
+        application.add_handler(CommandHandler("set_alloc", self.cmd_set_allocation))
+        application.add_handler(CommandHandler("set_leverage", self.cmd_set_leverage))
+        application.add_handler(CommandHandler("commands", self.cmd_commands))
+        application.add_handler(CommandHandler("help", self.cmd_help))
+        application.add_handler(CommandHandler("start", self.cmd_commands))
+
+        return application
+
+    async def _run_bot_async(self):
+        """Botのライフサイクル（起動→stop()まで待機→終了処理）"""
+        await self.start_async()
+        try:
+            # stop()が呼ばれるまで待機
+            await self._stop_event.wait()
+        finally:
+            await self.stop_async()
 
-❓ <b>その他</b>
-/commands - コマンド一覧（簡潔版）
-/help - この詳細ヘルプ
+    async def start_async(self):
+        """
+        Bot起動（実行中のイベントループ上で呼び出す）
 
-💡 <b>ヒント</b>
-チャット入力欄で「/」を入力すると
-コマンド候補が自動的に表示されます！
-"""
-        await self._send_reply(update, message.strip())
+        run_pollingはシグナルハンドラ登録やループ管理を行うためメインスレッド以外では使わず、
+        initialize/start/start_pollingを明示的に呼び出す
+        """
+        from telegram import Update
 
-    # ========== Bot起動・停止 ==========
+        application = self._build_application()
 
-    def start(self):
-        """Bot起動（別スレッドで実行）"""
-        if not self.enabled:
-            logger.warning("Bot機能が無効のため起動できません")
-            return
+        logger.info("Telegram Bot起動中...")
+        await application.initialize()
+        self.application = application
+        try:
+            if application.post_init:
+                await application.post_init(application)
 
-        if self.is_running:
-            logger.warning("Bot既に起動中")
+            await application.start()
+
+            if self.webhook_url:
+                # Webhook受信（Telegramからのpushでポーリングループが不要）
+                try:
+                    self._webhook_runner = await self._start_webhook(application)
+                except ImportError:
+                    logger.warning("aiohttp未インストールのためWebhookではなくポーリングで起動します")
+                except Exception as e:
+                    logger.error(f"Webhook起動失敗のためポーリングで起動します: {e}")
+
+            if self._webhook_runner is None:
+                # Polling開始（ロングポーリングで空のgetUpdatesを減らす）
+                await application.updater.start_polling(
+                    allowed_updates=Update.ALL_TYPES,
+                    timeout=POLLING_TIMEOUT,
+                    poll_interval=0.0,
+                    bootstrap_retries=-1
+                )
+        except BaseException:
+            await self.stop_async()
+            raise
+
+        self.is_running = True
+
+    async def stop_async(self):
+        """Bot停止（start_asyncと同じイベントループ上で呼び出す）"""
+        application = self.application
+        if application is None:
             return
 
-        async def setup_bot():
-            """Bot初期設定"""
+        if self._webhook_runner:
             try:
-                # コマンドリスト設定（Telegram UIでコマンド候補を表示）
-                commands = [
-                    BotCommand("status", "システム状態確認"),
-                    BotCommand("positions", "保有ポジション一覧"),
-                    BotCommand("config", "現在の設定表示"),
-                    BotCommand("allocation", "戦略配分確認"),
-                    BotCommand("leverage", "レバレッジ設定確認"),
-                    BotCommand("pause", "取引一時停止"),
-                    BotCommand("resume", "取引再開"),
-                    BotCommand("close_all", "全ポジション売却"),
-                    BotCommand("rebalance", "配分に合わせてリバランス"),
-                    BotCommand("set_stop_loss", "損切ライン変更"),
-                    BotCommand("set_alloc", "戦略配分変更"),
-                    BotCommand("set_leverage", "レバレッジ設定変更"),
-                    BotCommand("commands", "コマンド一覧"),
-                    BotCommand("help", "詳細ヘルプ"),
-                ]
-                await self.application.bot.set_my_commands(commands)
-                logger.info("Botコマンドリスト設定完了")
+                await application.bot.delete_webhook()
             except Exception as e:
-                logger.warning(f"Botコマンドリスト設定エラー: {e}")
+                logger.warning(f"Webhook解除エラー: {e}")
+            await self._webhook_runner.cleanup()
+            self._webhook_runner = None
+        if application.updater.running:
+            await application.updater.stop()
+        if application.running:
+            await application.stop()
+        await application.shutdown()
 
-        def run_bot():
-            """Botメインループ"""
-            try:
-                # Application作成
-                self.application = Application.builder().token(self.bot_token).build()
-
-                # コマンドハンドラー登録
-                self.application.add_handler(CommandHandler("status", self.cmd_status))
-                self.application.add_handler(CommandHandler("pause", self.cmd_pause))
-                self.application.add_handler(CommandHandler("resume", self.cmd_resume))
-                self.application.add_handler(CommandHandler("positions", self.cmd_positions))
-                self.application.add_handler(CommandHandler("config", self.cmd_config))
-                self.application.add_handler(CommandHandler("allocation", self.cmd_allocation))
-                self.application.add_handler(CommandHandler("leverage", self.cmd_leverage))
-                self.application.add_handler(CommandHandler("close_all", self.cmd_close_all))
-                self.application.add_handler(CommandHandler("rebalance", self.cmd_rebalance))
-                self.application.add_handler(CommandHandler("set_stop_loss", self.cmd_set_stop_loss))
-                self.application.add_handler(CommandHandler("set_alloc", self.cmd_set_allocation))
-                self.application.add_handler(CommandHandler("set_leverage", self.cmd_set_leverage))
-                self.application.add_handler(CommandHandler("commands", self.cmd_commands))
-                self.application.add_handler(CommandHandler("help", self.cmd_help))
-                self.application.add_handler(CommandHandler("start", self.cmd_commands))
-
-                logger.info("Telegram Bot起動中...")
-
-                # 起動時初期設定
-                self.application.job_queue.run_once(
-                    lambda context: setup_bot(),
-                    when=0
-                )
+        self.application = None
+        self.is_running = False
 
-                # Polling開始
-                self.application.run_polling(allowed_updates=Update.ALL_TYPES)
+    async def _start_webhook(self, application: Application) -> web.AppRunner:
+        """
+        Webhook受信サーバーを起動し、TelegramにWebhookを登録
 
-            except Exception as e:
-                logger.error(f"Bot実行エラー: {e}")
-                self.is_running = False
+        HTTPS終端はリバースプロキシで行い、ここではHTTPで待ち受ける
 
-        self.is_running = True
-        self.bot_thread = threading.Thread(target=run_bot, daemon=True)
-        self.bot_thread.start()
-        logger.info("Telegram Botスレッド起動完了")
+        Args:
+            application: Botアプリケーション
+
+        Returns:
+            aiohttpのAppRunner（停止時にcleanupする）
+
+        Raises:
+            Exception: 待ち受け開始・Webhook登録に失敗した場合（サーバーは停止済み）
+        """
+        from aiohttp import web
+        from telegram import Update
+
+        url_path = urlparse(self.webhook_url).path or "/"
+        # 起動ごとに生成し、Telegram以外からのリクエストを拒否する
+        secret_token = secrets.token_urlsafe(32)
+
+        async def handle_update(request: web.Request) -> web.Response:
+            if not hmac.compare_digest(request.headers.get(WEBHOOK_SECRET_HEADER, ""), secret_token):
+                return web.Response(status=403)
+            try:
+                data = await request.json()
+            except ValueError:
+                return web.Response(status=400)
+            await application.update_queue.put(Update.de_json(data, application.bot))
+            return web.Response()
+
+        app = web.Application()
+        app.router.add_post(url_path, handle_update)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        try:
+            await web.TCPSite(runner, self.webhook_listen, self.webhook_port).start()
+
+            await application.bot.set_webhook(
+                url=self.webhook_url,
+                allowed_updates=Update.ALL_TYPES,
+                secret_token=secret_token
+            )
+        except BaseException:
+            # 待ち受けを開始したままにしない
+            await runner.cleanup()
+            raise
+        logger.info(f"Telegram Webhook待ち受け開始: {self.webhook_listen}:{self.webhook_port}{url_path}")
+        return runner
+
+    def stop(self, timeout: float = 10.0):
+        """
+        Bot停止
 
-    def stop(self):
-        """Bot停止"""
+        Args:
+            timeout: Botの終了処理の待ち時間（秒）
+        """
         if not self.is_running:
             return
 
+        if self._bot_future is None:
+            logger.warning("start_asyncで起動したBotはstop_asyncで停止してください")
+            return
+
         logger.info("Telegram Bot停止中...")
-        self.is_running = False
 
-        if self.application:
-            try:
-                self.application.stop()
-            except Exception as e:
-                logger.debug(f"アプリケーション停止時のエラー（無視）: {e}")
+        # イベントループに停止を通知し、終了処理の完了を待つ
+        loop = self._loop_thread.loop
+        try:
+            loop.call_soon_threadsafe(self._stop_event.set)
+        except RuntimeError as e:
+            logger.debug(f"イベントループ停止済み: {e}")
+
+        try:
+            self._bot_future.result(timeout=timeout)
+        except concurrent.futures.TimeoutError:
+            logger.warning("Telegram Botが時間内に終了しませんでした")
+        except Exception as e:
+            logger.debug(f"Bot終了時エラー: {e}")
+
+        if self._owns_loop:
+            self._loop_thread.stop(timeout)
 
+        self.is_running = False
         logger.info("Telegram Bot停止完了")
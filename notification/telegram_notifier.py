@@ -3,14 +3,281 @@
 取引通知、日次サマリー、アラートなどを送信
 """
 
+from __future__ import annotations
+
+import functools
 import logging
-from typing import Optional, Dict, List
-from datetime import datetime
-import requests
+import threading
+import time
+from collections import deque, namedtuple
+from typing import TYPE_CHECKING, Optional, Dict, List
+from notification.async_loop import AsyncLoopThread
 from utils.constants import SIDE_LONG
 
+# telegramは通知有効時のみ遅延インポートする（バックテスト等で無効な場合の起動時間・メモリを削減）
+if TYPE_CHECKING:
+    from telegram import Bot
+    from telegram.request import HTTPXRequest
+
 logger = logging.getLogger(__name__)
 
+# 送信タイムアウト（秒）
+SEND_CONNECT_TIMEOUT = 3.05
+SEND_READ_TIMEOUT = 10.0
+# HTTP接続プールのサイズ（接続・TLSセッションを通知間で再利用する）
+CONNECTION_POOL_SIZE = 4
+# 送信リトライ: レート制限(429)はretry_afterに従い、通信エラーは指数バックオフで再送
+SEND_RETRY_TOTAL = 3
+SEND_RETRY_BACKOFF = 0.5
+# 1回の送信結果を待つ最大秒数（Bot側の接続・読み書き・プール待ちタイムアウトの合計より長くする）
+SEND_RESULT_TIMEOUT = 30.0
+
+# クライアント側レート制限（Telegram上限: 全体約30通/秒、チャットごと約1通/秒）
+GLOBAL_RATE_PER_SEC = 25
+GLOBAL_RATE_BURST = 30
+CHAT_RATE_PER_SEC = 1
+CHAT_RATE_BURST = 3
+# 低優先度の送信で使い切らず、高優先度（ストップロス・エラー等）用に残すトークン数
+HIGH_PRIORITY_RESERVED_TOKENS = 1
+
+# 非同期送信: 送信待ちキューの上限（送信は1つのディスパッチャースレッドが順番に行う）
+NOTIFY_QUEUE_SIZE = 256
+# 停止時に送信待ちメッセージの送信完了を待つ最大秒数
+NOTIFY_FLUSH_TIMEOUT = 15.0
+
+# 通知の優先度（キュー満杯時は低優先度の古いものから破棄する）
+PRIORITY_HIGH = 0   # 取引・ストップロス・アラート・エラー（破棄しない）
+PRIORITY_LOW = 10   # 情報通知・サマリー
+
+# 短時間に続いた通知はまとめて1通で送信する
+COALESCE_WINDOW = 0.5       # 最初の通知から待つ秒数
+COALESCE_MAX_CHARS = 3800   # 結合後の最大文字数（Telegram上限4096文字に余裕を持たせる）
+COALESCE_SEPARATOR = "\n\n━━━━━━━━━━━━━━━━\n"
+
+# 送信待ちの通知
+_Pending = namedtuple('_Pending', 'priority message parse_mode enqueued_at flush_now')
+
+# 通知フッターの時刻表示形式
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# 通知本文のテンプレート（str.format_mapで埋め込む）
+_TRADE_OPEN_TEMPLATE = """
+📈 <b>取引実行</b>
+
+{side_jp} <b>{symbol}</b>
+価格: ¥{price:,.0f}
+数量: {quantity:.6f}
+合計: ¥{total:,.0f}
+
+⏰ {timestamp}
+""".strip()
+
+_TRADE_CLOSE_TEMPLATE = """
+{emoji} <b>{result}</b>
+
+<b>{symbol}</b> {side_jp}ポジションクローズ
+
+エントリー: ¥{entry_price:,.0f}
+決済: ¥{exit_price:,.0f}
+数量: {quantity:.6f}
+
+💰 損益: <b>¥{pnl:,.0f}</b> ({pnl_pct:+.2f}%)
+
+⏰ {timestamp}
+""".strip()
+
+_STOP_LOSS_TEMPLATE = """
+🛑 <b>ストップロス発動</b>
+
+<b>{symbol}</b>
+現在価格: ¥{current_price:,.0f}
+損失率: {pnl_pct:.2f}%
+
+ポジションを自動クローズします。
+
+⏰ {timestamp}
+""".strip()
+
+_TAKE_PROFIT_TEMPLATE = """
+✅ <b>{level_jp}利益確定</b>
+
+<b>{symbol}</b>
+利益率: +{pnl_pct:.2f}%
+決済比率: {close_ratio:.0%}
+
+⏰ {timestamp}
+""".strip()
+
+_DAILY_SUMMARY_HEADER_TEMPLATE = """
+📊 <b>日次レポート</b>
+━━━━━━━━━━━━━━━━
+
+💰 総資産: <b>¥{total_equity:,.0f}</b>
+{pnl_emoji} 本日損益: <b>¥{daily_pnl:,.0f}</b> ({daily_pnl_pct:+.2f}%)
+
+📊 取引回数: {trades_count}回
+📈 勝率: {win_rate:.1%}
+
+【保有ポジション】
+""".lstrip()
+
+# アラート・エラー・情報通知（タイトル行 + 本文 + 時刻）
+_TITLED_TEMPLATE = """
+{icon} <b>{title}</b>
+
+{body}
+
+⏰ {timestamp}
+""".strip()
+
+_ERROR_TEMPLATE = """
+🚨 <b>エラー発生</b>
+
+種類: {error_type}
+詳細: {error_message}
+
+⏰ {timestamp}
+""".strip()
+
+_PAIR_TRADE_OPEN_TEMPLATE = """
+{emoji} <b>ペアトレード開始</b>
+
+📊 {pair_id}
+方向: {dir_jp}
+
+<b>{symbol1}</b>
+├ 数量: {size1:.6f}
+└ 価格: ¥{price1:,.0f}
+
+<b>{symbol2}</b>
+├ 数量: {size2:.6f}
+└ 価格: ¥{price2:,.0f}
+
+Zスコア: {z_score:.2f}
+ヘッジ比率: {hedge_ratio:.4f}
+投入資金: ¥{total_value:,.0f}
+
+⏰ {timestamp}
+""".strip()
+
+_PAIR_TRADE_CLOSE_TEMPLATE = """
+{emoji} <b>ペアトレード{result}</b>
+
+📊 {pair_id}
+{symbol1} / {symbol2}
+
+💰 損益: <b>¥{pnl:,.0f}</b>
+📝 理由: {reason_jp}
+""".lstrip()
+
+# ペアトレード終了理由の表示名
+_PAIR_CLOSE_REASONS = {
+    'take_profit': '利益目標達成',
+    'trailing_stop': 'トレーリングストップ',
+    'mean_reversion': '平均回帰',
+    'mean_reversion_profit': '平均回帰（利益）',
+    'stop_loss': 'ストップロス',
+    'direction_change': '方向転換'
+}
+
+# 円表記（¥1,234）のフォーマッタ
+_fmt_yen = "¥{:,.0f}".format
+
+
+def _http_version() -> str:
+    """
+    送信に使うHTTPバージョンを決定
+
+    h2パッケージがあればHTTP/2（1接続で複数リクエストを多重化）、
+    なければHTTP/1.1を使う
+
+    Returns:
+        HTTPXRequestに渡すHTTPバージョン
+    """
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return "1.1"
+    return "2"
+
+
+@functools.lru_cache(maxsize=1)
+def _format_timestamp(epoch_second: int) -> str:
+    """
+    UNIX秒を表示用文字列に変換（同じ秒なら結果を再利用）
+
+    Args:
+        epoch_second: UNIX時刻（秒）
+
+    Returns:
+        時刻文字列
+    """
+    return time.strftime(TIMESTAMP_FORMAT, time.localtime(epoch_second))
+
+
+def _timestamp() -> str:
+    """通知フッター用の現在時刻文字列"""
+    return _format_timestamp(int(time.time()))
+
+
+class _TokenBucket:
+    """スレッドセーフなトークンバケット（トークンを取得できるまで待機）"""
+
+    def __init__(self, rate: float, capacity: int):
+        """
+        Args:
+            rate: トークン補充速度（個/秒）
+            capacity: バケット容量（連続送信できる最大数）
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        """経過時間分のトークンを補充（_lock保持中に呼ぶ）"""
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def wait_time(self, reserve: int = 0) -> float:
+        """
+        トークンを取得できるまでの秒数（トークンは消費しない）
+
+        Args:
+            reserve: 取得後も残しておくトークン数
+
+        Returns:
+            0.0なら即取得可、正の値なら待ち秒数
+        """
+        with self._lock:
+            self._refill()
+            return max(0.0, (1 + reserve - self._tokens) / self.rate)
+
+    def acquire(self, reserve: int = 0):
+        """
+        トークンを1つ取得（不足している場合は補充まで待機）
+
+        Args:
+            reserve: 取得後も残しておくトークン数（低優先度の送信で高優先度用の枠を残す）
+        """
+        needed = 1 + reserve
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= needed:
+                    self._tokens -= 1
+                    return
+                wait = (needed - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def drain(self):
+        """トークンを空にする（サーバー側でレート制限された場合）"""
+        with self._lock:
+            self._tokens = 0.0
+            self._last = time.monotonic()
+
 
 class TelegramNotifier:
     """Telegram通知クラス"""
@@ -19,13 +286,15 @@ class TelegramNotifier:
         self,
         bot_token: Optional[str] = None,
         chat_id: Optional[str] = None,
-        enabled: bool = True
+        enabled: bool = True,
+        loop_thread: Optional[AsyncLoopThread] = None
     ):
         """
         Args:
             bot_token: Telegram Bot Token
             chat_id: Telegram Chat ID
             enabled: 通知を有効化
+            loop_thread: 共有イベントループ（Noneの場合は専用のループを作成）
         """
         self.bot_token = bot_token
         self.chat_id = chat_id
@@ -36,35 +305,270 @@ class TelegramNotifier:
         else:
             logger.info("Telegram通知が有効です")
 
-        self.api_url = f"https://api.telegram.org/bot{bot_token}/sendMessage" if bot_token else None
+        # python-telegram-botのBot（httpx接続プール）で送信する
+        # Botのコルーチンはイベントループ（Botハンドラーと共有可能）上で実行する
+        self._request: Optional[HTTPXRequest] = None
+        self._bot: Optional[Bot] = None
+        self._owns_loop = loop_thread is None
+        self._loop_thread = loop_thread
+        if self.enabled:
+            from telegram import Bot
+            from telegram.request import HTTPXRequest
+
+            self._request = HTTPXRequest(
+                connection_pool_size=CONNECTION_POOL_SIZE,
+                connect_timeout=SEND_CONNECT_TIMEOUT,
+                read_timeout=SEND_READ_TIMEOUT,
+                http_version=_http_version()
+            )
+            self._bot = Bot(bot_token, request=self._request, get_updates_request=self._request)
+            if self._loop_thread is None:
+                self._loop_thread = AsyncLoopThread(name="tg-notify-loop")
+
+        # 送信待ちキュー（_Pendingのdeque）と送信ディスパッチャー
+        # 送信順を保つため、取り出し・送信は1スレッドで順番に行う
+        self._queue = deque()
+        self._queue_cond = threading.Condition()
+        self._in_flight = 0
+        self._closed = False
+        self._dispatcher: Optional[threading.Thread] = None
+        if self.enabled:
+            self._dispatcher = threading.Thread(target=self._dispatch_loop, name="tg-notify", daemon=True)
+            self._dispatcher.start()
+
+        # 429を受ける前に送信ペースを抑えるトークンバケット（全体・チャット単位）
+        self._global_bucket = _TokenBucket(GLOBAL_RATE_PER_SEC, GLOBAL_RATE_BURST)
+        self._chat_bucket = _TokenBucket(CHAT_RATE_PER_SEC, CHAT_RATE_BURST)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        送信待ちメッセージの送信完了を待機
+
+        Args:
+            timeout: 最大待機秒数（Noneの場合は無制限）
 
-    def send_message(self, message: str, parse_mode: str = "HTML") -> bool:
+        Returns:
+            すべて送信し終えたかどうか
         """
-        メッセージを送信
+        with self._queue_cond:
+            return self._queue_cond.wait_for(
+                lambda: not self._queue and self._in_flight == 0, timeout
+            )
+
+    def close(self):
+        """送信待ちメッセージを送信してからディスパッチャー・HTTP接続・イベントループをクローズ"""
+        if not self.flush(NOTIFY_FLUSH_TIMEOUT):
+            logger.warning(f"Telegram通知の送信待ちが残ったまま停止します（{len(self._queue)}件）")
+        with self._queue_cond:
+            self._closed = True
+            self._queue.clear()
+            self._queue_cond.notify_all()
+        if self._dispatcher:
+            self._dispatcher.join(SEND_READ_TIMEOUT)
+
+        if self._request:
+            try:
+                self._loop_thread.submit(self._request.shutdown()).result(SEND_READ_TIMEOUT)
+            except Exception as e:
+                logger.warning(f"Telegram通知の接続クローズエラー: {e}")
+            if self._owns_loop:
+                self._loop_thread.stop(SEND_READ_TIMEOUT)
+
+    def send_message(
+        self,
+        message: str,
+        parse_mode: str = "HTML",
+        priority: int = PRIORITY_HIGH,
+        flush_now: bool = False
+    ) -> bool:
+        """
+        メッセージを送信キューに追加（送信はバックグラウンドで実行）
+
+        COALESCE_WINDOW秒以内に続いた通知は1通にまとめて送信する
 
         Args:
             message: 送信メッセージ
             parse_mode: パースモード（HTML or Markdown）
+            priority: 優先度（PRIORITY_HIGH or PRIORITY_LOW）
+            flush_now: Trueの場合はまとめずに即時送信
 
         Returns:
-            成功したかどうか
+            キューに追加できたかどうか
         """
         if not self.enabled:
             logger.debug(f"[テスト] Telegram通知: {message}")
             return True
 
-        try:
-            payload = {
-                'chat_id': self.chat_id,
-                'text': message,
-                'parse_mode': parse_mode
-            }
+        if self._closed:
+            logger.warning("Telegram通知は停止済みのため送信しません")
+            return False
 
-            response = requests.post(self.api_url, json=payload, timeout=10)
-            response.raise_for_status()
+        with self._queue_cond:
+            if len(self._queue) >= NOTIFY_QUEUE_SIZE and not self._drop_oldest_low_priority():
+                if priority >= PRIORITY_LOW:
+                    logger.warning("Telegram通知キューが満杯のため低優先度メッセージを破棄しました")
+                    return False
+                # 高優先度は上限を超えても保持する
+                logger.warning(f"Telegram通知キューが上限を超えています（{len(self._queue)}件）")
+            self._queue.append(_Pending(priority, message, parse_mode, time.monotonic(), flush_now))
+            # 待機中のディスパッチャーを起こす（即時送信・高優先度なら送信対象を選び直す）
+            self._queue_cond.notify_all()
 
-            logger.info("Telegram通知送信成功")
-            return True
+        return True
+
+    def _drop_oldest_low_priority(self) -> bool:
+        """
+        キュー内で最も古い低優先度メッセージを1件破棄（_queue_cond保持中に呼ぶ）
+
+        Returns:
+            破棄できたかどうか
+        """
+        for i, pending in enumerate(self._queue):
+            if pending.priority >= PRIORITY_LOW:
+                del self._queue[i]
+                logger.warning("Telegram通知キューが満杯のため古い低優先度メッセージを破棄しました")
+                return True
+        return False
+
+    def _dispatch_loop(self):
+        """キューからメッセージを順番に取り出して送信（ディスパッチャースレッドで実行）"""
+        while True:
+            with self._queue_cond:
+                batch = self._next_batch()
+                if batch is None:
+                    return
+                self._in_flight += 1
+
+            try:
+                self._send_message_sync(*batch)
+            except Exception as e:
+                # ディスパッチャーは1つのため、想定外のエラーでも止めずに次の通知へ進む
+                logger.error(f"Telegram通知送信エラー: {e}")
+            finally:
+                with self._queue_cond:
+                    self._in_flight -= 1
+                    self._queue_cond.notify_all()
+
+    def _next_batch(self):
+        """
+        次に送信するメッセージを取り出す（_queue_cond保持中に呼ぶ、送信対象ができるまで待機）
+
+        Returns:
+            (メッセージ, パースモード, 優先度)、停止済みの場合はNone
+        """
+        while True:
+            if self._closed:
+                return None
+            if not self._queue:
+                self._queue_cond.wait()
+                continue
+
+            # 即時送信の通知はまとめ待ちを追い越して単独で送る
+            urgent = next((i for i, p in enumerate(self._queue) if p.flush_now), None)
+            if urgent is not None:
+                pending = self._queue[urgent]
+                del self._queue[urgent]
+                return pending.message, pending.parse_mode, pending.priority
+
+            # 優先度の高い通知から送る（同じ優先度なら古い順）
+            head = min(range(len(self._queue)), key=lambda i: self._queue[i].priority)
+            remaining = self._queue[head].enqueued_at + COALESCE_WINDOW - time.monotonic()
+            if remaining <= 0 and self._queue[head].priority >= PRIORITY_LOW:
+                # 低優先度はトークンが空くまでキューに残し、その間に届いた高優先度を先に送る
+                remaining = max(
+                    self._global_bucket.wait_time(HIGH_PRIORITY_RESERVED_TOKENS),
+                    self._chat_bucket.wait_time(HIGH_PRIORITY_RESERVED_TOKENS)
+                )
+            if remaining <= 0:
+                return self._pop_batch(head)
+            self._queue_cond.wait(remaining)
+
+    def _pop_batch(self, head: int = 0):
+        """
+        指定位置の通知と、それに続く同じ優先度の通知をまとめて取り出す（_queue_cond保持中に呼ぶ）
+
+        Args:
+            head: 先頭にする通知のキュー内位置
+
+        Returns:
+            (結合したメッセージ, パースモード, 優先度)
+        """
+        first = self._queue[head]
+        del self._queue[head]
+        parts = [first.message]
+        length = len(first.message)
+
+        i = head
+        while i < len(self._queue):
+            pending = self._queue[i]
+            if pending.priority != first.priority:
+                # 別の優先度の通知は結合せず残す
+                i += 1
+                continue
+            if pending.flush_now or pending.parse_mode != first.parse_mode:
+                break
+            length += len(COALESCE_SEPARATOR) + len(pending.message)
+            if length > COALESCE_MAX_CHARS:
+                break
+            parts.append(pending.message)
+            del self._queue[i]
+
+        return COALESCE_SEPARATOR.join(parts), first.parse_mode, first.priority
+
+    def _send_message_sync(self, message: str, parse_mode: str, priority: int = PRIORITY_HIGH) -> bool:
+        """
+        メッセージを送信（同期）
+
+        Args:
+            message: 送信メッセージ
+            parse_mode: パースモード（HTML or Markdown）
+            priority: 優先度（低優先度はトークンを高優先度用に残して送信する）
+
+        Returns:
+            成功したかどうか
+        """
+        from telegram.error import BadRequest, NetworkError, RetryAfter
+
+        reserve = HIGH_PRIORITY_RESERVED_TOKENS if priority >= PRIORITY_LOW else 0
+        try:
+            for attempt in range(SEND_RETRY_TOTAL + 1):
+                self._global_bucket.acquire(reserve)
+                self._chat_bucket.acquire(reserve)
+
+                future = self._loop_thread.submit(
+                    self._bot.send_message(chat_id=self.chat_id, text=message, parse_mode=parse_mode)
+                )
+                try:
+                    future.result(SEND_RESULT_TIMEOUT)
+                except TimeoutError:
+                    # 応答がないまま待ち続けてディスパッチャーを止めないよう打ち切って再送
+                    future.cancel()
+                    if attempt == SEND_RETRY_TOTAL:
+                        raise
+                    logger.warning(f"Telegram送信タイムアウト（{SEND_RESULT_TIMEOUT}秒）: 再送します")
+                    continue
+                except RetryAfter as e:
+                    if attempt == SEND_RETRY_TOTAL:
+                        raise
+                    # レート制限: 指定秒数待機し、後続の送信も抑えるためバケットを空にする
+                    logger.warning(f"Telegramレート制限: {e.retry_after}秒後に再送します")
+                    self._global_bucket.drain()
+                    self._chat_bucket.drain()
+                    time.sleep(e.retry_after)
+                    continue
+                except BadRequest:
+                    # 不正なメッセージは再送しても失敗する
+                    raise
+                except NetworkError as e:
+                    if attempt == SEND_RETRY_TOTAL:
+                        raise
+                    wait = SEND_RETRY_BACKOFF * (2 ** attempt)
+                    logger.warning(f"Telegram通信エラー: {e}（{wait:.1f}秒後に再送）")
+                    time.sleep(wait)
+                    continue
+
+                logger.info("Telegram通知送信成功")
+                return True
 
         except Exception as e:
             logger.error(f"Telegram通知送信失敗: {e}")
@@ -86,19 +590,15 @@ class TelegramNotifier:
             price: 価格
             quantity: 数量
         """
-        side_jp = "🟢 買い" if side == SIDE_LONG else "🔴 売り"
-
-        message = f"""
-📈 <b>取引実行</b>
-
-{side_jp} <b>{symbol}</b>
-価格: ¥{price:,.0f}
-数量: {quantity:.6f}
-合計: ¥{price * quantity:,.0f}
-
-⏰ {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-"""
-        self.send_message(message.strip())
+        message = _TRADE_OPEN_TEMPLATE.format_map({
+            'side_jp': "🟢 買い" if side == SIDE_LONG else "🔴 売り",
+            'symbol': symbol,
+            'price': price,
+            'quantity': quantity,
+            'total': price * quantity,
+            'timestamp': _timestamp(),
+        })
+        self.send_message(message)
         logger.info(f"取引開始通知送信: {symbol} {side}")
 
     def notify_trade_close(
@@ -130,22 +630,19 @@ class TelegramNotifier:
             emoji = "⚠️"
             result = "損切り"
 
-        side_jp = "買い" if side == SIDE_LONG else "売り"
-
-        message = f"""
-{emoji} <b>{result}</b>
-
-<b>{symbol}</b> {side_jp}ポジションクローズ
-
-エントリー: ¥{entry_price:,.0f}
-決済: ¥{exit_price:,.0f}
-数量: {quantity:.6f}
-
-💰 損益: <b>¥{pnl:,.0f}</b> ({pnl_pct:+.2f}%)
-
-⏰ {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-"""
-        self.send_message(message.strip())
+        message = _TRADE_CLOSE_TEMPLATE.format_map({
+            'emoji': emoji,
+            'result': result,
+            'symbol': symbol,
+            'side_jp': "買い" if side == SIDE_LONG else "売り",
+            'entry_price': entry_price,
+            'exit_price': exit_price,
+            'quantity': quantity,
+            'pnl': pnl,
+            'pnl_pct': pnl_pct,
+            'timestamp': _timestamp(),
+        })
+        self.send_message(message)
         logger.info(f"取引終了通知送信: {symbol} 損益=¥{pnl:,.0f}")
 
     def notify_stop_loss(
@@ -162,18 +659,13 @@ class TelegramNotifier:
             current_price: 現在価格
             pnl_pct: 損失率（%）
         """
-        message = f"""
-🛑 <b>ストップロス発動</b>
-
-<b>{symbol}</b>
-現在価格: ¥{current_price:,.0f}
-損失率: {pnl_pct:.2f}%
-
-ポジションを自動クローズします。
-
-⏰ {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-"""
-        self.send_message(message.strip())
+        message = _STOP_LOSS_TEMPLATE.format_map({
+            'symbol': symbol,
+            'current_price': current_price,
+            'pnl_pct': pnl_pct,
+            'timestamp': _timestamp(),
+        })
+        self.send_message(message, flush_now=True)
         logger.warning(f"ストップロス通知送信: {symbol}")
 
     def notify_take_profit(
@@ -192,18 +684,14 @@ class TelegramNotifier:
             close_ratio: 決済比率（0-1）
             pnl_pct: 利益率（%）
         """
-        level_jp = "第1段階" if level == 1 else "第2段階"
-
-        message = f"""
-✅ <b>{level_jp}利益確定</b>
-
-<b>{symbol}</b>
-利益率: +{pnl_pct:.2f}%
-決済比率: {close_ratio:.0%}
-
-⏰ {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-"""
-        self.send_message(message.strip())
+        message = _TAKE_PROFIT_TEMPLATE.format_map({
+            'level_jp': "第1段階" if level == 1 else "第2段階",
+            'symbol': symbol,
+            'pnl_pct': pnl_pct,
+            'close_ratio': close_ratio,
+            'timestamp': _timestamp(),
+        })
+        self.send_message(message)
         logger.info(f"利益確定通知送信: {symbol} レベル{level}")
 
     def notify_daily_summary(
@@ -226,7 +714,6 @@ class TelegramNotifier:
             win_rate: 勝率
             open_positions: 保有ポジション一覧
         """
-        emoji = "📊"
         if daily_pnl > 0:
             pnl_emoji = "📈"
         elif daily_pnl < 0:
@@ -234,29 +721,28 @@ class TelegramNotifier:
         else:
             pnl_emoji = "➖"
 
-        message = f"""
-{emoji} <b>日次レポート</b>
-━━━━━━━━━━━━━━━━
-
-💰 総資産: <b>¥{total_equity:,.0f}</b>
-{pnl_emoji} 本日損益: <b>¥{daily_pnl:,.0f}</b> ({daily_pnl_pct:+.2f}%)
-
-📊 取引回数: {trades_count}回
-📈 勝率: {win_rate:.1%}
-
-【保有ポジション】
-"""
+        message = _DAILY_SUMMARY_HEADER_TEMPLATE.format_map({
+            'total_equity': total_equity,
+            'pnl_emoji': pnl_emoji,
+            'daily_pnl': daily_pnl,
+            'daily_pnl_pct': daily_pnl_pct,
+            'trades_count': trades_count,
+            'win_rate': win_rate,
+        })
 
+        parts = [message]
         if open_positions:
             for pos in open_positions:
-                message += f"\n• {pos['symbol']} {pos['side'].upper()}"
-                message += f"\n  損益: ¥{pos['unrealized_pnl']:,.0f} ({pos['unrealized_pnl_pct']:+.2f}%)"
+                parts.append(f"\n• {pos['symbol']} {pos['side'].upper()}")
+                parts.append(
+                    f"\n  損益: {_fmt_yen(pos['unrealized_pnl'])} ({pos['unrealized_pnl_pct']:+.2f}%)"
+                )
         else:
-            message += "\nなし"
+            parts.append("\nなし")
 
-        message += f"\n\n⏰ {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+        parts.append(f"\n\n⏰ {_timestamp()}")
 
-        self.send_message(message.strip())
+        self.send_message("".join(parts).strip(), priority=PRIORITY_LOW)
         logger.info("日次サマリー送信")
 
     def notify_alert(self, title: str, message: str):
@@ -267,14 +753,13 @@ class TelegramNotifier:
             title: タイトル
             message: メッセージ
         """
-        full_message = f"""
-⚠️ <b>{title}</b>
-
-{message}
-
-⏰ {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-"""
-        self.send_message(full_message.strip())
+        full_message = _TITLED_TEMPLATE.format_map({
+            'icon': "⚠️",
+            'title': title,
+            'body': message,
+            'timestamp': _timestamp(),
+        })
+        self.send_message(full_message)
         logger.warning(f"アラート送信: {title}")
 
     def notify_error(self, error_type: str, error_message: str):
@@ -285,15 +770,12 @@ class TelegramNotifier:
             error_type: エラータイプ
             error_message: エラーメッセージ
         """
-        message = f"""
-🚨 <b>エラー発生</b>
-
-種類: {error_type}
-詳細: {error_message}
-
-⏰ {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-"""
-        self.send_message(message.strip())
+        message = _ERROR_TEMPLATE.format_map({
+            'error_type': error_type,
+            'error_message': error_message,
+            'timestamp': _timestamp(),
+        })
+        self.send_message(message, flush_now=True)
         logger.error(f"エラー通知送信: {error_type}")
 
     def notify_info(self, title: str, message: str):
@@ -304,14 +786,13 @@ class TelegramNotifier:
             title: タイトル
             message: メッセージ
         """
-        full_message = f"""
-ℹ️ <b>{title}</b>
-
-{message}
-
-⏰ {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-"""
-        self.send_message(full_message.strip())
+        full_message = _TITLED_TEMPLATE.format_map({
+            'icon': "ℹ️",
+            'title': title,
+            'body': message,
+            'timestamp': _timestamp(),
+        })
+        self.send_message(full_message, priority=PRIORITY_LOW)
         logger.info(f"情報通知送信: {title}")
 
     def notify_pair_trade_open(
@@ -349,29 +830,22 @@ class TelegramNotifier:
             dir_jp = "ショートスプレッド"
             emoji = "🔴"
 
-        total_value = size1 * price1 + size2 * price2
-
-        message = f"""
-{emoji} <b>ペアトレード開始</b>
-
-📊 {pair_id}
-方向: {dir_jp}
-
-<b>{symbol1}</b>
-├ 数量: {size1:.6f}
-└ 価格: ¥{price1:,.0f}
-
-<b>{symbol2}</b>
-├ 数量: {size2:.6f}
-└ 価格: ¥{price2:,.0f}
-
-Zスコア: {z_score:.2f}
-ヘッジ比率: {hedge_ratio:.4f}
-投入資金: ¥{total_value:,.0f}
-
-⏰ {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-"""
-        self.send_message(message.strip())
+        message = _PAIR_TRADE_OPEN_TEMPLATE.format_map({
+            'emoji': emoji,
+            'pair_id': pair_id,
+            'dir_jp': dir_jp,
+            'symbol1': symbol1,
+            'size1': size1,
+            'price1': price1,
+            'symbol2': symbol2,
+            'size2': size2,
+            'price2': price2,
+            'z_score': z_score,
+            'hedge_ratio': hedge_ratio,
+            'total_value': size1 * price1 + size2 * price2,
+            'timestamp': _timestamp(),
+        })
+        self.send_message(message)
         logger.info(f"ペアトレード開始通知: {pair_id}")
 
     def notify_pair_trade_close(
@@ -401,28 +875,19 @@ Zスコア: {z_score:.2f}
             emoji = "⚠️"
             result = "損切り"
 
-        reason_jp = {
-            'take_profit': '利益目標達成',
-            'trailing_stop': 'トレーリングストップ',
-            'mean_reversion': '平均回帰',
-            'mean_reversion_profit': '平均回帰（利益）',
-            'stop_loss': 'ストップロス',
-            'direction_change': '方向転換'
-        }.get(reason, reason)
-
-        message = f"""
-{emoji} <b>ペアトレード{result}</b>
-
-📊 {pair_id}
-{symbol1} / {symbol2}
-
-💰 損益: <b>¥{pnl:,.0f}</b>
-📝 理由: {reason_jp}
-"""
+        message = _PAIR_TRADE_CLOSE_TEMPLATE.format_map({
+            'emoji': emoji,
+            'result': result,
+            'pair_id': pair_id,
+            'symbol1': symbol1,
+            'symbol2': symbol2,
+            'pnl': pnl,
+            'reason_jp': _PAIR_CLOSE_REASONS.get(reason, reason),
+        })
         if hold_duration:
             message += f"⏱️ 保有期間: {hold_duration}\n"
 
-        message += f"\n⏰ {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+        message += f"\n⏰ {_timestamp()}"
 
         self.send_message(message.strip())
         logger.info(f"ペアトレード終了通知: {pair_id} 損益=¥{pnl:,.0f}")
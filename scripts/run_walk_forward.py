@@ -106,8 +106,8 @@ def model_trainer(train_df: pd.DataFrame) -> EnsembleModel:
     df['target_direction'] = pd.cut(
         df['future_return'],
         bins=[-np.inf, -0.005, 0.005, np.inf],
-        labels=[0, 1, 2]  # -1,0,1ではなく0,1,2を使用（整数変換の問題回避）
-    ).astype(int)
+        labels=[-1, 0, 1]  # prepare_dataで0,1,2に変換される
+    ).astype(np.int8)
 
     # 残りのNaNを除去
     df = df.dropna()
@@ -123,33 +123,20 @@ def model_trainer(train_df: pd.DataFrame) -> EnsembleModel:
 
 def signal_generator(model: EnsembleModel, test_df: pd.DataFrame) -> np.ndarray:
     """シグナル生成関数"""
-    signals = []
-
-    for i in range(len(test_df)):
-        # 直近データで予測
-        df_slice = test_df.iloc[:i+1].copy()
-
-        if len(df_slice) < 50:
-            signals.append(0)  # HOLD
-            continue
-
-        try:
-            result = model.generate_trading_signal(
-                df_slice,
-                confidence_threshold=0.6,
-                symbol='BTC/JPY'
-            )
-
-            if result['signal'] == 'BUY':
-                signals.append(1)
-            elif result['signal'] == 'SELL':
-                signals.append(-1)
-            else:
-                signals.append(0)
-        except Exception:
-            signals.append(0)
-
-    return np.array(signals)
+    signals = np.zeros(len(test_df), dtype=np.int8)  # HOLD
+
+    try:
+        # 全期間を一括予測（各時点はその時点までのデータのみを使用）
+        # generate_trading_signal()の逐次実行とは、HMMの参照範囲と待機シグナルの扱いが異なる
+        batch = model.generate_trading_signals_batch(test_df, confidence_threshold=0.6)
+        signals[:len(batch)] = batch
+    except Exception as e:
+        logger.warning(f"シグナル一括生成エラー: {e}")
+
+    # 直近データが50件未満の時点はHOLD
+    signals[:49] = 0
+
+    return signals
 
 
 def main():
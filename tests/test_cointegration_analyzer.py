@@ -0,0 +1,140 @@
+"""共和分分析テスト"""
+
+import sys
+from pathlib import Path
+import pandas as pd
+import numpy as np
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from ml.models.cointegration_analyzer import CointegrationAnalyzer, SIGNAL_LABELS
+from trading.strategy.pair_trading_strategy import PairTradingStrategy, PairTradingConfig
+from utils.logger import setup_logger
+
+# ロガー設定
+logger = setup_logger('test_cointegration', 'test_cointegration.log', console=True)
+
+
+def create_pair_prices(n_rows: int = 500, seed: int = 42) -> pd.DataFrame:
+    """共和分関係にある2資産と、無関係な1資産の価格を生成"""
+    rng = np.random.default_rng(seed)
+
+    base = 100 + np.cumsum(rng.normal(0, 1, n_rows))
+    # 平均回帰するスプレッド（AR(1)）
+    spread = np.zeros(n_rows)
+    for i in range(1, n_rows):
+        spread[i] = 0.8 * spread[i - 1] + rng.normal(0, 1)
+
+    return pd.DataFrame({
+        'AAA': base * 2.0 + spread + 50,
+        'BBB': base,
+        'CCC': 100 + np.cumsum(rng.normal(0, 1, n_rows)),
+    })
+
+
+def test_cointegration_analyzer():
+    """共和分分析テスト"""
+    print("=" * 60)
+    print("共和分分析テスト")
+    print("=" * 60)
+
+    prices = create_pair_prices()
+    analyzer = CointegrationAnalyzer(lookback_period=20, z_score_entry=2.0, z_score_exit=0.5)
+
+    # 1. 共和分検定
+    print("\n[1] 共和分検定:")
+    result = analyzer.test_cointegration(prices['AAA'], prices['BBB'], 'AAA', 'BBB')
+    assert result.is_cointegrated
+    print(f"  ✓ AAA/BBB: p={result.p_value:.4f}, ヘッジ比率={result.hedge_ratio:.3f}")
+
+    # 2. 全期間のシグナル一括生成
+    print("\n[2] シグナル一括生成:")
+    signals = analyzer.generate_signals(prices['AAA'], prices['BBB'], result.hedge_ratio)
+    spread = analyzer.calculate_spread(prices['AAA'], prices['BBB'], result.hedge_ratio)
+    z_score = analyzer.calculate_z_score(spread)
+    expected = np.array([analyzer._classify_z_score(z) for z in z_score.to_numpy()])
+    assert signals.dtype == np.int8 and len(signals) == len(prices)
+    assert (signals == expected).all()
+
+    # 最新時点は単一時点のシグナルと一致
+    latest = analyzer.generate_signal(prices['AAA'], prices['BBB'], result.hedge_ratio)
+    assert SIGNAL_LABELS[signals[-1]] == latest.signal
+    counts = {label: int((signals == code).sum()) for code, label in enumerate(SIGNAL_LABELS)}
+    print(f"  ✓ 行ごとの分類と一致: {counts}")
+
+    # 3. 相関フィルタ付きペア探索（通常版と同じペアを検出）
+    print("\n[3] 高速ペア探索:")
+    price_data = {symbol: prices[symbol] for symbol in prices.columns}
+    slow = analyzer.find_cointegrated_pairs(price_data, force_refresh=True)
+    fast = analyzer.find_cointegrated_pairs_fast(
+        prices.to_numpy(), list(prices.columns), min_correlation=0.5, force_refresh=True
+    )
+    slow_pairs = {(p.symbol1, p.symbol2) for p in slow}
+    fast_pairs = {(p.symbol1, p.symbol2) for p in fast}
+    assert ('AAA', 'BBB') in fast_pairs
+    assert fast_pairs <= slow_pairs
+    print(f"  ✓ 通常版: {sorted(slow_pairs)}, 高速版: {sorted(fast_pairs)}")
+
+    # ペアトレーディング戦略から高速版が使われる
+    strategy = PairTradingStrategy(PairTradingConfig(
+        lookback_period=20, min_half_life=0.0, max_half_life=100.0, min_correlation=0.5
+    ))
+    pairs = strategy.update_cointegration(price_data)
+    assert [(p.symbol1, p.symbol2) for p in pairs][:1] == [('AAA', 'BBB')]
+    print(f"  ✓ update_cointegration: {len(pairs)}ペア")
+
+    # 4. 検定メモ: 長さ・インデックスが同じでも値が違えば別キー
+    print("\n[4] 検定メモのキー:")
+    analyzer.clear_cache()
+    window_a = prices.iloc[:200].reset_index(drop=True)
+    window_b = prices.iloc[100:300].reset_index(drop=True)
+    window_b.loc[len(window_b) - 1] = window_a.iloc[-1]  # 最終値も揃える
+    result_a = analyzer._test_cointegration_memoized(window_a['AAA'], window_a['BBB'], 'AAA', 'BBB')
+    result_b = analyzer._test_cointegration_memoized(window_b['AAA'], window_b['BBB'], 'AAA', 'BBB')
+    assert len(analyzer._memo) == 2
+    assert result_a.hedge_ratio != result_b.hedge_ratio
+    again = analyzer._test_cointegration_memoized(window_a['AAA'], window_a['BBB'], 'AAA', 'BBB')
+    assert again is result_a and len(analyzer._memo) == 2
+    print(f"  ✓ 別ウィンドウは別キー、同一ウィンドウはメモヒット")
+
+    # 5. 価格系列の末尾揃え
+    print("\n[5] 価格系列の末尾揃え:")
+    a, b = analyzer._align(prices['AAA'], prices['BBB'].iloc[50:])
+    assert len(a) == len(b) == len(prices) - 50
+    assert a[0] == prices['AAA'].iloc[50] and a[-1] == prices['AAA'].iloc[-1]
+    assert np.shares_memory(a, prices['AAA'].to_numpy())  # コピーしない
+    print(f"  ✓ 短い方の長さ{len(a)}に末尾で揃える（コピーなし）")
+
+    # 6. スプレッドとZスコアの一括計算
+    print("\n[6] スプレッド・Zスコアの一括計算:")
+    p1, p2 = analyzer._align(prices['AAA'], prices['BBB'])
+    spread_arr, z_arr = analyzer._spread_z_score(p1, p2, result.hedge_ratio)
+    assert np.allclose(spread_arr, spread.to_numpy())
+    assert np.allclose(z_arr, z_score.to_numpy())
+    _, z_last = analyzer._spread_z_score(p1, p2, result.hedge_ratio, last_only=True)
+    assert np.isclose(z_last[-1], z_arr[-1])
+    # 定数スプレッドのZスコアは0
+    _, z_flat = analyzer._spread_z_score(np.full(50, 3.0), np.ones(50), 1.0)
+    assert (z_flat == 0).all()
+    print(f"  ✓ calculate_spread/calculate_z_scoreと一致（最新Z={z_arr[-1]:.3f}）")
+
+    # 7. 閉形式OLSの傾き
+    print("\n[7] OLSの傾き:")
+    x = prices['BBB'].to_numpy()
+    y = prices['AAA'].to_numpy()
+    slope = analyzer._ols_slope(x, y)
+    assert np.isclose(slope, np.polyfit(x, y, 1)[0])
+    assert np.isclose(result.hedge_ratio, slope)
+    assert analyzer._ols_slope(np.ones(10), y[:10]) == 0.0
+    print(f"  ✓ np.polyfitと一致: β={slope:.4f}")
+
+    print("\n" + "=" * 60)
+    print("テスト完了！")
+    print("=" * 60)
+
+    return analyzer, prices
+
+
+if __name__ == "__main__":
+    analyzer, prices = test_cointegration_analyzer()
@@ -1,6 +1,7 @@
 """アンサンブルモデルテスト"""
 
 import sys
+import time
 from pathlib import Path
 import pandas as pd
 import numpy as np
@@ -8,7 +9,7 @@ import numpy as np
 # プロジェクトルートをパスに追加
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from ml.models.ensemble_model import EnsembleModel, create_ensemble_model
+from ml.models.ensemble_model import EnsembleModel, create_ensemble_model, _PendingSignalStore
 from ml.training.feature_engineering import FeatureEngineer
 from data.processor.indicators import TechnicalIndicators
 from utils.logger import setup_logger
@@ -152,6 +153,69 @@ def test_ensemble_model():
         sig = ensemble.generate_trading_signal(df_slice, confidence_threshold=0.55)
         print(f"  時点{i:2d}: {sig['signal']:4s} (確信度: {sig['confidence']:.1%}) - {sig['state']}")
 
+    # 10. 複数銘柄まとめてシグナル生成（銘柄ごとの生成と一致）
+    print("\n[10] 複数銘柄のシグナル生成:")
+    dfs = {'BTC/JPY': df_test, 'ETH/JPY': df_test.iloc[:-3]}
+    ensemble.pending_signals.clear()
+    singles = {
+        sym: ensemble.generate_trading_signal(df_sym, confidence_threshold=0.55, symbol=sym)
+        for sym, df_sym in dfs.items()
+    }
+    ensemble.pending_signals.clear()
+    multi = ensemble.generate_trading_signals_multi(dfs, confidence_threshold=0.55)
+    for sym in dfs:
+        for key in ('signal', 'state', 'direction', 'entry_type'):
+            assert multi[sym][key] == singles[sym][key]
+        for key in ('confidence', 'state_prob', 'direction_prob'):
+            assert abs(multi[sym][key] - singles[sym][key]) < 1e-4
+        print(f"  ✓ {sym}: {multi[sym]['signal']} - {multi[sym]['state']}/{multi[sym]['direction']} "
+              f"(方向確率: {multi[sym]['direction_prob']:.1%})")
+
+    # 11. 一括シグナル生成（バックテスト用）
+    print("\n[11] 一括シグナル生成（バックテスト用）:")
+    batch = ensemble.generate_trading_signals_batch(df_test, confidence_threshold=0.6)
+    assert batch.dtype == np.int8 and len(batch) == len(df_test)
+    assert set(np.unique(batch)) <= {-1, 0, 1}
+    print(f"  ✓ BUY={int((batch == 1).sum())}, SELL={int((batch == -1).sum())}, HOLD={int((batch == 0).sum())}")
+
+    # 先読みなし: 途中までのデータで生成した結果は全期間の先頭部分と一致
+    half = len(df_test) // 2
+    batch_half = ensemble.generate_trading_signals_batch(df_test[:half], confidence_threshold=0.6)
+    assert (batch_half == batch[:half]).all()
+    print(f"  ✓ 先頭{half}行の結果が全期間の結果と一致（先読みなし）")
+
+    # 12. 押し目待ちシグナルの管理
+    print("\n[12] 押し目待ちシグナルの管理:")
+    store = _PendingSignalStore()
+    for i in range(40):  # 初期容量を超えて追加
+        store[f'SYM{i}'] = {'timestamp': float(i), 'probability': 0.7, 'state': 1, 'price_level': 100.0 + i}
+    store['SYM3'] = {'timestamp': 35.0, 'probability': 0.9, 'state': 2, 'price_level': 1.0}  # 上書き
+    del store['SYM0']
+    assert len(store) == 39 and 'SYM0' not in store
+    assert store['SYM39']['price_level'] == 139.0 and store['SYM3']['state'] == 2
+
+    expired = store.expire(now=40.0, max_age_seconds=10.0)
+    assert sorted(expired) == sorted(f'SYM{i}' for i in range(1, 30) if i != 3)
+    assert len(store) == 11 and 'SYM3' in store and 'SYM29' not in store
+    print(f"  ✓ 期限切れ{len(expired)}件を削除、残り{len(store)}件")
+
+    store.clear()
+    assert len(store) == 0 and 'SYM3' not in store
+    print(f"  ✓ クリア後: {len(store)}件")
+
+    # 13. 有効期限の変更は既存の待機シグナルにも反映
+    print("\n[13] 待機シグナルの有効期限:")
+    ensemble.pending_signals.clear()
+    ensemble.pending_signals['BTC/JPY'] = {
+        'timestamp': time.monotonic() - 2 * 3600, 'probability': 0.7, 'state': 1, 'price_level': 100.0
+    }
+    ensemble._cleanup_expired_signals()
+    assert 'BTC/JPY' in ensemble.pending_signals  # 既定の48時間以内
+    ensemble.dip_config['signal_expiry_hours'] = 1
+    ensemble._cleanup_expired_signals()
+    assert 'BTC/JPY' not in ensemble.pending_signals
+    print(f"  ✓ 期限を1時間に変更後、2時間前のシグナルを削除")
+
     print("\n" + "=" * 60)
     print("テスト完了！")
     print("=" * 60)
@@ -127,6 +127,16 @@ def test_feature_engineering():
     print(f"  ✓ DataFrame: {memory_mb:.2f} MB")
     print(f"  ✓ 行あたり: {memory_mb / len(df_with_target) * 1000:.2f} KB")
 
+    # 10. 途中に欠損がある場合（出来高0の区間）
+    print("\n[10] 出来高0の区間を含むデータ:")
+    df_gap = create_sample_data(n_rows=1000)
+    df_gap.loc[700:702, 'volume'] = 0.0  # pct_changeが0/0でNaNになる
+    df_gap_features = fe.create_all_features(ti.calculate_all(df_gap))
+    n_nan_rows = int(df_gap_features.isna().any(axis=1).sum())
+    assert n_nan_rows == 0
+    assert len(df_gap_features) < len(df_features)
+    print(f"  ✓ 欠損行を除去: {len(df_features)} → {len(df_gap_features)}行（欠損行{n_nan_rows}件）")
+
     print("\n" + "=" * 60)
     print("テスト完了！")
     print("=" * 60)
@@ -215,6 +215,46 @@ def test_hmm_model():
     else:
         print(f"  ⚠ matplotlibなし - スキップ")
 
+    # 11. 予測キャッシュ
+    print("\n[11] 予測キャッシュ:")
+    states = hmm_model.predict_states(test_data)
+    states_first = hmm_model.predict_states(test_data)
+    states_first[:] = -1  # 返り値を書き換えてもキャッシュに影響しない
+    states_again = hmm_model.predict_states(test_data)
+    assert (states_again == states).all()
+    print(f"  ✓ 返り値はコピー（書き換え後も再予測結果が一致）")
+
+    # 同じ内容の別オブジェクトは再計算される（結果は一致）
+    states_copy = hmm_model.predict_states(test_data.copy())
+    assert (states_copy == states).all()
+    print(f"  ✓ 別オブジェクトでも予測一致")
+
+    # 最終行をin-placeで書き換えるとキャッシュは使われない
+    modified = test_data.copy()
+    proba_before = hmm_model.predict_proba(modified)
+    assert 'rsi' in modified.columns
+    modified.loc[modified.index[-1], 'rsi'] = 99.0
+    proba_after = hmm_model.predict_proba(modified)
+    assert np.allclose(proba_after, hmm_model.predict_proba(modified.copy()))
+    assert not np.allclose(proba_before[-1], proba_after[-1])
+    print(f"  ✓ 最終行の書き換え後は再計算: {np.round(proba_after[-1], 3)}")
+
+    # 12. 最新時点のみの予測
+    print("\n[12] 最新時点の状態確率:")
+    n_entries = len(hmm_model._encode_cache)
+    for end in range(len(test_data) - 5, len(test_data)):
+        hmm_model.predict_proba_last(test_data.iloc[:end])
+    assert len(hmm_model._encode_cache) == n_entries
+    print(f"  ✓ predict_proba_lastはキャッシュを追い出さない（{n_entries}件）")
+
+    # 13. フィルタリング確率（先読みなし）
+    print("\n[13] フィルタリング確率:")
+    filtered = hmm_model.predict_filtered_proba(test_data)
+    last = hmm_model.predict_proba_last(test_data, lookback=len(test_data))
+    assert filtered.shape == proba.shape
+    assert np.allclose(filtered[-1], last)
+    print(f"  ✓ フィルタ確率の最終行: {np.round(last, 3)}")
+
     print("\n" + "=" * 60)
     print("テスト完了！")
     print("=" * 60)
@@ -1,6 +1,7 @@
 """LightGBMモデルテスト"""
 
 import sys
+import tempfile
 from pathlib import Path
 import pandas as pd
 import numpy as np
@@ -168,6 +169,10 @@ def test_lightgbm_model():
     # 読み込んだモデルで予測
     y_pred_loaded = lgbm_model_loaded.predict(X_test)
     match_rate = (y_pred == y_pred_loaded).mean()
+    assert Path(model_path).with_suffix('.txt').exists()
+    assert lgbm_model_loaded.is_fitted
+    assert lgbm_model_loaded.model.best_iteration == lgbm_model.model.best_iteration
+    assert np.allclose(lgbm_model_loaded.predict_proba(X_test), lgbm_model.predict_proba(X_test))
     print(f"  ✓ 予測一致率: {match_rate:.2%}")
 
     # 12. モデルサマリー
@@ -196,6 +201,22 @@ def test_lightgbm_model():
     print(f"  ✓ 下降F1スコア: {eval_binary['classification_report']['Down']['f1-score']:.4f}")
     print(f"  ✓ 上昇F1スコア: {eval_binary['classification_report']['Up']['f1-score']:.4f}")
 
+    # 14. Boosterファイル欠損時の読み込み
+    print("\n[14] Boosterファイル欠損時の読み込み:")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        missing_path = Path(tmp_dir) / "lgbm.pkl"
+        lgbm_binary.save(str(missing_path))
+        missing_path.with_suffix('.txt').unlink()
+
+        try:
+            PriceDirectionLGBM().load(str(missing_path))
+            raise AssertionError("FileNotFoundErrorが発生しませんでした")
+        except FileNotFoundError as e:
+            print(f"  ✓ load(): {e}")
+
+        assert PriceDirectionLGBM().load_model(str(missing_path)) is False
+        print(f"  ✓ load_model(): False")
+
     print("\n" + "=" * 60)
     print("テスト完了！")
     print("=" * 60)
@@ -0,0 +1,113 @@
+"""Telegram Botハンドラーのヘルパーテスト（メッセージ分割・レート制限・設定キャッシュ・バックアップ・Webhook）"""
+
+import sys
+import os
+import asyncio
+import socket
+import tempfile
+from types import SimpleNamespace
+from pathlib import Path
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from notification.telegram_bot_handler import (
+    _split_message, _RateLimiter, _load_config, _save_config, CONFIG_BACKUP_COUNT,
+    TelegramBotHandler
+)
+
+
+def test_telegram_bot_handler():
+    """Telegram Botハンドラーのヘルパーテスト"""
+    print("=" * 60)
+    print("Telegram Botハンドラー ヘルパーテスト")
+    print("=" * 60)
+
+    # 1. メッセージ分割
+    print("\n[1] メッセージ分割:")
+    parts = [f"line{i:03d}\n" for i in range(100)]  # 各8文字
+    chunks = _split_message(parts, limit=100)
+    assert "".join(chunks) == "".join(parts)
+    assert all(len(chunk) < 100 for chunk in chunks)
+    assert all(chunk.endswith("\n") for chunk in chunks)  # 断片の途中で分割しない
+    assert _split_message([]) == []
+    assert _split_message(["x" * 150], limit=100) == ["x" * 150]  # 長い断片はそのまま1通
+    print(f"  ✓ {len(parts)}断片 → {len(chunks)}通")
+
+    # 2. レート制限
+    print("\n[2] レート制限:")
+    limiter = _RateLimiter(rate=1.0, burst=3)
+    results = [limiter.acquire(100) for _ in range(4)]
+    assert results[:3] == [0.0, 0.0, 0.0]
+    assert 0.0 < results[3] <= 1.0
+    assert limiter.acquire(200) == 0.0  # チャットごとに独立
+    print(f"  ✓ バースト3回まで許可、4回目は{results[3]:.2f}秒待ち")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        config_path = Path(tmp_dir) / "config.yaml"
+        config_path.write_text("trading:\n  stop_loss_pct: 5.0\n", encoding="utf-8")
+
+        # 3. 設定キャッシュ
+        print("\n[3] 設定キャッシュ:")
+        config = _load_config(config_path)
+        assert config['trading']['stop_loss_pct'] == 5.0
+        assert _load_config(config_path) is config  # 更新がなければ同じdict
+        config_path.write_text("trading:\n  stop_loss_pct: 7.5\n", encoding="utf-8")
+        os.utime(config_path, ns=(0, 1))  # mtimeの分解能に依存しないよう明示的に変更
+        reloaded = _load_config(config_path)
+        assert reloaded is not config and reloaded['trading']['stop_loss_pct'] == 7.5
+        print(f"  ✓ 未更新時はキャッシュ、更新後は再読み込み")
+
+        # 4. 保存とバックアップのローテーション
+        print("\n[4] バックアップのローテーション:")
+        assert _save_config(config_path, {'trading': {'stop_loss_pct': 7.5}}) is None  # 変更なし
+        assert not list(Path(tmp_dir).glob("config.yaml.bak.*"))
+
+        for i in range(CONFIG_BACKUP_COUNT + 2):
+            backup = _save_config(config_path, {'trading': {'stop_loss_pct': float(i)}})
+            assert backup.name == "config.yaml.bak.0"
+        backups = sorted(p.name for p in Path(tmp_dir).glob("config.yaml.bak.*"))
+        assert backups == [f"config.yaml.bak.{i}" for i in range(CONFIG_BACKUP_COUNT)]
+
+        # bak.0 が直前の内容、番号が大きいほど古い
+        newest = (Path(tmp_dir) / "config.yaml.bak.0").read_text(encoding="utf-8")
+        assert f"stop_loss_pct: {float(CONFIG_BACKUP_COUNT)}" in newest
+        oldest = (Path(tmp_dir) / f"config.yaml.bak.{CONFIG_BACKUP_COUNT - 1}").read_text(encoding="utf-8")
+        assert "stop_loss_pct: 1.0" in oldest
+        assert _load_config(config_path)['trading']['stop_loss_pct'] == float(CONFIG_BACKUP_COUNT + 1)
+        assert not (Path(tmp_dir) / "config.yaml.tmp").exists()
+        print(f"  ✓ バックアップ{len(backups)}世代を保持: {backups}")
+
+    # 5. Webhook登録失敗時のサーバー停止
+    print("\n[5] Webhook登録失敗:")
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    handler = TelegramBotHandler(
+        bot_token="dummy", allowed_chat_ids=[1],
+        webhook_url="https://example.invalid/telegram", webhook_port=port, webhook_listen="127.0.0.1"
+    )
+
+    async def fail_set_webhook(**kwargs):
+        raise ConnectionError("set_webhook失敗")
+
+    application = SimpleNamespace(bot=SimpleNamespace(set_webhook=fail_set_webhook))
+    try:
+        asyncio.run(handler._start_webhook(application))
+        raise AssertionError("例外が再送出されませんでした")
+    except ConnectionError:
+        pass
+
+    # 待ち受けポートが解放されている
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", port))
+    print(f"  ✓ 例外を再送出し、ポート{port}を解放")
+
+    print("\n" + "=" * 60)
+    print("テスト完了！")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    test_telegram_bot_handler()
@@ -0,0 +1,129 @@
+"""Telegram通知キューテスト（送信順・優先度・停止・まとめ送信・送信ペース）
+
+実際のTelegram APIには接続せず、Bot.send_messageを差し替えて送信内容を記録する
+"""
+
+import sys
+import time
+import threading
+from pathlib import Path
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from telegram import Bot
+
+from notification.telegram_notifier import (
+    TelegramNotifier, _TokenBucket, PRIORITY_HIGH, PRIORITY_LOW, COALESCE_SEPARATOR
+)
+
+
+def create_recording_notifier(sent: list, fast: bool = True) -> TelegramNotifier:
+    """送信内容をsentに記録する通知クラスを作成"""
+
+    async def fake_send_message(self, chat_id, text, parse_mode=None, **kwargs):
+        sent.append(text)
+
+    Bot.send_message = fake_send_message
+    notifier = TelegramNotifier('1:test-token', '1')
+    if fast:
+        # 送信ペースの制限でテストが遅くならないよう十分大きいバケットにする
+        notifier._global_bucket = _TokenBucket(1000, 1000)
+        notifier._chat_bucket = _TokenBucket(1000, 1000)
+    return notifier
+
+
+def test_telegram_notifier():
+    """Telegram通知キューテスト"""
+    print("=" * 60)
+    print("Telegram通知キューテスト")
+    print("=" * 60)
+
+    original_send_message = Bot.send_message
+    try:
+        # 1. 即時送信は追加順に届く
+        print("\n[1] 即時送信の順序:")
+        sent = []
+        notifier = create_recording_notifier(sent)
+        for i in range(5):
+            notifier.send_message(f"msg{i}", flush_now=True)
+        assert notifier.flush(5.0)
+        assert sent == [f"msg{i}" for i in range(5)]
+        print(f"  ✓ 送信順: {sent}")
+        notifier.close()
+
+        # 2. 高優先度は先に追加された低優先度より先に送る
+        print("\n[2] 優先度:")
+        sent = []
+        notifier = create_recording_notifier(sent)
+        notifier.send_message("summary", priority=PRIORITY_LOW)
+        notifier.send_message("stop loss", priority=PRIORITY_HIGH)
+        assert notifier.flush(5.0)
+        assert sent == ["stop loss", "summary"]
+        print(f"  ✓ 送信順: {sent}")
+        notifier.close()
+
+        # 3. 停止時は送信待ちを送ってからスレッドを止める
+        print("\n[3] 停止:")
+        sent = []
+        notifier = create_recording_notifier(sent)
+        notifier.send_message("last trade", priority=PRIORITY_LOW)
+        notifier.close()
+        assert sent == ["last trade"]
+        assert not notifier.send_message("after close")
+        assert not notifier._dispatcher.is_alive()
+        assert not any(t.name == "tg-notify" for t in threading.enumerate())
+        print(f"  ✓ 送信待ちを送信して停止、停止後の送信は拒否")
+
+        # 4. 短時間に続いた通知は1通にまとめる
+        print("\n[4] まとめ送信:")
+        sent = []
+        notifier = create_recording_notifier(sent)
+        for i in range(3):
+            notifier.send_message(f"info{i}", priority=PRIORITY_LOW)
+        assert notifier.flush(5.0)
+        assert sent == [COALESCE_SEPARATOR.join(f"info{i}" for i in range(3))]
+        print(f"  ✓ 3件 → {len(sent)}通")
+        notifier.close()
+
+        # 5. 低優先度は高優先度用のトークンを残して待つ
+        print("\n[5] 高優先度用トークンの確保:")
+        sent = []
+        notifier = create_recording_notifier(sent, fast=False)
+        notifier._chat_bucket.acquire()
+        notifier._chat_bucket.acquire()  # 直前の送信で残り1個の状態
+        notifier.send_message("summary", priority=PRIORITY_LOW)
+        time.sleep(0.7)  # まとめ待ちの時間を過ぎても予約分のトークンは使わない
+        assert sent == []
+        start = time.monotonic()
+        notifier.send_message("stop loss", flush_now=True)
+        while not sent and time.monotonic() - start < 5.0:
+            time.sleep(0.01)
+        elapsed = time.monotonic() - start
+        assert sent == ["stop loss"] and elapsed < 0.5
+        print(f"  ✓ 低優先度の待機中に高優先度を{elapsed:.2f}秒で送信")
+        notifier.close()
+        assert sent == ["stop loss", "summary"]
+        print(f"  ✓ 停止時に低優先度も送信: {sent}")
+
+        # 6. トークンバケット
+        print("\n[6] トークンバケット:")
+        bucket = _TokenBucket(rate=1, capacity=2)
+        assert bucket.wait_time() == 0.0
+        bucket.acquire()
+        assert bucket.wait_time(reserve=1) > 0.0  # 残り1個は高優先度用
+        assert bucket.wait_time() == 0.0
+        bucket.drain()
+        assert bucket.wait_time() > 0.5
+        print(f"  ✓ 予約分を残した待ち時間・drain後の待ち時間")
+
+    finally:
+        Bot.send_message = original_send_message
+
+    print("\n" + "=" * 60)
+    print("テスト完了！")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    test_telegram_notifier()
@@ -7,8 +7,9 @@ import logging
 import time
 import sys
 from pathlib import Path
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Iterable
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 import ccxt
 
 # プロジェクトルートをパスに追加
@@ -26,6 +27,16 @@ from utils.constants import (
 
 logger = logging.getLogger(__name__)
 
+# テストモード用のダミー価格
+MOCK_PRICES = {
+    'BTC/JPY': 12000000.0,   # 1200万円
+    'ETH/JPY': 500000.0,     # 50万円
+    'FX_BTC_JPY': 12050000.0  # FX価格（現物より若干高め）
+}
+
+# 複数シンボルの価格を個別取得する際の最大同時リクエスト数
+MAX_PRICE_FETCH_WORKERS = 4
+
 
 class OrderExecutor:
     """注文実行クラス"""
@@ -381,12 +392,7 @@ class OrderExecutor:
         """
         if self.test_mode:
             # テストモード: ダミー価格
-            mock_prices = {
-                'BTC/JPY': 12000000.0,   # 1200万円
-                'ETH/JPY': 500000.0,     # 50万円
-                'FX_BTC_JPY': 12050000.0  # FX価格（現物より若干高め）
-            }
-            return mock_prices.get(symbol, 100000.0)
+            return MOCK_PRICES.get(symbol, 100000.0)
 
         if not self.exchange:
             raise ValueError("API未接続")
@@ -398,6 +404,56 @@ class OrderExecutor:
             logger.error(f"価格取得失敗: {e}")
             raise
 
+    def get_prices(self, symbols: Iterable[str]) -> Dict[str, float]:
+        """
+        複数シンボルの現在価格をまとめて取得
+
+        取引所がfetch_tickersに対応していれば1リクエスト、
+        未対応（bitFlyerなど）の場合は各シンボルを並列に取得する
+
+        Args:
+            symbols: 取引ペアのリスト
+
+        Returns:
+            {シンボル: 現在価格}（取得に失敗したシンボルは含まない）
+        """
+        symbols = list(dict.fromkeys(symbols))  # 順序を保って重複除去
+        if not symbols:
+            return {}
+
+        if self.test_mode:
+            # テストモード: ダミー価格
+            return {symbol: MOCK_PRICES.get(symbol, 100000.0) for symbol in symbols}
+
+        if not self.exchange:
+            raise ValueError("API未接続")
+
+        if self.exchange.has.get('fetchTickers'):
+            try:
+                tickers = self.exchange.fetch_tickers(symbols)
+                return {
+                    symbol: tickers[symbol]['last']
+                    for symbol in symbols if symbol in tickers
+                }
+            except Exception as e:
+                logger.warning(f"一括価格取得失敗、個別取得に切替: {e}")
+
+        def fetch(symbol: str) -> Optional[float]:
+            try:
+                return self._fetch_ticker_with_retry(symbol)['last']
+            except Exception as e:
+                logger.error(f"価格取得失敗: {symbol} - {e}")
+                return None
+
+        # 個別取得はネットワーク待ちのためスレッドで並列化
+        if len(symbols) == 1:
+            prices = [fetch(symbols[0])]
+        else:
+            with ThreadPoolExecutor(max_workers=min(len(symbols), MAX_PRICE_FETCH_WORKERS)) as executor:
+                prices = list(executor.map(fetch, symbols))
+
+        return {symbol: price for symbol, price in zip(symbols, prices) if price is not None}
+
     def calculate_position_size(
         self,
         symbol: str,
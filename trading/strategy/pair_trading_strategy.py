@@ -52,6 +52,7 @@ class PairTradingConfig:
     rebalance_interval: int = 24  # 時間
     min_half_life: float = 5.0  # 最小半減期（日）
     max_half_life: float = 60.0  # 最大半減期（日）
+    min_correlation: float = 0.8  # 共和分検定にかける最小リターン相関
     # 利益確定パラメータ
     take_profit_pct: float = 0.03  # 3%で利確
     trailing_stop_pct: float = 0.015  # 1.5%トレーリングストップ
@@ -90,7 +91,16 @@ class PairTradingStrategy:
         Returns:
             共和分ペアのリスト
         """
-        self.cointegrated_pairs = self.analyzer.find_cointegrated_pairs(price_data)
+        # 末尾で長さを揃えた (T, N) 価格行列にまとめ、相関で絞ってから検定
+        symbols = list(price_data.keys())
+        n = min(len(series) for series in price_data.values())
+        prices = np.column_stack([
+            price_data[symbol].to_numpy(dtype=np.float64)[len(price_data[symbol]) - n:]
+            for symbol in symbols
+        ])
+        self.cointegrated_pairs = self.analyzer.find_cointegrated_pairs_fast(
+            prices, symbols, min_correlation=self.config.min_correlation
+        )
 
         # 半減期でフィルタリング
         valid_pairs = [
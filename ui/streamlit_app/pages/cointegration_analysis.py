@@ -12,7 +12,9 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
 
 from data.storage.sqlite_manager import get_db_manager
-from ml.models.cointegration_analyzer import CointegrationAnalyzer
+from ml.models.cointegration_analyzer import (
+    CointegrationAnalyzer, SIGNAL_LONG_SPREAD, SIGNAL_SHORT_SPREAD
+)
 
 
 def load_price_data(symbol: str, timeframe: str = '1h', limit: int = 500):
@@ -168,12 +170,13 @@ def plot_spread(spread, symbol1, symbol2):
     return fig
 
 
-def plot_zscore(z_score, entry_threshold, exit_threshold, symbol1, symbol2):
+def plot_zscore(z_score, signals, entry_threshold, exit_threshold, symbol1, symbol2):
     """
     Zスコアのチャートとエントリー/エグジットポイント
 
     Args:
         z_score: Zスコア系列
+        signals: 各時点のシグナルコード（z_scoreと同じ長さ）
         entry_threshold: エントリー閾値
         exit_threshold: エグジット閾値
         symbol1: 資産1のシンボル
@@ -227,8 +230,8 @@ def plot_zscore(z_score, entry_threshold, exit_threshold, symbol1, symbol2):
     fig.add_hline(y=0, line_dash="solid", line_color="gray", line_width=1)
 
     # エントリーポイントをマーク
-    long_signals = z_score[z_score < -entry_threshold]
-    short_signals = z_score[z_score > entry_threshold]
+    long_signals = z_score[signals == SIGNAL_LONG_SPREAD]
+    short_signals = z_score[signals == SIGNAL_SHORT_SPREAD]
 
     if not long_signals.empty:
         fig.add_trace(
@@ -391,6 +394,9 @@ def render_cointegration_page():
         spread = analyzer.calculate_spread(price1, price2, coint_result.hedge_ratio)
         z_score = analyzer.calculate_z_score(spread, window=lookback_period)
 
+        # 全期間のシグナル（エントリーポイント表示用）
+        signals = analyzer.generate_signals(price1, price2, coint_result.hedge_ratio, window=lookback_period)
+
         # 現在のシグナル
         signal = analyzer.generate_signal(price1, price2, coint_result.hedge_ratio)
 
@@ -441,7 +447,7 @@ def render_cointegration_page():
         st.plotly_chart(fig2, use_container_width=True)
 
         st.subheader("📊 Zスコアとトレーディングシグナル")
-        fig3 = plot_zscore(z_score, z_score_entry, z_score_exit, symbol1, symbol2)
+        fig3 = plot_zscore(z_score, signals, z_score_entry, z_score_exit, symbol1, symbol2)
         st.plotly_chart(fig3, use_container_width=True)
 
         # 統計情報
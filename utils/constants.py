@@ -55,3 +55,6 @@ PAIR_SHORT_SPREAD = 'short_spread'  # symbol1売り、symbol2買い
 # ========== リトライ・待機時間 ==========
 ROLLBACK_RETRY_WAIT_BASE = 2  # ロールバックリトライの指数バックオフ基数（秒）
 ERROR_RECOVERY_WAIT = 60  # 非APIエラー後の待機時間（秒）
+
+# ========== モデル保存 ==========
+MODEL_COMPRESS = ('lz4', 1)  # joblib保存時の圧縮（LZ4: zlibより高速な保存・読み込み）